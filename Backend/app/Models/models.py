@@ -78,9 +78,12 @@ class ExtractedData(BaseModel):
 class PortfolioUploadResponse(BaseModel):
     message: str = Field(..., description="Status message")
     extracted_data: Dict[str, float] = Field(..., description="Raw extracted data")
+    unrecognized: Dict[str, float] = Field(default_factory=dict, description="Symbol-like tokens missing from the listings and unknown to the market data provider, for the user to confirm")
     assets: List[Dict[str, Any]] = Field(..., description="Formatted assets data")
+    portfolio_id: str = Field(..., description="Id to retrieve, analyze or clear this portfolio with")
 
 class StoredPortfolioResponse(BaseModel):
+    portfolio_id: str = Field(..., description="Portfolio id")
     assets: List[Dict[str, Any]] = Field(..., description="Stored portfolio assets")
     raw_data: Dict[str, Any] = Field(..., description="Raw extracted data")
 
@@ -92,6 +95,17 @@ class PortfolioAnalysisResponse(BaseModel):
     report: str = Field(..., description="Comprehensive financial report")
     error: str = Field("", description="Error message if any")
     details: Dict[str, Any] = Field(default_factory=dict, description="Detailed analysis results")
+    timings: Optional[List[Dict[str, Any]]] = Field(None, description="Per-span timings (graph nodes, tools, LLM calls) when requested")
+    analysis_id: Optional[str] = Field(None, description="Id for fetching this analysis' charts")
+
+class ChartInfo(BaseModel):
+    kind: str = Field(..., description="Chart type (asset_allocation, forecast, ...)")
+    title: str = Field(..., description="Chart title")
+    etag: str = Field(..., description="Version of the rendered figure")
+
+class AnalysisChartsResponse(BaseModel):
+    analysis_id: str = Field(..., description="Analysis id")
+    charts: Dict[str, ChartInfo] = Field(..., description="Charts of the analysis by name")
 
 class SamplePortfolioResponse(BaseModel):
     assets: List[Asset] = Field(..., description="Sample portfolio assets") 
\ No newline at end of file
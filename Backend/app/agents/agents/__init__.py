@@ -1,13 +1,20 @@
-from app.agents.supervisor_agent import SupervisorAgent
-from app.agents.finance_advisor_agent import FinanceAdvisorAgent
-from app.agents.market_analysis_agent import MarketAnalysisAgent
-from app.agents.forecasting_agent import ForecastingAgent
-from app.agents.agent_graph import run_financial_analysis
-
-__all__ = [
-    'SupervisorAgent',
-    'FinanceAdvisorAgent',
-    'MarketAnalysisAgent',
-    'ForecastingAgent',
-    'run_financial_analysis'
-] 
\ No newline at end of file
+import importlib
+
+# Agents are loaded on first access: importing them pulls in langchain, langgraph and every tool
+_EXPORTS = {
+    'SupervisorAgent': 'app.agents.agents.supervisor_agent',
+    'FinanceAdvisorAgent': 'app.agents.agents.finance_advisor_agent',
+    'MarketAnalysisAgent': 'app.agents.agents.market_analysis_agent',
+    'ForecastingAgent': 'app.agents.agents.forecasting_agent',
+    'run_financial_analysis': 'app.agents.agents.agent_graph'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,9 +2,14 @@ from langchain_core.language_models import BaseLanguageModel
 from typing import Dict, Any, List, TypedDict, Annotated, Literal
 from enum import Enum
 from langgraph.graph import StateGraph, END
-from app.agents.finance_advisor_agent import FinanceAdvisorAgent
-from app.agents.market_analysis_agent import MarketAnalysisAgent
-from app.agents.forecasting_agent import ForecastingAgent
+from app.agents.agents.finance_advisor_agent import FinanceAdvisorAgent
+from app.agents.agents.market_analysis_agent import MarketAnalysisAgent
+from app.agents.agents.forecasting_agent import ForecastingAgent
+from app.agents.tools.portfolio_tools import PortfolioTools
+from app.agents.tools.charts import collect_charts, portfolio_charts
+from app.agents.tools.news_prefetch import get_news_store, sector_subject, summarize, ticker_subject
+from app.config import get_settings
+from app.utils.metrics import span, traced
 
 # Define the state
 class AgentState(TypedDict):
@@ -47,10 +52,27 @@ def create_agent_graph(llm: BaseLanguageModel) -> StateGraph:
             })
             
             # Extract risk assessment and category analysis
+            category_analysis = result.get('category_analysis') or {}
+            if 'assets' not in category_analysis:
+                # The agent executor answers in free text; keep the structured holdings
+                # that the market analysis and forecasting nodes select from, taken from
+                # the tool that already priced them when the agent called one
+                metrics = next((
+                    observation['metrics'] for _, observation in reversed(result.get('intermediate_steps', []))
+                    if isinstance(observation, dict) and isinstance(observation.get('metrics'), dict)
+                ), None)
+                if metrics is None:
+                    metrics = PortfolioTools._calculate_portfolio_metrics(state['portfolio_data'])
+                category_analysis = {
+                    'category_metrics': metrics['category_allocation'],
+                    **category_analysis,
+                    'assets': metrics['assets']
+                }
+            
             return {
                 **state,
                 'risk_assessment': result.get('risk_assessment', {}),
-                'category_analysis': result.get('category_analysis', {})
+                'category_analysis': category_analysis
             }
         except Exception as e:
             return {**state, 'error': f"Risk assessment failed: {str(e)}"}
@@ -71,12 +93,29 @@ def create_agent_graph(llm: BaseLanguageModel) -> StateGraph:
             if 'category_analysis' in state and 'category_metrics' in state['category_analysis']:
                 categories = [cat['category'] for cat in state['category_analysis']['category_metrics']]
             
+            # Serve from the prefetched news store when every subject is fresh
+            subjects = ([ticker_subject(largest_ticker)] if largest_ticker else []) + [sector_subject(c) for c in categories]
+            store = get_news_store()
+            store.record_requests(subjects)
+            max_age = get_settings().news_freshness_seconds
+            research = {subject: store.get(subject, max_age) for subject in subjects}
+            if subjects and all(research.values()):
+                return {**state, 'market_analysis': {
+                    'ticker': largest_ticker,
+                    'categories': categories,
+                    'output': summarize(research),
+                    'research': research,
+                    'source': 'prefetch',
+                    'fetched_at': min(entry['fetched_at'] for entry in research.values())
+                }}
+            
             # Run market analysis
             result = market_analysis_agent.run({
                 'ticker': largest_ticker,
                 'categories': categories,
                 'input': f'Research market sentiment and relevant articles for {largest_ticker} and these categories: {", ".join(categories)}'
             })
+            result['source'] = 'live'
             
             return {**state, 'market_analysis': result}
         except Exception as e:
@@ -162,12 +201,12 @@ def create_agent_graph(llm: BaseLanguageModel) -> StateGraph:
             
         return state.get('next', END)
     
-    # Add nodes to graph
-    workflow.add_node("risk_assessment", risk_assessment_node)
-    workflow.add_node("market_analysis", market_analysis_node)
-    workflow.add_node("forecasting", forecasting_node)
-    workflow.add_node("investment_advice", investment_advice_node)
-    workflow.add_node("report_generator", report_generator_node)
+    # Add nodes to graph, each timed as a "node" span
+    workflow.add_node("risk_assessment", traced('node', 'risk_assessment')(risk_assessment_node))
+    workflow.add_node("market_analysis", traced('node', 'market_analysis')(market_analysis_node))
+    workflow.add_node("forecasting", traced('node', 'forecasting')(forecasting_node))
+    workflow.add_node("investment_advice", traced('node', 'investment_advice')(investment_advice_node))
+    workflow.add_node("report_generator", traced('node', 'report_generator')(report_generator_node))
     
     # Set edges
     workflow.set_entry_point("risk_assessment")
@@ -203,8 +242,19 @@ def run_financial_analysis(llm: BaseLanguageModel, portfolio_data: Dict[str, Any
         'next': 'risk_assessment'
     }
     
-    # Run the graph
-    result = graph.invoke(initial_state)
+    # Run the graph, keeping the series of every chart the tools produce
+    with span('graph', 'financial_analysis'), collect_charts() as charts:
+        result = graph.invoke(initial_state)
+    
+    # Allocation charts come from the holdings the risk assessment already priced
+    category_analysis = result.get('category_analysis') or {}
+    if category_analysis.get('assets'):
+        allocation = portfolio_charts({
+            'assets': category_analysis['assets'],
+            'category_allocation': category_analysis.get('category_metrics', [])
+        })
+        for name in ('asset_allocation', 'category_allocation'):
+            charts.setdefault(name, allocation[name])
     
     # Return results
     return {
@@ -215,6 +265,7 @@ def run_financial_analysis(llm: BaseLanguageModel, portfolio_data: Dict[str, Any
             'category_analysis': result.get('category_analysis', {}),
             'market_analysis': result.get('market_analysis', {}),
             'forecasting': result.get('forecasting', {}),
-            'investment_advice': result.get('investment_advice', {})
+            'investment_advice': result.get('investment_advice', {}),
+            'charts': charts
         }
     } 
\ No newline at end of file
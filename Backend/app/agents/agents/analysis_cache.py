@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.utils.cache import CACHE_REQUESTS, DiskCache
+from app.utils.singleflight import SingleFlight
+
+
+def canonical_portfolio(portfolio_data: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """Holdings as sorted (TICKER, quantity) pairs, with repeated tickers summed, so order and case don't matter."""
+    holdings: Dict[str, float] = {}
+    for asset in portfolio_data.get('assets', []):
+        ticker = str(asset['ticker']).strip().upper()
+        holdings[ticker] = holdings.get(ticker, 0.0) + float(asset.get('quantity', 0))
+    return sorted((ticker, quantity) for ticker, quantity in holdings.items() if quantity)
+
+
+def analysis_key(portfolio_data: Dict[str, Any], goals: List[str], model_settings: Dict[str, Any]) -> str:
+    """
+    Cache key for a whole analysis: the canonical holdings, the sorted goals, the
+    model settings and the date of the last market close, so results roll over
+    once per trading day.
+    """
+    from app.agents.tools.market_data import last_market_close
+    payload = json.dumps({
+        'portfolio': canonical_portfolio(portfolio_data),
+        'goals': sorted(set(goals)),
+        'model': model_settings,
+        'close': last_market_close().date().isoformat()
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Cache of complete analysis results with stale-while-revalidate.
+    
+    A result younger than `ttl` seconds is served as is. Up to `stale_ttl` seconds
+    past that it is still served immediately, while a background recompute
+    replaces it. Older results, and keys not seen before, are computed inline;
+    concurrent identical requests share one computation.
+    """
+    
+    def __init__(self, cache: DiskCache, ttl: float = 3600, stale_ttl: float = 6 * 3600, refresh_workers: int = 2):
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.flights = SingleFlight('analysis')
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='analysis-refresh')
+        self._refreshing = set()
+        self._lock = threading.Lock()
+    
+    def _compute_and_store(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        result = compute()
+        # Failed analyses are returned but never cached
+        if not result.get('error'):
+            self.cache.set(key, result)
+        return result
+    
+    def _refresh(self, key: str, compute: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            self.flights.do(key, lambda: self._compute_and_store(key, compute))
+        except Exception as e:
+            print(f"Background analysis refresh failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+    
+    def _schedule_refresh(self, key: str, compute: Callable[[], Dict[str, Any]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(self._refresh, key, compute)
+    
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], str]:
+        """
+        Get the cached result for a key, computing it if needed.
+        
+        Returns:
+            Tuple[Dict[str, Any], str]: The result and how it was served ('hit', 'stale' or 'miss')
+        """
+        entry = self.cache.get_entry(key)
+        if entry is not None:
+            age = entry.age()
+            if age <= self.ttl:
+                CACHE_REQUESTS.inc(cache=self.cache.name, result='hit')
+                return entry.value, 'hit'
+            if age <= self.ttl + self.stale_ttl:
+                CACHE_REQUESTS.inc(cache=self.cache.name, result='stale')
+                self._schedule_refresh(key, compute)
+                return entry.value, 'stale'
+        
+        CACHE_REQUESTS.inc(cache=self.cache.name, result='miss')
+        return self.flights.do(key, lambda: self._compute_and_store(key, compute)), 'miss'
+    
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one cached result, or all of them when no key is given."""
+        if key is None:
+            self.cache.clear()
+        else:
+            self.cache.delete(key)
+    
+    def shutdown(self) -> None:
+        self._refresher.shutdown(wait=False, cancel_futures=True)
+
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Get the process-wide analysis cache, configured from settings on first use."""
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _analysis_cache = AnalysisCache(
+                    DiskCache(
+                        os.path.join(settings.cache_dir, 'analysis'), 'analysis',
+                        max_bytes=settings.analysis_cache_max_bytes
+                    ),
+                    ttl=settings.analysis_cache_ttl_seconds,
+                    stale_ttl=settings.analysis_cache_stale_seconds
+                )
+    return _analysis_cache
@@ -12,7 +12,14 @@ class BaseAgent(ABC):
         self.llm = llm
         self.tools = []
         self.prompt = self._create_prompt()
-        self.chain = self._create_chain()
+        self._chain: Optional[Runnable] = None
+    
+    @property
+    def chain(self) -> Runnable:
+        """The runnable chain, built on first use (after subclasses have built their executors)."""
+        if self._chain is None:
+            self._chain = self._create_chain()
+        return self._chain
     
     @abstractmethod
     def _create_prompt(self) -> ChatPromptTemplate:
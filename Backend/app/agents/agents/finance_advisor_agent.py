@@ -1,10 +1,10 @@
 from langchain_core.language_models import BaseLanguageModel
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain_core.runnables import Runnable
 from typing import Dict, Any, List
-from app.agents.base_agent import BaseAgent
+from app.agents.agents.base_agent import BaseAgent
 from app.agents.tools.portfolio_tools import PortfolioTools
 from app.agents.tools.research_tools import ResearchTools
 
@@ -28,12 +28,14 @@ class FinanceAdvisorAgent(BaseAgent):
             agent=create_openai_tools_agent(self.llm, self.tools, self.prompt),
             tools=self.tools,
             verbose=True,
-            handle_parsing_errors=True
+            handle_parsing_errors=True,
+            # Lets the graph reuse structured tool results instead of recomputing them
+            return_intermediate_steps=True
         )
     
     def _create_prompt(self) -> ChatPromptTemplate:
         """Create the prompt template for the agent."""
-        prompt = ChatPromptTemplate.from_template("""
+        prompt = ChatPromptTemplate.from_messages([("human", """
         You are an expert financial advisor tasked with analyzing investment portfolios and providing personalized advice.
         
         Your responsibilities include:
@@ -45,7 +47,7 @@ class FinanceAdvisorAgent(BaseAgent):
         Use the tools available to analyze the portfolio data and provide detailed, actionable advice.
         
         {input}
-        """)
+        """), MessagesPlaceholder(variable_name="agent_scratchpad")])
         
         return prompt
     
@@ -1,10 +1,10 @@
 from langchain_core.language_models import BaseLanguageModel
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain_core.runnables import Runnable
 from typing import Dict, Any, List
-from app.agents.base_agent import BaseAgent
+from app.agents.agents.base_agent import BaseAgent
 from app.agents.tools.forecasting_tools import ForecastingTools
 
 class ForecastingAgent(BaseAgent):
@@ -30,7 +30,7 @@ class ForecastingAgent(BaseAgent):
     
     def _create_prompt(self) -> ChatPromptTemplate:
         """Create the prompt template for the agent."""
-        prompt = ChatPromptTemplate.from_template("""
+        prompt = ChatPromptTemplate.from_messages([("human", """
         You are an expert financial forecasting analyst specialized in using machine learning models
         to predict stock price movements.
         
@@ -44,7 +44,7 @@ class ForecastingAgent(BaseAgent):
         tools to generate forecasts and visualizations.
         
         {input}
-        """)
+        """), MessagesPlaceholder(variable_name="agent_scratchpad")])
         
         return prompt
     
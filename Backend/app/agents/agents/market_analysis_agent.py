@@ -1,11 +1,12 @@
 from langchain_core.language_models import BaseLanguageModel
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain_core.runnables import Runnable
 from typing import Dict, Any, List
-from app.agents.base_agent import BaseAgent
+from app.agents.agents.base_agent import BaseAgent
 from app.agents.tools.research_tools import ResearchTools
+from app.agents.tools.dedup import ResearchDeduplicator
 
 class MarketAnalysisAgent(BaseAgent):
     """Agent for analyzing market sentiment and researching online articles about stocks."""
@@ -14,11 +15,16 @@ class MarketAnalysisAgent(BaseAgent):
         """Initialize the Market Analysis Agent."""
         super().__init__(llm)
         
+        # Drops syndicated copies of stories before they reach the LLM
+        self.deduplicator = ResearchDeduplicator()
+        
         # Create tools
         self.tools = [
             ResearchTools.create_google_search_tool(),
-            ResearchTools.create_web_scraping_tool(),
-            ResearchTools.create_sentiment_analysis_tool(llm)
+            ResearchTools.create_web_scraping_tool(self.deduplicator),
+            ResearchTools.create_batch_web_scraping_tool(self.deduplicator),
+            ResearchTools.create_sentiment_analysis_tool(llm, self.deduplicator),
+            ResearchTools.create_batch_sentiment_analysis_tool(llm, self.deduplicator)
         ]
         
         # Create agent
@@ -31,7 +37,7 @@ class MarketAnalysisAgent(BaseAgent):
     
     def _create_prompt(self) -> ChatPromptTemplate:
         """Create the prompt template for the agent."""
-        prompt = ChatPromptTemplate.from_template("""
+        prompt = ChatPromptTemplate.from_messages([("human", """
         You are an expert market analyst tasked with researching market sentiment and gathering information 
         about stocks or stock categories from online sources.
         
@@ -43,9 +49,11 @@ class MarketAnalysisAgent(BaseAgent):
         
         First, determine what stocks or categories you need to research based on the input.
         Then use the tools available to gather information, analyze sentiment, and compile a comprehensive report.
+        Once you have gathered the articles, score them all in a single SentimentBatchAnalyzer call rather than
+        one SentimentAnalyzer call per article.
         
         {input}
-        """)
+        """), MessagesPlaceholder(variable_name="agent_scratchpad")])
         
         return prompt
     
@@ -60,6 +68,10 @@ class MarketAnalysisAgent(BaseAgent):
             return {"error": "At least one of ticker, tickers, category, or categories is required"}
         
         # Process the input
+        self.deduplicator.reset()
         result = self.chain.invoke(inputs)
         
+        # Report how many duplicate articles were dropped and LLM calls avoided
+        result['deduplication'] = self.deduplicator.stats()
+        
         return result 
\ No newline at end of file
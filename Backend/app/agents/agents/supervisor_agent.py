@@ -1,13 +1,13 @@
 from langchain_core.language_models import BaseLanguageModel
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain_core.runnables import Runnable
 from typing import Dict, Any, List
-from app.agents.base_agent import BaseAgent
-from app.agents.finance_advisor_agent import FinanceAdvisorAgent
-from app.agents.market_analysis_agent import MarketAnalysisAgent
-from app.agents.forecasting_agent import ForecastingAgent
+from app.agents.agents.base_agent import BaseAgent
+from app.agents.agents.finance_advisor_agent import FinanceAdvisorAgent
+from app.agents.agents.market_analysis_agent import MarketAnalysisAgent
+from app.agents.agents.forecasting_agent import ForecastingAgent
 from app.agents.tools.portfolio_tools import PortfolioTools
 import json
 
@@ -39,7 +39,7 @@ class SupervisorAgent(BaseAgent):
     
     def _create_prompt(self) -> ChatPromptTemplate:
         """Create the prompt template for the agent."""
-        prompt = ChatPromptTemplate.from_template("""
+        prompt = ChatPromptTemplate.from_messages([("human", """
         You are the lead financial advisor tasked with creating a comprehensive financial report for a client's portfolio.
         
         Your report must include:
@@ -52,7 +52,7 @@ class SupervisorAgent(BaseAgent):
         Use the tools available to generate this report. Break down complex financial concepts into understandable terms.
         
         {input}
-        """)
+        """), MessagesPlaceholder(variable_name="agent_scratchpad")])
         
         return prompt
     
@@ -1,9 +1,26 @@
-from app.agents.tools.research_tools import ResearchTools
-from app.agents.tools.portfolio_tools import PortfolioTools
-from app.agents.tools.forecasting_tools import ForecastingTools
-
-__all__ = [
-    'ResearchTools',
-    'PortfolioTools',
-    'ForecastingTools'
-] 
\ No newline at end of file
+import importlib
+
+# Tools are loaded on first access so that importing one module (e.g. market data) doesn't import them all
+_EXPORTS = {
+    'ResearchTools': 'app.agents.tools.research_tools',
+    'PortfolioTools': 'app.agents.tools.portfolio_tools',
+    'ForecastingTools': 'app.agents.tools.forecasting_tools',
+    'MarketDataProvider': 'app.agents.tools.market_data',
+    'YFinanceProvider': 'app.agents.tools.market_data',
+    'ReplayProvider': 'app.agents.tools.market_data',
+    'SyntheticProvider': 'app.agents.tools.market_data',
+    'get_market_data_provider': 'app.agents.tools.market_data',
+    'set_market_data_provider': 'app.agents.tools.market_data',
+    'fetch_history': 'app.agents.tools.market_data',
+    'fetch_histories': 'app.agents.tools.market_data'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,332 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from app.utils.cache import DiskCache, MemoryCache
+from app.utils.metrics import span
+from app.utils.singleflight import SingleFlight
+
+# Bump when a renderer changes so clients holding an old ETag get the new figure
+RENDER_VERSION = '1'
+
+# Charts recorded by tools during the current analysis, populated only inside `collect_charts()`
+_run_charts: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar('tradeiq_run_charts', default=None)
+
+
+def _dates(index: pd.Index) -> List[str]:
+    return [value.date().isoformat() if hasattr(value, 'date') else str(value) for value in index]
+
+
+def _values(series: Any) -> List[float]:
+    return np.round(np.asarray(series, dtype=float), 4).tolist()
+
+
+def portfolio_charts(metrics: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Asset allocation, category allocation and returns series from `_calculate_portfolio_metrics`."""
+    assets = metrics.get('assets', [])
+    categories = metrics.get('category_allocation', [])
+    returns = metrics.get('returns', {})
+    return {
+        'asset_allocation': {
+            'kind': 'asset_allocation',
+            'title': 'Portfolio Asset Allocation',
+            'data': {
+                'ticker': [a['ticker'] for a in assets],
+                'allocation': _values([a['allocation'] for a in assets]),
+                'value': _values([a['value'] for a in assets]),
+                'category': [a['category'] for a in assets]
+            }
+        },
+        'category_allocation': {
+            'kind': 'category_allocation',
+            'title': 'Portfolio Category Allocation',
+            'data': {
+                'category': [c['category'] for c in categories],
+                'allocation': _values([c['allocation'] for c in categories])
+            }
+        },
+        'returns': {
+            'kind': 'returns',
+            'title': 'Portfolio Returns' if returns else 'Portfolio Returns (Insufficient Data)',
+            'data': {'period': list(returns), 'return': _values(list(returns.values()))}
+        }
+    }
+
+
+def forecast_chart(ticker: str, historical_df: pd.DataFrame, forecast_df: pd.DataFrame) -> Dict[str, Any]:
+    """The last 90 days of closes, the forecast and its (simplified) confidence band."""
+    recent = historical_df.iloc[-90:]
+    return {
+        'kind': 'forecast',
+        'title': f'{ticker} Stock Price Forecast (XGBoost)',
+        'data': {
+            'history': {'date': _dates(recent.index), 'close': _values(recent['Close'])},
+            'forecast': {'date': _dates(forecast_df.index), 'close': _values(forecast_df['Close'])},
+            'band': round(float(historical_df['Close'].std() * 0.5), 4)
+        }
+    }
+
+
+def comparison_chart(ticker: str, forecasts: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """Each forecast as the percentage change from its first day."""
+    series = {}
+    for symbol, forecast_df in forecasts.items():
+        close = forecast_df['Close']
+        series[symbol] = {'date': _dates(forecast_df.index), 'change_pct': _values((close / close.iloc[0] - 1) * 100)}
+    return {
+        'kind': 'forecast_comparison',
+        'title': f'Comparative Forecast: {ticker} vs Market Indices (XGBoost)',
+        'data': {'ticker': ticker, 'series': series}
+    }
+
+
+def projection_chart(goal: str, projection: Dict[str, Any]) -> Dict[str, Any]:
+    """Percentile bands of a goal projection by year, with the goal's target."""
+    return {
+        'kind': 'goal_projection',
+        'title': f'Projected Portfolio Value: {goal}',
+        'data': {**projection['bands'], 'target': round(float(projection['target_value']), 2)}
+    }
+
+
+def _render_allocation(chart: Dict[str, Any], names: str, hover_data: Optional[List[str]] = None) -> Any:
+    import plotly.express as px
+    fig = px.pie(chart['data'], values='allocation', names=names, title=chart['title'], hover_data=hover_data)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+
+def _render_asset_allocation(chart: Dict[str, Any]) -> Any:
+    return _render_allocation(chart, 'ticker', ['value', 'category'])
+
+
+def _render_category_allocation(chart: Dict[str, Any]) -> Any:
+    return _render_allocation(chart, 'category')
+
+
+def _render_returns(chart: Dict[str, Any]) -> Any:
+    import plotly.express as px
+    import plotly.graph_objects as go
+    if not chart['data']['period']:
+        fig = go.Figure()
+        fig.update_layout(title=chart['title'])
+        return fig
+    return px.bar(
+        chart['data'],
+        x='period',
+        y='return',
+        title=chart['title'],
+        labels={'return': 'Return (%)', 'period': 'Time Period'}
+    )
+
+
+def _render_forecast(chart: Dict[str, Any]) -> Any:
+    import plotly.graph_objects as go
+    history, forecast, band = chart['data']['history'], chart['data']['forecast'], chart['data']['band']
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(x=history['date'], y=history['close'], mode='lines', name='Historical', line=dict(color='blue')))
+    fig.add_trace(go.Scatter(x=forecast['date'], y=forecast['close'], mode='lines', name='Forecast', line=dict(color='red', dash='dash')))
+    
+    # Confidence interval (simplified)
+    fig.add_trace(go.Scatter(
+        x=forecast['date'],
+        y=[close + band for close in forecast['close']],
+        mode='lines',
+        line=dict(width=0),
+        showlegend=False,
+        hoverinfo='none'
+    ))
+    fig.add_trace(go.Scatter(
+        x=forecast['date'],
+        y=[close - band for close in forecast['close']],
+        mode='lines',
+        line=dict(width=0),
+        fillcolor='rgba(255, 0, 0, 0.1)',
+        fill='tonexty',
+        showlegend=False,
+        hoverinfo='none'
+    ))
+    
+    fig.update_layout(
+        title=chart['title'],
+        xaxis_title='Date',
+        yaxis_title='Price',
+        hovermode='x unified',
+        legend=dict(y=0.99, x=0.01),
+        template='plotly_white'
+    )
+    return fig
+
+
+def _render_forecast_comparison(chart: Dict[str, Any]) -> Any:
+    import plotly.graph_objects as go
+    ticker = chart['data']['ticker']
+    fig = go.Figure()
+    for symbol, series in chart['data']['series'].items():
+        fig.add_trace(go.Scatter(
+            x=series['date'],
+            y=series['change_pct'],
+            mode='lines',
+            name=f'{symbol} (forecast)',
+            line=dict(dash='dash' if symbol != ticker else None)
+        ))
+    
+    fig.update_layout(
+        title=chart['title'],
+        xaxis_title='Date',
+        yaxis_title='Percentage Change (%)',
+        hovermode='x unified',
+        legend=dict(y=0.99, x=0.01),
+        template='plotly_white'
+    )
+    return fig
+
+
+def _render_goal_projection(chart: Dict[str, Any]) -> Any:
+    import plotly.graph_objects as go
+    data = chart['data']
+    fig = go.Figure()
+    
+    # Outer (5th-95th) and inner (25th-75th) percentile bands, filled to the trace before
+    for lower, upper, fillcolor in (('p5', 'p95', 'rgba(0, 0, 255, 0.1)'), ('p25', 'p75', 'rgba(0, 0, 255, 0.2)')):
+        fig.add_trace(go.Scatter(x=data['year'], y=data[lower], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='none'))
+        fig.add_trace(go.Scatter(
+            x=data['year'],
+            y=data[upper],
+            mode='lines',
+            line=dict(width=0),
+            fillcolor=fillcolor,
+            fill='tonexty',
+            name=f'{lower[1:]}th-{upper[1:]}th percentile'
+        ))
+    fig.add_trace(go.Scatter(x=data['year'], y=data['p50'], mode='lines', name='Median', line=dict(color='blue')))
+    fig.add_hline(y=data['target'], line=dict(color='red', dash='dash'), annotation_text='Target')
+    
+    fig.update_layout(
+        title=chart['title'],
+        xaxis_title='Years',
+        yaxis_title='Portfolio Value',
+        hovermode='x unified',
+        legend=dict(y=0.99, x=0.01),
+        template='plotly_white'
+    )
+    return fig
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'asset_allocation': _render_asset_allocation,
+    'category_allocation': _render_category_allocation,
+    'returns': _render_returns,
+    'forecast': _render_forecast,
+    'forecast_comparison': _render_forecast_comparison,
+    'goal_projection': _render_goal_projection
+}
+
+
+def render_chart(chart: Dict[str, Any]) -> str:
+    """Render a chart's series as Plotly figure JSON."""
+    with span('chart', chart['kind']):
+        return RENDERERS[chart['kind']](chart).to_json()
+
+
+def chart_etag(chart: Dict[str, Any]) -> str:
+    payload = json.dumps(chart, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(f'{RENDER_VERSION}|{payload}'.encode()).hexdigest()
+
+
+@contextmanager
+def collect_charts() -> Iterator[Dict[str, Dict[str, Any]]]:
+    """Collect every chart recorded in this context (and threads copying it) by name."""
+    charts: Dict[str, Dict[str, Any]] = {}
+    token = _run_charts.set(charts)
+    try:
+        yield charts
+    finally:
+        _run_charts.reset(token)
+
+
+def record_chart(name: str, chart: Dict[str, Any]) -> str:
+    """Record a chart for the current analysis (if one is collecting) and return its name."""
+    charts = _run_charts.get()
+    if charts is not None:
+        charts[name] = chart
+    return name
+
+
+class ChartStore:
+    """
+    Chart series of finished analyses by analysis id, rendered to Plotly JSON on request.
+    
+    Each chart carries an ETag derived from its series and the renderer version;
+    rendered figures are kept in memory by ETag, and concurrent requests for the
+    same figure share one render.
+    """
+    
+    def __init__(self, cache: DiskCache, renders: MemoryCache):
+        self.cache = cache
+        self.renders = renders
+        self.flights = SingleFlight('chart')
+    
+    @staticmethod
+    def _summary(charts: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+        return {name: {'kind': c['kind'], 'title': c['title'], 'etag': c['etag']} for name, c in charts.items()}
+    
+    def save(self, analysis_id: str, charts: Dict[str, Dict[str, Any]], replace: bool = False) -> Dict[str, Dict[str, str]]:
+        """
+        Store an analysis' charts, unless they are already stored and `replace` is False
+        (e.g. for an analysis served from the result cache).
+        
+        Returns:
+            Dict[str, Dict[str, str]]: The kind, title and ETag of each chart, by name
+        """
+        stored = None if replace else self.cache.get(analysis_id)
+        if stored is None:
+            stored = {name: {**chart, 'etag': chart_etag(chart)} for name, chart in charts.items()}
+            self.cache.set(analysis_id, stored)
+        return self._summary(stored)
+    
+    def list(self, analysis_id: str) -> Optional[Dict[str, Dict[str, str]]]:
+        stored = self.cache.get(analysis_id)
+        return self._summary(stored) if stored is not None else None
+    
+    def get(self, analysis_id: str, name: str) -> Optional[Dict[str, Any]]:
+        """A stored chart (series and ETag), or None if the analysis or chart is unknown."""
+        stored = self.cache.get(analysis_id)
+        return stored.get(name) if stored is not None else None
+    
+    def render(self, chart: Dict[str, Any]) -> bytes:
+        """Plotly JSON for a stored chart, rendered once per ETag."""
+        figure = self.renders.get(chart['etag'])
+        if figure is None:
+            figure = self.flights.do(chart['etag'], lambda: render_chart(chart).encode())
+            self.renders.set(chart['etag'], figure)
+        return figure
+
+
+_chart_store: Optional[ChartStore] = None
+_chart_store_lock = threading.Lock()
+
+
+def get_chart_store() -> ChartStore:
+    """Get the process-wide chart store, configured from settings on first use."""
+    global _chart_store
+    if _chart_store is None:
+        with _chart_store_lock:
+            if _chart_store is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _chart_store = ChartStore(
+                    DiskCache(
+                        os.path.join(settings.cache_dir, 'charts'), 'charts',
+                        ttl=settings.chart_store_ttl_seconds,
+                        max_bytes=settings.chart_store_max_bytes
+                    ),
+                    MemoryCache('chart_renders', max_entries=settings.chart_render_cache_entries)
+                )
+    return _chart_store
@@ -0,0 +1,164 @@
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.metrics import registry
+
+DUPLICATE_ARTICLES = registry.counter(
+    'tradeiq_duplicate_articles_total',
+    'Scraped articles dropped as near-duplicates of an article already seen in the run.'
+)
+LLM_CALLS_AVOIDED = registry.counter(
+    'tradeiq_sentiment_llm_calls_avoided_total',
+    'Sentiment LLM calls skipped because the text was a near-duplicate of one already scored.'
+)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHasher:
+    """MinHash signatures over word shingles, computed with vectorized permutations."""
+    
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+    
+    def shingles(self, text: str) -> List[str]:
+        words = re.findall(r'\w+', text.lower())
+        k = min(self.shingle_size, len(words))
+        if k == 0:
+            return []
+        return [' '.join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of the text, or None if it has no words."""
+        shingles = set(self.shingles(text))
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        # (a * h + b) mod p for every (shingle, permutation) pair; uint64 wraparound is intended
+        permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of MinHash signatures for finding near-duplicate texts.
+    
+    Signatures are split into `bands` bands; texts sharing any band become
+    candidates, and a candidate is a duplicate when its estimated Jaccard
+    similarity is at least `threshold`.
+    """
+    
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, shingle_size: int = 5):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+    
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+    
+    def query(self, signature: Optional[np.ndarray]) -> Optional[str]:
+        """Key of the most similar indexed text above the threshold, if any."""
+        if signature is None:
+            return None
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+    
+    def add(self, key: str, signature: Optional[np.ndarray]) -> None:
+        if signature is None or key in self._signatures:
+            return
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(key)
+    
+    def clear(self) -> None:
+        self._signatures.clear()
+        self._buckets.clear()
+    
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+class ResearchDeduplicator:
+    """
+    Per-run near-duplicate filter for the research pipeline.
+    
+    Scraped articles that repeat a story already seen are dropped, and texts sent
+    for sentiment scoring reuse the result of a near-identical text already scored.
+    """
+    
+    def __init__(self, threshold: float = 0.8):
+        self.articles = NearDuplicateIndex(threshold=threshold)
+        self.scored = NearDuplicateIndex(threshold=threshold)
+        self._results: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {'articles_seen': 0, 'duplicate_articles': 0, 'sentiment_requests': 0, 'llm_calls_avoided': 0}
+    
+    def filter_article(self, key: str, text: str) -> Optional[str]:
+        """
+        Register a scraped article.
+        
+        Returns:
+            Optional[str]: Key of the earlier article it duplicates, or None if it is new
+        """
+        signature = self.articles.hasher.signature(text)
+        with self._lock:
+            self._stats['articles_seen'] += 1
+            duplicate_of = self.articles.query(signature)
+            if duplicate_of is not None:
+                self._stats['duplicate_articles'] += 1
+                DUPLICATE_ARTICLES.inc()
+                return duplicate_of
+            self.articles.add(key, signature)
+            return None
+    
+    def lookup_sentiment(self, text: str) -> Optional[Dict[str, Any]]:
+        """Sentiment result of a near-identical text scored earlier in the run, if any."""
+        signature = self.scored.hasher.signature(text)
+        with self._lock:
+            self._stats['sentiment_requests'] += 1
+            key = self.scored.query(signature)
+            if key is None:
+                return None
+            self._stats['llm_calls_avoided'] += 1
+            LLM_CALLS_AVOIDED.inc()
+            return {**self._results[key], 'duplicate_of': key}
+    
+    def store_sentiment(self, text: str, result: Dict[str, Any]) -> None:
+        signature = self.scored.hasher.signature(text)
+        with self._lock:
+            key = f'text-{len(self.scored)}'
+            self.scored.add(key, signature)
+            if key in self.scored._signatures:
+                self._results[key] = result
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+    
+    def reset(self) -> None:
+        with self._lock:
+            self.articles.clear()
+            self.scored.clear()
+            self._results.clear()
+            self._stats = {k: 0 for k in self._stats}
@@ -1,12 +1,14 @@
-import yfinance as yf
+import hashlib
 import pandas as pd
 import numpy as np
-from xgboost import XGBRegressor
-from sklearn.metrics import mean_absolute_error
 from datetime import datetime, timedelta
-import plotly.graph_objects as go
 from typing import Dict, Any, List, Tuple
 from langchain.tools import Tool
+from app.utils.metrics import span, traced
+from app.utils.singleflight import SingleFlight
+from app.utils.serialization import frame_columns
+from app.agents.tools.charts import comparison_chart, forecast_chart, record_chart, render_chart
+from app.agents.tools.market_data import fetch_history, get_price_cache
 
 class ForecastingTools:
     """Tools for forecasting stock prices using ML models."""
@@ -24,12 +26,16 @@ class ForecastingTools:
             pd.DataFrame: Processed dataframe with features
         """
         # Fetch data
-        stock = yf.Ticker(ticker)
-        df = stock.history(period=period)
+        df = fetch_history(ticker, period)
         
         if df.empty:
             raise ValueError(f"No data found for ticker {ticker}")
         
+        return ForecastingTools._add_features(df)
+    
+    @staticmethod
+    def _add_features(df: pd.DataFrame) -> pd.DataFrame:
+        """Add the model's features and next-day target to a price history."""
         # Create features
         df['Return'] = df['Close'].pct_change()
         df['MA5'] = df['Close'].rolling(window=5).mean()
@@ -55,11 +61,59 @@ class ForecastingTools:
         rsi = 100 - (100 / (1 + rs))
         return rsi
     
+    _flights = SingleFlight('forecast')
+    
+    @staticmethod
+    def _history_key(df: pd.DataFrame) -> Tuple:
+        """Identifies a price history cheaply: a new bar, or a revised close for the latest one, changes it."""
+        return (df.index[-1], len(df), float(df['Close'].iloc[-1]))
+    
+    @staticmethod
+    def _get_features(ticker: str, period: str = "2y") -> pd.DataFrame:
+        """
+        Like `_prepare_stock_data`, but served from the feature store while the
+        price history is unchanged.
+        """
+        df = fetch_history(ticker, period)
+        if df.empty:
+            raise ValueError(f"No data found for ticker {ticker}")
+        
+        # Feature frames are keyed on the price history they were built from
+        cache = get_price_cache('features', max_entries=256)
+        key = (ticker, period) + ForecastingTools._history_key(df)
+        features = cache.get(key)
+        if features is None:
+            features = ForecastingTools._add_features(df)
+            cache.set(key, features)
+        return features.copy()
+    
+    @staticmethod
+    def _forecast(ticker: str, forecast_days: int = 30) -> Tuple[pd.DataFrame, pd.DataFrame, Dict]:
+        """
+        Features, forecast and metrics for a ticker, reusing the forecast trained
+        on the same history if there is one.
+        
+        Returns:
+            Tuple[pd.DataFrame, pd.DataFrame, Dict]: Feature dataframe, forecast dataframe and metrics
+        """
+        df = ForecastingTools._get_features(ticker)
+        cache = get_price_cache('forecasts', max_entries=256)
+        key = (ticker, forecast_days) + ForecastingTools._history_key(df)
+        cached = cache.get(key)
+        if cached is None:
+            cached = ForecastingTools._train_and_forecast(df, forecast_days)
+            cache.set(key, cached)
+        forecast_df, metrics = cached
+        return df, forecast_df.copy(), dict(metrics)
+    
     @staticmethod
     def _train_and_forecast(df: pd.DataFrame, forecast_days: int = 30) -> Tuple[pd.DataFrame, Dict]:
         """
         Train XGBoost model and make forecast.
         
+        Concurrent calls with identical data (e.g. several analyses comparing
+        against SPY) share one training run.
+        
         Args:
             df (pd.DataFrame): Prepared dataframe
             forecast_days (int): Number of days to forecast
@@ -67,6 +121,14 @@ class ForecastingTools:
         Returns:
             Tuple[pd.DataFrame, Dict]: Forecast dataframe and metrics
         """
+        key = (hashlib.sha1(pd.util.hash_pandas_object(df).values.tobytes()).hexdigest(), forecast_days)
+        return ForecastingTools._flights.do(key, lambda: ForecastingTools._fit_and_forecast(df, forecast_days))
+    
+    @staticmethod
+    def _fit_and_forecast(df: pd.DataFrame, forecast_days: int) -> Tuple[pd.DataFrame, Dict]:
+        from xgboost import XGBRegressor
+        from sklearn.metrics import mean_absolute_error
+        
         # Select features
         features = ['Return', 'MA5', 'MA20', 'MA50', 'Volatility', 'RSI', 'Volume']
         features = [f for f in features if f in df.columns]  # Filter in case some features are missing
@@ -84,12 +146,13 @@ class ForecastingTools:
             random_state=42
         )
         
-        model.fit(
-            train_data[features], 
-            train_data['Target'],
-            eval_set=[(test_data[features], test_data['Target'])],
-            verbose=False
-        )
+        with span('fit', 'xgboost', rows=len(train_data)):
+            model.fit(
+                train_data[features], 
+                train_data['Target'],
+                eval_set=[(test_data[features], test_data['Target'])],
+                verbose=False
+            )
         
         # Evaluate
         predictions = model.predict(test_data[features])
@@ -132,98 +195,41 @@ class ForecastingTools:
         return forecast_df, metrics
     
     @staticmethod
-    def _create_forecast_plot(ticker: str, historical_df: pd.DataFrame, forecast_df: pd.DataFrame) -> Dict:
+    def _create_forecast_plot(ticker: str, historical_df: pd.DataFrame, forecast_df: pd.DataFrame) -> str:
         """
         Create a Plotly plot of historical prices and forecast.
         
+        Analyses only keep the `forecast_chart` series; this renders them directly.
+        
         Args:
             ticker (str): Stock ticker symbol
             historical_df (pd.DataFrame): Historical price data
             forecast_df (pd.DataFrame): Forecast data
             
         Returns:
-            Dict: Plotly figure as JSON
+            str: Plotly figure as JSON
         """
-        # Use only the last 90 days of historical data for better visualization
-        historical_df = historical_df.iloc[-90:]
-        
-        # Create figure
-        fig = go.Figure()
-        
-        # Add historical prices
-        fig.add_trace(go.Scatter(
-            x=historical_df.index,
-            y=historical_df['Close'],
-            mode='lines',
-            name='Historical',
-            line=dict(color='blue')
-        ))
-        
-        # Add forecast
-        fig.add_trace(go.Scatter(
-            x=forecast_df.index,
-            y=forecast_df['Close'],
-            mode='lines',
-            name='Forecast',
-            line=dict(color='red', dash='dash')
-        ))
-        
-        # Add confidence interval (simplified)
-        std_dev = historical_df['Close'].std() * 0.5
-        fig.add_trace(go.Scatter(
-            x=forecast_df.index,
-            y=forecast_df['Close'] + std_dev,
-            mode='lines',
-            line=dict(width=0),
-            showlegend=False,
-            hoverinfo='none'
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=forecast_df.index,
-            y=forecast_df['Close'] - std_dev,
-            mode='lines',
-            line=dict(width=0),
-            fillcolor='rgba(255, 0, 0, 0.1)',
-            fill='tonexty',
-            showlegend=False,
-            hoverinfo='none'
-        ))
-        
-        # Update layout
-        fig.update_layout(
-            title=f'{ticker} Stock Price Forecast (XGBoost)',
-            xaxis_title='Date',
-            yaxis_title='Price',
-            hovermode='x unified',
-            legend=dict(y=0.99, x=0.01),
-            template='plotly_white'
-        )
-        
-        return fig.to_json()
+        return render_chart(forecast_chart(ticker, historical_df, forecast_df))
     
     @staticmethod
     def create_stock_forecast_tool() -> Tool:
         """Create a tool for forecasting stock prices."""
         
+        @traced('tool', 'StockForecast')
         def forecast_stock(ticker: str, forecast_days: int = 30) -> Dict[str, Any]:
             """Forecast stock prices using XGBoost."""
             try:
-                # Prepare data
-                df = ForecastingTools._prepare_stock_data(ticker)
-                
-                # Train model and get forecast
-                forecast_df, metrics = ForecastingTools._train_and_forecast(df, forecast_days)
-                
-                # Create plot
-                plot_json = ForecastingTools._create_forecast_plot(ticker, df, forecast_df)
+                # Prepare data, train model and get forecast
+                df, forecast_df, metrics = ForecastingTools._forecast(ticker, forecast_days)
                 
                 return {
                     "ticker": ticker,
                     "forecast_days": forecast_days,
                     "metrics": metrics,
-                    "plot": plot_json,
-                    "forecast_data": forecast_df.reset_index().to_dict(orient='records')
+                    # The figure is rendered on request from the stored series
+                    "chart": record_chart(f"forecast:{ticker}", forecast_chart(ticker, df, forecast_df)),
+                    # One array per column rather than one record (with a Timestamp) per day
+                    "forecast_data": frame_columns(forecast_df)
                 }
             
             except Exception as e:
@@ -239,6 +245,7 @@ class ForecastingTools:
     def create_comparative_forecast_tool() -> Tool:
         """Create a tool for comparing stock forecasts with market indices."""
         
+        @traced('tool', 'ComparativeStockForecast')
         def compare_forecasts(ticker: str, forecast_days: int = 30) -> Dict[str, Any]:
             """Compare stock forecast with SPY and NASDAQ-100 (QQQ) indices."""
             try:
@@ -246,8 +253,7 @@ class ForecastingTools:
                 results = {}
                 
                 # Forecast user's stock
-                stock_df = ForecastingTools._prepare_stock_data(ticker)
-                stock_forecast, stock_metrics = ForecastingTools._train_and_forecast(stock_df, forecast_days)
+                _, stock_forecast, stock_metrics = ForecastingTools._forecast(ticker, forecast_days)
                 results[ticker] = {
                     "forecast": stock_forecast,
                     "metrics": stock_metrics
@@ -255,39 +261,12 @@ class ForecastingTools:
                 
                 # Forecast indices
                 for index in indices:
-                    index_df = ForecastingTools._prepare_stock_data(index)
-                    index_forecast, index_metrics = ForecastingTools._train_and_forecast(index_df, forecast_days)
+                    _, index_forecast, index_metrics = ForecastingTools._forecast(index, forecast_days)
                     results[index] = {
                         "forecast": index_forecast,
                         "metrics": index_metrics
                     }
                 
-                # Create comparative plot
-                fig = go.Figure()
-                
-                # Normalize to percentage change from start
-                for symbol, data in results.items():
-                    start_price = data["forecast"]["Close"].iloc[0]
-                    normalized_forecast = (data["forecast"]["Close"] / start_price - 1) * 100
-                    
-                    fig.add_trace(go.Scatter(
-                        x=data["forecast"].index,
-                        y=normalized_forecast,
-                        mode='lines',
-                        name=f'{symbol} (forecast)',
-                        line=dict(dash='dash' if symbol != ticker else None)
-                    ))
-                
-                # Update layout
-                fig.update_layout(
-                    title=f'Comparative Forecast: {ticker} vs Market Indices (XGBoost)',
-                    xaxis_title='Date',
-                    yaxis_title='Percentage Change (%)',
-                    hovermode='x unified',
-                    legend=dict(y=0.99, x=0.01),
-                    template='plotly_white'
-                )
-                
                 # Calculate correlation with indices
                 correlations = {}
                 for index in indices:
@@ -302,7 +281,10 @@ class ForecastingTools:
                     "stock_metrics": stock_metrics,
                     "index_metrics": {idx: results[idx]["metrics"] for idx in indices},
                     "correlations": correlations,
-                    "plot": fig.to_json()
+                    "chart": record_chart(
+                        f"forecast_comparison:{ticker}",
+                        comparison_chart(ticker, {symbol: data["forecast"] for symbol, data in results.items()})
+                    )
                 }
             
             except Exception as e:
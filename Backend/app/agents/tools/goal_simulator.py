@@ -0,0 +1,280 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Dict, Optional
+import numpy as np
+from app.utils.metrics import span
+
+if TYPE_CHECKING:
+    from app.agents.tools.risk_engine import RiskModel
+
+TRADING_DAYS = 252
+MONTH_DAYS = 21
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Horizon and target (the current value compounded at `target_return` a year) for goals that don't state them
+GOAL_DEFAULTS = {
+    'retirement': {'horizon_years': 30, 'target_return': 0.05},
+    'home_purchase': {'horizon_years': 5, 'target_return': 0.03},
+    'aggressive_growth': {'horizon_years': 10, 'target_return': 0.08}
+}
+
+_YEARS = re.compile(r'(\d{1,2})[\s-]*(?:years?|yrs?)\b', re.I)
+_AMOUNT = r'\$\s*(\d[\d,]*(?:\.\d+)?)\s*(k|m|mm|million|thousand)?\b'
+_CONTRIBUTION = re.compile(_AMOUNT + r'\s*(?:/\s*mo(?:nth)?|per\s+month|a\s+month|monthly)', re.I)
+_TARGET = re.compile(_AMOUNT, re.I)
+_MULTIPLIERS = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'mm': 1e6, 'million': 1e6}
+
+
+def _amount(match: 're.Match') -> float:
+    return float(match.group(1).replace(',', '')) * _MULTIPLIERS.get((match.group(2) or '').lower(), 1)
+
+
+def goal_slug(goal: str) -> str:
+    """A URL-safe name for a goal, e.g. for its projection chart."""
+    return re.sub(r'[^a-z0-9]+', '_', goal.lower()).strip('_')[:64] or 'goal'
+
+
+def parse_goal(goal: str, matched_goal: str, current_value: float) -> Dict[str, float]:
+    """
+    Horizon, target value and monthly contribution for a goal, from the goal text where it
+    states them (e.g. "retire in 25 years with $2M, adding $500 a month") and the
+    defaults of its category otherwise.
+    """
+    defaults = GOAL_DEFAULTS.get(matched_goal, GOAL_DEFAULTS['retirement'])
+    years = _YEARS.search(goal)
+    horizon_years = min(max(int(years.group(1)), 1), 60) if years else defaults['horizon_years']
+    
+    contribution = _CONTRIBUTION.search(goal)
+    monthly_contribution = _amount(contribution) if contribution else 0.0
+    remaining = goal[:contribution.start()] + goal[contribution.end():] if contribution else goal
+    target = _TARGET.search(remaining)
+    if target:
+        target_value = _amount(target)
+    else:
+        target_value = current_value * (1 + defaults['target_return']) ** horizon_years
+    return {
+        'horizon_years': horizon_years,
+        'target_value': target_value,
+        'monthly_contribution': monthly_contribution
+    }
+
+
+class BlockBootstrap:
+    """
+    Monthly portfolio log returns drawn as blocks of MONTH_DAYS consecutive days of the
+    historical return panel (wrapping around at its end). Whole panel days are kept
+    together, so correlations between holdings and short-range autocorrelation carry
+    over. Blocks are re-centred on `drift`.
+    """
+    
+    method = 'bootstrap'
+    
+    def __init__(self, daily_log_returns: np.ndarray, drift: float):
+        n = len(daily_log_returns)
+        padded = np.concatenate([daily_log_returns, np.resize(daily_log_returns, MONTH_DAYS - 1)])
+        cumulative = np.concatenate([[0.0], np.cumsum(padded)])
+        blocks = cumulative[MONTH_DAYS:MONTH_DAYS + n] - cumulative[:n]
+        self.blocks = blocks - blocks.mean() + drift
+    
+    def draw(self, rng: np.random.Generator, shape) -> np.ndarray:
+        return self.blocks[rng.integers(0, len(self.blocks), shape)]
+
+
+class NormalReturns:
+    """Monthly portfolio log returns drawn from a normal distribution."""
+    
+    method = 'normal'
+    
+    def __init__(self, drift: float, volatility: float):
+        self.drift = drift
+        self.volatility = volatility
+    
+    def draw(self, rng: np.random.Generator, shape) -> np.ndarray:
+        return rng.normal(self.drift, self.volatility, shape)
+
+
+def simulate_paths(sampler: Any, initial_value: float, monthly_contribution: float, years: int, paths: int, seed: Any) -> np.ndarray:
+    """
+    Year-end portfolio values of `paths` simulated paths, vectorized over paths.
+    
+    Each year draws all twelve months at once; a contribution at the end of a month
+    grows with the rest of that year's returns. Module-level so worker processes can run it.
+    
+    Returns:
+        np.ndarray: (paths, years + 1) float32 matrix, starting with `initial_value`
+    """
+    rng = np.random.default_rng(seed)
+    values = np.empty((paths, years + 1), dtype=np.float32)
+    value = np.full(paths, float(initial_value))
+    values[:, 0] = value
+    for year in range(years):
+        cumulative = np.cumsum(sampler.draw(rng, (paths, 12)), axis=1)
+        value = value * np.exp(cumulative[:, -1])
+        if monthly_contribution:
+            value += monthly_contribution * np.exp(cumulative[:, -1:] - cumulative).sum(axis=1)
+        values[:, year + 1] = value
+    return values
+
+
+class GoalSimulator:
+    """
+    Monte Carlo projection of a portfolio's value towards investment goals.
+    
+    Paths are simulated in chunks of `chunk_paths`, so memory holds one chunk of draws
+    plus the year-end values. Runs of at least `parallel_min_path_years` (paths times
+    years) spread the chunks over a pool of `workers` processes. Every chunk has its own
+    seed derived from `seed`, so results are the same with or without the pool.
+    """
+    
+    def __init__(
+        self,
+        paths: int = 10_000,
+        chunk_paths: int = 5_000,
+        workers: int = 2,
+        parallel_min_path_years: int = 5_000_000,
+        method: str = 'bootstrap',
+        long_run_return: float = 0.06,
+        prior_years: float = 10.0,
+        seed: int = 0
+    ):
+        self.paths = paths
+        self.chunk_paths = max(1, chunk_paths)
+        # More workers than CPUs only adds process start-up and pickling
+        self.workers = min(workers, os.cpu_count() or 1)
+        self.parallel_min_path_years = parallel_min_path_years
+        self.method = method
+        self.long_run_return = long_run_return
+        self.prior_years = prior_years
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers only import this module and NumPy, not the whole app
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+    
+    def sampler(self, model: 'RiskModel', weights: np.ndarray):
+        """
+        Monthly return sampler for a portfolio over a risk model.
+        
+        The panel's mean return is shrunk towards `long_run_return`, weighting the sample
+        by its length in years against `prior_years`: a year of history says little about
+        the next few decades' drift, but a lot about volatility and correlation.
+        """
+        daily = np.log1p(model.returns @ weights)
+        sample_years = len(daily) / TRADING_DAYS
+        sample_weight = sample_years / (sample_years + self.prior_years)
+        annual_drift = sample_weight * daily.mean() * TRADING_DAYS + (1 - sample_weight) * np.log1p(self.long_run_return)
+        if self.method == 'normal':
+            volatility = np.sqrt(max(float(weights @ model.covariance @ weights), 0.0) * MONTH_DAYS)
+            return NormalReturns(annual_drift / 12, volatility)
+        return BlockBootstrap(daily, annual_drift / 12)
+    
+    def simulate(self, sampler: Any, initial_value: float, monthly_contribution: float, years: int, paths: Optional[int] = None) -> np.ndarray:
+        """Year-end values of `paths` (default `self.paths`) simulated paths, as (paths, years + 1)."""
+        paths = paths or self.paths
+        sizes = [min(self.chunk_paths, paths - start) for start in range(0, paths, self.chunk_paths)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        args = [(sampler, initial_value, monthly_contribution, years, size, seed) for size, seed in zip(sizes, seeds)]
+        
+        with span('simulation', 'goal_paths', paths=paths, years=years):
+            if self.workers > 1 and len(sizes) > 1 and paths * years >= self.parallel_min_path_years:
+                try:
+                    chunks = list(self._get_pool().map(simulate_paths, *zip(*args)))
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM); finish in this process and start a fresh pool next time
+                    with self._lock:
+                        self._pool = None
+                    chunks = [simulate_paths(*a) for a in args]
+            else:
+                chunks = [simulate_paths(*a) for a in args]
+        return np.concatenate(chunks)
+    
+    def project(self, model: 'RiskModel', values: Dict[str, float], goal: str, matched_goal: str) -> Dict[str, Any]:
+        """
+        Project a portfolio towards a goal.
+        
+        Args:
+            model (RiskModel): Risk model covering the holdings
+            values (Dict[str, float]): Current value of each holding by ticker
+            goal (str): The goal as the user stated it
+            matched_goal (str): The goal category it matched (see GOAL_DEFAULTS)
+        
+        Returns:
+            Dict[str, Any]: The goal's horizon, target and contribution, the probability of
+            reaching the target and of ending below the amount invested, final value
+            percentiles, and yearly percentile bands
+        """
+        weights = model.weights(values)
+        initial_value = float(sum(values.values()))
+        spec = parse_goal(goal, matched_goal, initial_value)
+        years = int(spec['horizon_years'])
+        sampler = self.sampler(model, weights)
+        
+        paths = self.simulate(sampler, initial_value, spec['monthly_contribution'], years)
+        final = paths[:, -1]
+        bands = np.percentile(paths, PERCENTILES, axis=0)
+        invested = initial_value + spec['monthly_contribution'] * 12 * years
+        drift = sampler.blocks.mean() if isinstance(sampler, BlockBootstrap) else sampler.drift
+        
+        return {
+            'method': sampler.method,
+            'paths': len(paths),
+            'horizon_years': years,
+            'initial_value': initial_value,
+            'target_value': spec['target_value'],
+            'monthly_contribution': spec['monthly_contribution'],
+            'success_probability': float(np.mean(final >= spec['target_value'])),
+            'loss_probability': float(np.mean(final < invested)),
+            'final_value': {f'p{p}': float(v) for p, v in zip(PERCENTILES, bands[:, -1])},
+            'bands': {
+                'year': list(range(years + 1)),
+                **{f'p{p}': np.round(band, 2).tolist() for p, band in zip(PERCENTILES, bands)}
+            },
+            'assumptions': {
+                'expected_annual_return': float(np.expm1(drift * 12)),
+                'observations': len(model.returns),
+                'as_of': model.as_of
+            }
+        }
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_goal_simulator: Optional[GoalSimulator] = None
+_goal_simulator_lock = threading.Lock()
+
+
+def get_goal_simulator() -> GoalSimulator:
+    """Get the process-wide goal simulator, configured from settings on first use."""
+    global _goal_simulator
+    if _goal_simulator is None:
+        with _goal_simulator_lock:
+            if _goal_simulator is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _goal_simulator = GoalSimulator(
+                    paths=settings.goal_sim_paths,
+                    chunk_paths=settings.goal_sim_chunk_paths,
+                    workers=settings.goal_sim_workers,
+                    parallel_min_path_years=settings.goal_sim_parallel_min_path_years,
+                    method=settings.goal_sim_method,
+                    long_run_return=settings.goal_sim_long_run_return,
+                    prior_years=settings.goal_sim_prior_years,
+                    seed=settings.goal_sim_seed
+                )
+    return _goal_simulator
@@ -0,0 +1,404 @@
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.utils.metrics import span
+from app.utils.admission import get_downstream_limiter
+from app.utils.cache import CACHE_REQUESTS, DiskCache, MemoryCache
+from app.utils.singleflight import SingleFlight
+
+# yfinance period strings mapped to calendar offsets ("max" means no limit)
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+MARKET_TZ = 'America/New_York'
+MARKET_CLOSE_HOUR = 16
+
+
+def last_market_close(now: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+    """
+    The most recent weekday 4pm close in New York at or before `now`.
+    
+    Exchange holidays aren't modelled; on a holiday this returns that day's
+    (non-existent) close, which only makes day-keyed caches roll over early.
+    """
+    now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else pd.Timestamp(now).tz_convert(MARKET_TZ)
+    close = now.normalize() + pd.Timedelta(hours=MARKET_CLOSE_HOUR)
+    if now < close:
+        close -= pd.Timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= pd.Timedelta(days=1)
+    return close
+
+
+def naive_market_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The history indexed by tz-naive New York dates, the convention of `yf.download`.
+    
+    Single-ticker yfinance histories are tz-aware while batched downloads aren't; every
+    provider returns naive dates so cached frames of either kind can be compared and joined.
+    """
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df = df.copy()
+        df.index = df.index.tz_convert(MARKET_TZ).tz_localize(None)
+    return df
+
+
+def slice_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Slice a full history down to a yfinance-style period ending at its last bar."""
+    if df.empty or period == 'max':
+        return df
+    end = df.index[-1]
+    if period == 'ytd':
+        start = pd.Timestamp(year=end.year, month=1, day=1, tz=end.tz)
+    elif period in PERIOD_OFFSETS:
+        start = end - PERIOD_OFFSETS[period]
+    else:
+        raise ValueError(f"Unsupported period: {period}")
+    return df[df.index > start]
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of daily OHLCV price history shaped like `yf.Ticker(...).history()`, indexed
+    by tz-naive New York dates (see `naive_market_dates`).
+    """
+    
+    name = 'base'
+    # Downloaded histories are also kept in the on-disk history store, shared by every worker
+    shared = False
+    
+    @abstractmethod
+    def get_history(self, ticker: str, period: str = '1y') -> pd.DataFrame:
+        """
+        Get daily price history for one ticker.
+        
+        Args:
+            ticker (str): Stock ticker symbol
+            period (str): yfinance-style period, e.g. "1y", "2y", "max"
+            
+        Returns:
+            pd.DataFrame: History indexed by date with at least Close and Volume columns;
+                empty if the ticker is unknown
+        """
+        pass
+    
+    def get_histories(self, tickers: List[str], period: str = '1y') -> Dict[str, Optional[pd.DataFrame]]:
+        """Get price history for several tickers; failed lookups map to None."""
+        data = {}
+        for ticker in tickers:
+            try:
+                data[ticker] = self.get_history(ticker, period)
+            except Exception:
+                data[ticker] = None
+        return data
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance."""
+    
+    name = 'yfinance'
+    shared = True
+    
+    def get_history(self, ticker: str, period: str = '1y') -> pd.DataFrame:
+        import yfinance as yf
+        with span('fetch', 'yfinance', ticker=ticker), get_downstream_limiter('yfinance'):
+            return naive_market_dates(yf.Ticker(ticker).history(period=period))
+    
+    def get_histories(self, tickers: List[str], period: str = '1y') -> Dict[str, Optional[pd.DataFrame]]:
+        """Download all tickers in one batched request instead of one round trip per ticker."""
+        import yfinance as yf
+        if len(tickers) <= 1:
+            return super().get_histories(tickers, period)
+        
+        try:
+            # One batched download counts as one call against the yfinance limiter
+            with span('fetch', 'yfinance_batch', tickers=len(tickers)), get_downstream_limiter('yfinance'):
+                df = yf.download(
+                    tickers, period=period, group_by='ticker', auto_adjust=True,
+                    actions=True, threads=True, progress=False
+                )
+        except Exception:
+            return super().get_histories(tickers, period)
+        
+        data = {}
+        for ticker in tickers:
+            if isinstance(df.columns, pd.MultiIndex) and ticker in df.columns.get_level_values(0):
+                history = df[ticker].dropna(how='all')
+                data[ticker] = history if not history.empty else None
+            else:
+                data[ticker] = None
+        return data
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Replays recorded history from `<directory>/<TICKER>.parquet` or `<TICKER>.csv`.
+    
+    Files are read once and kept in memory; unknown tickers return an empty frame,
+    matching yfinance's behaviour.
+    """
+    
+    name = 'replay'
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+    
+    def _load(self, ticker: str) -> pd.DataFrame:
+        with self._lock:
+            if ticker in self._frames:
+                return self._frames[ticker]
+        
+        parquet_path = os.path.join(self.directory, f'{ticker}.parquet')
+        csv_path = os.path.join(self.directory, f'{ticker}.csv')
+        if os.path.exists(parquet_path):
+            df = naive_market_dates(pd.read_parquet(parquet_path))
+        elif os.path.exists(csv_path):
+            df = pd.read_csv(csv_path, index_col=0)
+            df.index = pd.to_datetime(df.index, utc=True).tz_convert(MARKET_TZ).tz_localize(None)
+        else:
+            df = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+        df = df.sort_index()
+        
+        with self._lock:
+            self._frames[ticker] = df
+        return df
+    
+    def get_history(self, ticker: str, period: str = '1y') -> pd.DataFrame:
+        with span('fetch', 'replay', ticker=ticker):
+            return slice_period(self._load(ticker), period).copy()
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Deterministic geometric Brownian motion prices.
+    
+    Each ticker gets one path from a fixed origin date seeded by (seed, ticker), so
+    every period is a consistent slice of the same series.
+    """
+    
+    name = 'synthetic'
+    ORIGIN = pd.Timestamp('2000-01-03', tz=MARKET_TZ)
+    
+    def __init__(self, volatility: float = 0.25, drift: float = 0.07, seed: int = 0,
+                 end: Optional[pd.Timestamp] = None):
+        self.volatility = volatility
+        self.drift = drift
+        self.seed = seed
+        if end is None:
+            end = pd.Timestamp.now(tz=MARKET_TZ).normalize()
+        end = pd.Timestamp(end)
+        self.end = end.tz_localize(MARKET_TZ) if end.tz is None else end.tz_convert(MARKET_TZ)
+        self._index = pd.bdate_range(self.ORIGIN, self.end, name='Date').tz_localize(None)
+    
+    def _ticker_seed(self, ticker: str) -> int:
+        return int(hashlib.sha256(f'{self.seed}:{ticker}'.encode()).hexdigest()[:16], 16)
+    
+    def get_history(self, ticker: str, period: str = '1y') -> pd.DataFrame:
+        rng = np.random.default_rng(self._ticker_seed(ticker))
+        days = len(self._index)
+        dt = 1 / 252
+        
+        log_returns = (self.drift - 0.5 * self.volatility ** 2) * dt \
+            + self.volatility * np.sqrt(dt) * rng.standard_normal(days)
+        close = rng.uniform(10, 500) * np.exp(np.cumsum(log_returns))
+        intraday = np.abs(rng.standard_normal(days)) * self.volatility * np.sqrt(dt) * close
+        open_ = close * (1 + rng.normal(0, 0.002, days))
+        
+        df = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) + intraday,
+            'Low': np.minimum(open_, close) - intraday,
+            'Close': close,
+            'Volume': rng.integers(1_000_000, 50_000_000, days),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=self._index)
+        return slice_period(df, period)
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def create_market_data_provider(settings) -> MarketDataProvider:
+    """Build the provider selected by `MARKET_DATA_PROVIDER`."""
+    if settings.market_data_provider == 'yfinance':
+        return YFinanceProvider()
+    if settings.market_data_provider == 'replay':
+        return ReplayProvider(settings.market_data_dir)
+    if settings.market_data_provider == 'synthetic':
+        return SyntheticProvider(volatility=settings.synthetic_volatility, seed=settings.synthetic_seed)
+    raise ValueError(f"Unknown market data provider: {settings.market_data_provider}")
+
+
+def get_market_data_provider() -> MarketDataProvider:
+    """Get the process-wide market data provider, created from settings on first use."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                from app.config import get_settings
+                _provider = create_market_data_provider(get_settings())
+    return _provider
+
+
+def set_market_data_provider(provider: Optional[MarketDataProvider]) -> None:
+    """Override the process-wide provider (None resets to the configured one)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+_price_flights = SingleFlight('prices')
+_price_caches: Dict[str, MemoryCache] = {}
+_history_store: Optional[DiskCache] = None
+
+# Periods from shortest to longest; a cached history serves any period up to its own
+# ("ytd" varies in length through the year, so it only serves itself)
+PERIOD_ORDER = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+
+def _covers(cached_period: str, period: str) -> bool:
+    if cached_period not in PERIOD_ORDER or period not in PERIOD_ORDER:
+        return cached_period == period
+    return PERIOD_ORDER.index(cached_period) >= PERIOD_ORDER.index(period)
+
+
+def get_price_cache(name: str = 'prices', max_entries: int = 1024) -> MemoryCache:
+    """
+    Get this process's cache of downloaded price histories, or of values derived
+    from them (e.g. 'features'), which expire with the histories after `PRICE_CACHE_TTL_SECONDS`.
+    
+    Each uvicorn worker has its own; only the histories are shared, through `get_history_store`.
+    """
+    cache = _price_caches.get(name)
+    if cache is None:
+        with _provider_lock:
+            cache = _price_caches.get(name)
+            if cache is None:
+                from app.config import get_settings
+                cache = _price_caches[name] = MemoryCache(name, max_entries=max_entries, ttl=get_settings().price_cache_ttl_seconds)
+    return cache
+
+
+def get_history_store() -> Optional[DiskCache]:
+    """
+    Get the on-disk store of downloaded price histories under `CACHE_DIR`, shared by
+    every worker process so a history downloaded (or warmed) by one serves the others.
+    None when price caching is off.
+    """
+    global _history_store
+    if _history_store is None:
+        with _provider_lock:
+            if _history_store is None:
+                from app.config import get_settings
+                settings = get_settings()
+                if settings.price_cache_ttl_seconds <= 0:
+                    return None
+                _history_store = DiskCache(
+                    os.path.join(settings.cache_dir, 'prices'), 'price_histories',
+                    ttl=settings.price_cache_ttl_seconds,
+                    max_bytes=settings.price_cache_max_bytes
+                )
+    return _history_store
+
+
+def _history_to_json(period: str, df: pd.DataFrame) -> Dict:
+    # One list per column keeps integer volumes integers, and floats round-trip exactly
+    return {
+        'period': period,
+        'index': [ts.isoformat() for ts in df.index],
+        'index_name': df.index.name,
+        'columns': {str(column): df[column].tolist() for column in df.columns}
+    }
+
+
+def _history_from_json(value: Dict) -> Tuple[str, pd.DataFrame]:
+    index = pd.DatetimeIndex(value['index'], name=value['index_name'])
+    return value['period'], pd.DataFrame(value['columns'], index=index)
+
+
+def _stored_history(provider: MarketDataProvider, ticker: str) -> Optional[Tuple[str, pd.DataFrame]]:
+    """(period, history) of a ticker from the shared history store, copied into this worker's cache."""
+    store = get_history_store()
+    if store is None:
+        return None
+    entry = store.get_entry(f'{provider.name}:{ticker}')
+    if entry is None or entry.age() > store.ttl:
+        CACHE_REQUESTS.inc(cache=store.name, result='miss' if entry is None else 'stale')
+        return None
+    CACHE_REQUESTS.inc(cache=store.name, result='hit')
+    cached = _history_from_json(entry.value)
+    # Expires from memory when the stored copy does
+    get_price_cache().set((id(provider), ticker), cached, stored_at=entry.stored_at)
+    return cached
+
+
+def _cached_history(provider: MarketDataProvider, ticker: str, period: str) -> Optional[pd.DataFrame]:
+    cached = get_price_cache().get((id(provider), ticker))
+    if cached is None and provider.shared:
+        cached = _stored_history(provider, ticker)
+    if cached is None or not _covers(cached[0], period):
+        return None
+    return slice_period(cached[1], period)
+
+
+def _store_history(provider: MarketDataProvider, ticker: str, period: str, df: Optional[pd.DataFrame]) -> None:
+    if df is not None and not df.empty:
+        get_price_cache().set((id(provider), ticker), (period, df))
+        store = get_history_store() if provider.shared else None
+        if store is not None:
+            store.set(f'{provider.name}:{ticker}', _history_to_json(period, df))
+
+
+def fetch_history(ticker: str, period: str = '1y') -> pd.DataFrame:
+    """
+    Price history from the process-wide provider.
+    
+    Histories are kept for `PRICE_CACHE_TTL_SECONDS`, in memory and, for providers
+    that download them, in the on-disk history store shared by all workers; a
+    longer cached period serves shorter ones. Concurrent downloads of the same ticker and period are
+    shared. Each caller gets its own copy.
+    """
+    provider = get_market_data_provider()
+    df = _cached_history(provider, ticker, period)
+    if df is None:
+        def download() -> pd.DataFrame:
+            history = naive_market_dates(provider.get_history(ticker, period))
+            _store_history(provider, ticker, period, history)
+            return history
+        df = _price_flights.do((id(provider), ticker, period), download)
+    return df.copy()
+
+
+def fetch_histories(tickers: List[str], period: str = '1y') -> Dict[str, Optional[pd.DataFrame]]:
+    """`fetch_history` for several tickers, downloading the uncached ones in one batched provider call."""
+    provider = get_market_data_provider()
+    data = {ticker: _cached_history(provider, ticker, period) for ticker in tickers}
+    missing = [ticker for ticker, df in data.items() if df is None]
+    if missing:
+        def download() -> Dict[str, Optional[pd.DataFrame]]:
+            histories = {
+                ticker: None if history is None else naive_market_dates(history)
+                for ticker, history in provider.get_histories(missing, period).items()
+            }
+            for ticker, history in histories.items():
+                _store_history(provider, ticker, period, history)
+            return histories
+        data.update(_price_flights.do((id(provider), tuple(missing), period), download))
+    return {ticker: None if df is None else df.copy() for ticker, df in data.items()}
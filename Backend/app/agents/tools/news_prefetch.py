@@ -0,0 +1,247 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from app.utils.cache import CACHE_REQUESTS
+from app.utils.metrics import registry, span
+from app.agents.tools.dedup import ResearchDeduplicator
+from app.agents.tools.research_tools import ResearchTools
+from app.agents.tools.portfolio_tools import PortfolioTools
+from app.agents.tools.scraper import get_scraper
+
+PREFETCH_ERRORS = registry.counter(
+    'tradeiq_news_prefetch_errors_total',
+    'Background news prefetches that failed, by subject kind.',
+    ('kind',)
+)
+
+
+def ticker_subject(ticker: str) -> str:
+    return f'ticker:{ticker.upper()}'
+
+
+def sector_subject(category: str) -> str:
+    return f'sector:{category}'
+
+
+class NewsStore:
+    """
+    SQLite store of researched news and sentiment per subject (a ticker or a sector),
+    with the time each entry was fetched and how often each subject is requested.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS news (
+                subject TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS demand (
+                subject TEXT PRIMARY KEY,
+                requests INTEGER NOT NULL DEFAULT 0,
+                last_requested REAL NOT NULL
+            );
+        ''')
+
+    def get(self, subject: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Get the stored research for a subject, or None if missing or older than `max_age` seconds."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, fetched_at FROM news WHERE subject = ?', (subject,)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            CACHE_REQUESTS.inc(cache='news', result='miss' if row is None else 'stale')
+            return None
+        CACHE_REQUESTS.inc(cache='news', result='hit')
+        return {**json.loads(row[0]), 'fetched_at': row[1]}
+    
+    def age(self, subject: str) -> Optional[float]:
+        """Seconds since the subject was last fetched, or None if never."""
+        with self._lock:
+            row = self._conn.execute('SELECT fetched_at FROM news WHERE subject = ?', (subject,)).fetchone()
+        return None if row is None else time.time() - row[0]
+    
+    def put(self, subject: str, result: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO news (subject, result, fetched_at) VALUES (?, ?, ?)',
+                (subject, json.dumps(result, default=str), time.time())
+            )
+    
+    def record_requests(self, subjects: List[str]) -> None:
+        """Count a request for each subject so the prefetcher can favour popular ones."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                '''INSERT INTO demand (subject, requests, last_requested) VALUES (?, 1, ?)
+                   ON CONFLICT(subject) DO UPDATE SET requests = requests + 1, last_requested = excluded.last_requested''',
+                [(s, now) for s in subjects]
+            )
+    
+    def popular(self, prefix: str, limit: int) -> List[str]:
+        """Most requested subjects starting with `prefix`."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT subject FROM demand WHERE subject LIKE ? ORDER BY requests DESC, last_requested DESC LIMIT ?',
+                (f'{prefix}%', limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+def research_subject(subject: str, llm, num_results: int = 5) -> Dict[str, Any]:
+    """
+    Search, scrape and score the news for one subject without the agent loop.
+    
+    Returns:
+        Dict[str, Any]: Overall sentiment plus per-article sentiment and key points
+    """
+    kind, name = subject.split(':', 1)
+    query = f'{name} stock news' if kind == 'ticker' else f'{name} sector stock market news'
+    results = ResearchTools.create_google_search_tool().func(query, num_results)
+    
+    deduplicator = ResearchDeduplicator()
+    links = [r['link'] for r in results]
+    texts = get_scraper().scrape_many(links)
+    articles = []
+    for result, text in zip(results, texts):
+        if text.startswith('Error scraping webpage') or deduplicator.filter_article(result['link'], text) is not None:
+            continue
+        articles.append({'title': result['title'], 'link': result['link'], 'text': text})
+    
+    scores = ResearchTools.analyze_sentiments(llm, [a['text'] for a in articles], deduplicator)
+    for article, score in zip(articles, scores):
+        del article['text']
+        article.update(score)
+    
+    # Confidence-weighted vote across articles
+    totals = {'positive': 0.0, 'negative': 0.0, 'neutral': 0.0}
+    for article in articles:
+        label = article.get('sentiment', 'neutral')
+        totals[label] = totals.get(label, 0.0) + float(article.get('confidence', 0))
+    weight = sum(totals.values())
+    sentiment = max(totals, key=totals.get) if weight else 'neutral'
+    
+    return {
+        'subject': subject,
+        'query': query,
+        'sentiment': sentiment,
+        'confidence': round(totals[sentiment] / weight, 3) if weight else 0.0,
+        'articles': articles
+    }
+
+
+def summarize(research: Dict[str, Dict[str, Any]]) -> str:
+    """Readable summary of stored research, in the spirit of the market agent's report."""
+    lines = []
+    for subject, entry in research.items():
+        kind, name = subject.split(':', 1)
+        label = name if kind == 'ticker' else f'{name} sector'
+        points = [p for a in entry.get('articles', []) for p in a.get('key_points', [])[:1]][:3]
+        line = f"{label}: {entry['sentiment']} sentiment (confidence {entry['confidence']}) across {len(entry.get('articles', []))} articles."
+        if points:
+            line += ' Key points: ' + '; '.join(points)
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+class NewsPrefetcher:
+    """
+    Background thread that keeps the news store warm for popular tickers and every sector.
+    
+    Tickers are ranked by how often analyses asked for them, topped up from
+    `PortfolioTools.STOCK_CATEGORIES`; entries older than `refresh_after` seconds
+    are re-researched every `interval` seconds.
+    """
+    
+    def __init__(
+        self,
+        store: NewsStore,
+        llm_factory: Callable[[], Any],
+        interval: float = 900,
+        refresh_after: float = 1800,
+        top_n: int = 20
+    ):
+        self.store = store
+        self.llm_factory = llm_factory
+        self.interval = interval
+        self.refresh_after = refresh_after
+        self.top_n = top_n
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def subjects(self) -> List[str]:
+        tickers = self.store.popular('ticker:', self.top_n)
+        for ticker in PortfolioTools.STOCK_CATEGORIES:
+            if len(tickers) >= self.top_n:
+                break
+            if ticker_subject(ticker) not in tickers:
+                tickers.append(ticker_subject(ticker))
+        sectors = [sector_subject(c) for c in dict.fromkeys(PortfolioTools.STOCK_CATEGORIES.values())]
+        return tickers + sectors
+    
+    def run_once(self) -> int:
+        """Refresh every stale subject once; returns how many were refreshed."""
+        llm = self.llm_factory()
+        refreshed = 0
+        for subject in self.subjects():
+            if self._stop.is_set():
+                break
+            age = self.store.age(subject)
+            if age is not None and age < self.refresh_after:
+                continue
+            kind = subject.split(':', 1)[0]
+            try:
+                with span('prefetch', kind):
+                    self.store.put(subject, research_subject(subject, llm))
+                refreshed += 1
+            except Exception as e:
+                PREFETCH_ERRORS.inc(kind=kind)
+                print(f"News prefetch failed for {subject}: {str(e)}")
+        return refreshed
+    
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"News prefetch cycle failed: {str(e)}")
+            self._stop.wait(self.interval)
+    
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='news-prefetch', daemon=True)
+            self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_news_store: Optional[NewsStore] = None
+_news_store_lock = threading.Lock()
+
+
+def get_news_store() -> NewsStore:
+    """Get the process-wide news store, created on first use."""
+    global _news_store
+    if _news_store is None:
+        with _news_store_lock:
+            if _news_store is None:
+                from app.config import get_settings
+                _news_store = NewsStore(os.path.join(get_settings().cache_dir, 'news.sqlite3'))
+    return _news_store
+
+
+def set_news_store(store: Optional[NewsStore]) -> None:
+    """Replace the process-wide news store (None to rebuild it from settings)."""
+    global _news_store
+    with _news_store_lock:
+        _news_store = store
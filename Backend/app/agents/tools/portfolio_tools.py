@@ -1,11 +1,13 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain.tools import Tool
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
+import json
+from app.utils.metrics import traced
+from app.agents.tools.market_data import fetch_histories
+from app.agents.tools.charts import portfolio_charts, projection_chart, record_chart
+from app.agents.tools.risk_engine import get_risk_engine
 
 class PortfolioTools:
     """Tools for analyzing and assessing investment portfolios."""
@@ -81,25 +83,27 @@ class PortfolioTools:
     @staticmethod
     def _get_stock_data(tickers: List[str], period: str = '1y') -> Dict[str, pd.DataFrame]:
         """Get historical stock data for a list of tickers."""
-        data = {}
-        for ticker in tickers:
-            try:
-                stock = yf.Ticker(ticker)
-                data[ticker] = stock.history(period=period)
-            except Exception as e:
-                data[ticker] = None
-        return data
+        return fetch_histories(tickers, period)
+    
+    @staticmethod
+    def _parse_portfolio_data(portfolio_data: Any) -> Dict[str, Any]:
+        """Accept portfolio data as a dict or as the JSON string single-input tools receive."""
+        if isinstance(portfolio_data, str):
+            portfolio_data = json.loads(portfolio_data)
+        return portfolio_data
     
     @staticmethod
-    def _calculate_portfolio_metrics(portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate various portfolio metrics."""
+    def _calculate_portfolio_metrics(portfolio_data: Dict[str, Any], stock_data: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Any]:
+        """Calculate various portfolio metrics, from `stock_data` if the caller already fetched it."""
+        portfolio_data = PortfolioTools._parse_portfolio_data(portfolio_data)
         assets = portfolio_data['assets']
         
         # Get all ticker symbols
         tickers = [asset['ticker'] for asset in assets]
         
         # Retrieve price data
-        stock_data = PortfolioTools._get_stock_data(tickers)
+        if stock_data is None:
+            stock_data = PortfolioTools._get_stock_data(tickers)
         
         # Calculate total portfolio value
         total_value = 0
@@ -201,48 +205,15 @@ class PortfolioTools:
     def create_portfolio_visualization_tool() -> Tool:
         """Create a tool for visualizing portfolio allocation."""
         
+        @traced('tool', 'PortfolioVisualization')
         def visualize_portfolio(portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
-            """Visualize portfolio allocation using Plotly."""
+            """Visualize portfolio allocation and returns; figures are rendered on request from the chart endpoints."""
             metrics = PortfolioTools._calculate_portfolio_metrics(portfolio_data)
             
-            # Create pie chart for asset allocation
-            asset_fig = px.pie(
-                metrics['assets'], 
-                values='allocation', 
-                names='ticker',
-                title='Portfolio Asset Allocation',
-                hover_data=['value', 'category']
-            )
-            asset_fig.update_traces(textposition='inside', textinfo='percent+label')
-            
-            # Create pie chart for category allocation
-            category_fig = px.pie(
-                metrics['category_allocation'], 
-                values='allocation', 
-                names='category',
-                title='Portfolio Category Allocation'
-            )
-            category_fig.update_traces(textposition='inside', textinfo='percent+label')
-            
-            # Create bar chart for returns
-            if metrics['returns']:
-                returns_data = [{'period': period, 'return': value} for period, value in metrics['returns'].items()]
-                returns_fig = px.bar(
-                    returns_data,
-                    x='period',
-                    y='return',
-                    title='Portfolio Returns',
-                    labels={'return': 'Return (%)', 'period': 'Time Period'}
-                )
-            else:
-                returns_fig = go.Figure()
-                returns_fig.update_layout(title='Portfolio Returns (Insufficient Data)')
-            
+            # Only the series are kept with the analysis; the LLM just sees the chart names
             return {
                 'metrics': metrics,
-                'asset_allocation_chart': asset_fig.to_json(),
-                'category_allocation_chart': category_fig.to_json(),
-                'returns_chart': returns_fig.to_json()
+                'charts': [record_chart(name, chart) for name, chart in portfolio_charts(metrics).items()]
             }
         
         return Tool(
@@ -255,9 +226,24 @@ class PortfolioTools:
     def create_risk_assessment_tool() -> Tool:
         """Create a tool for assessing portfolio risk."""
         
+        @traced('tool', 'RiskAssessment')
         def assess_risk(portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
             """Assess portfolio risk and provide a risk profile."""
-            metrics = PortfolioTools._calculate_portfolio_metrics(portfolio_data)
+            from app.config import get_settings
+            settings = get_settings()
+            
+            portfolio_data = PortfolioTools._parse_portfolio_data(portfolio_data)
+            stock_data = PortfolioTools._get_stock_data([asset['ticker'] for asset in portfolio_data['assets']])
+            metrics = PortfolioTools._calculate_portfolio_metrics(portfolio_data, stock_data)
+            
+            # Correlation-aware risk from the (cached) covariance model of the holdings
+            risk_model = None
+            model = get_risk_engine().model(stock_data)
+            if model is not None:
+                values = {}
+                for asset in metrics['assets']:
+                    values[asset['ticker']] = values.get(asset['ticker'], 0) + float(asset['value'])
+                risk_model = model.assess(values, settings.risk_var_confidence, settings.risk_var_horizon_days)
             
             # Calculate risk factors
             risk_factors = {
@@ -275,9 +261,9 @@ class PortfolioTools:
             else:
                 risk_factors['diversification'] = 1  # Low risk
             
-            # 2. Volatility - if available
-            if 'volatility' in metrics['returns']:
-                volatility = metrics['returns']['volatility']
+            # 2. Volatility - from the covariance model, else the portfolio's history, if available
+            if risk_model is not None or 'volatility' in metrics['returns']:
+                volatility = risk_model['annualized_volatility'] if risk_model is not None else metrics['returns']['volatility']
                 if volatility > 25:
                     risk_factors['volatility'] = 3  # High risk
                 elif volatility > 15:
@@ -355,19 +341,21 @@ class PortfolioTools:
                 },
                 'profile': profile,
                 'recommendations': recommendations,
+                'risk_model': risk_model,
                 'metrics': metrics
             }
         
         return Tool(
             name="RiskAssessment",
             func=assess_risk,
-            description="Assesses portfolio risk and provides a risk profile and recommendations."
+            description="Assesses portfolio risk (volatility, risk contributions, VaR and CVaR) and provides a risk profile and recommendations."
         )
     
     @staticmethod
     def create_category_assessment_tool() -> Tool:
         """Create a tool for assessing portfolio categories."""
         
+        @traced('tool', 'CategoryAssessment')
         def assess_categories(portfolio_data: Dict[str, Any]) -> Dict[str, Any]:
             """Assess portfolio stock categories and their allocations."""
             metrics = PortfolioTools._calculate_portfolio_metrics(portfolio_data)
@@ -423,6 +411,7 @@ class PortfolioTools:
     def create_investment_advisor_tool(llm) -> Tool:
         """Create a tool for investment advice based on goals."""
         
+        @traced('tool', 'InvestmentAdvisor')
         def provide_investment_advice(portfolio_data: Dict[str, Any], goal: str) -> Dict[str, Any]:
             """Provides investment advice based on portfolio and financial goals."""
             # First, get risk assessment
@@ -468,6 +457,26 @@ class PortfolioTools:
             current_profile = risk_assessment['profile']
             metrics = risk_assessment['metrics']
             
+            # Project the portfolio towards the goal; prices and the risk model come from the caches
+            # the risk assessment just filled
+            projection = None
+            projection_summary = "Not available (insufficient price history)"
+            tickers = [asset['ticker'] for asset in metrics['assets']]
+            model = get_risk_engine().model(PortfolioTools._get_stock_data(tickers)) if tickers else None
+            if model is not None:
+                from app.agents.tools.goal_simulator import get_goal_simulator, goal_slug
+                values = {}
+                for asset in metrics['assets']:
+                    values[asset['ticker']] = values.get(asset['ticker'], 0) + float(asset['value'])
+                projection = get_goal_simulator().project(model, values, goal, matched_goal)
+                projection['chart'] = record_chart(f'goal:{goal_slug(goal)}', projection_chart(goal, projection))
+                projection_summary = (
+                    f"{projection['success_probability'] * 100:.0f}% chance of reaching ${projection['target_value']:,.0f} "
+                    f"in {projection['horizon_years']} years (median ${projection['final_value']['p50']:,.0f}, "
+                    f"5th-95th percentile ${projection['final_value']['p5']:,.0f}-${projection['final_value']['p95']:,.0f}, "
+                    f"{projection['paths']:,} simulated paths)"
+                )
+            
             prompt = f"""
             As a financial advisor, provide personalized investment advice based on the following information:
 
@@ -479,11 +488,12 @@ class PortfolioTools:
 
             User's Goal: {goal}
             Target Risk Profile: {target_profile.replace('_', ' ').title()}
+            Projection: {projection_summary}
 
             Provide the following advice:
             1. Overall assessment of the portfolio alignment with the goal
             2. 3-4 specific recommendations for portfolio adjustments (be specific about which types of assets to add or reduce)
-            3. Timeline considerations
+            3. Timeline considerations, taking the projection into account
             4. A recommended allocation model (stocks/bonds/cash percentages)
 
             Format your response as a structured JSON with the following keys:
@@ -524,11 +534,12 @@ class PortfolioTools:
                 "current_risk_profile": current_risk,
                 "target_risk_profile": target_profile.replace('_', ' ').title(),
                 "advice": advice,
+                "projection": projection,
                 "default_recommendations": PortfolioTools.DEFAULT_RECOMMENDATIONS[target_profile]
             }
         
         return Tool(
             name="InvestmentAdvisor",
             func=provide_investment_advice,
-            description="Provides investment advice based on portfolio and financial goals."
+            description="Provides investment advice based on portfolio and financial goals, with a Monte Carlo projection of reaching each goal."
         ) 
\ No newline at end of file
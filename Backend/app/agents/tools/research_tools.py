@@ -1,10 +1,20 @@
 from langchain.tools import Tool
 from langchain.utilities import GoogleSearchAPIWrapper
-import requests
-from bs4 import BeautifulSoup
+import json
 import os
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Optional, Tuple
 from app.config import get_settings
+from app.utils.metrics import traced
+from app.utils.admission import get_downstream_limiter
+from app.agents.tools.scraper import get_scraper
+from app.agents.tools.search_cache import get_search_cache
+from app.agents.tools.dedup import LLM_CALLS_AVOIDED, NearDuplicateIndex, ResearchDeduplicator
+from app.agents.tools.sentiment import SENTIMENT_REQUESTS, get_local_scorer
+
+_SOURCE_HEADER = re.compile(r'^\[(\S+)\]$', re.MULTILINE)
+_PLACEHOLDERS = ("Error scraping webpage", "Duplicate of ")
+
 
 class ResearchTools:
     """Tools for online research and sentiment analysis."""
@@ -18,10 +28,16 @@ class ResearchTools:
             google_cse_id=settings.google_cse_id
         )
         
+        @traced('tool', 'GoogleSearch')
         def google_search(query: str, num_results: int = 5) -> List[Dict[str, str]]:
             """Search Google for information about stocks or market trends."""
-            results = search.results(query, num_results)
-            return [{"title": r["title"], "snippet": r["snippet"], "link": r["link"]} for r in results]
+            def fetch(q: str, n: int) -> List[Dict[str, str]]:
+                with get_downstream_limiter('google'):
+                    results = search.results(q, n)
+                return [{"title": r["title"], "snippet": r["snippet"], "link": r["link"]} for r in results]
+            
+            # Near-identical queries from the same day share one upstream call
+            return get_search_cache().search(query, num_results, fetch)
         
         return Tool(
             name="GoogleSearch",
@@ -30,70 +46,235 @@ class ResearchTools:
         )
     
     @staticmethod
-    def create_web_scraping_tool() -> Tool:
+    def _drop_duplicate(url: str, text: str, deduplicator: Optional[ResearchDeduplicator]) -> str:
+        """Replace an article that repeats one already scraped in this run with a short note."""
+        if deduplicator is None or text.startswith("Error scraping webpage"):
+            return text
+        duplicate_of = deduplicator.filter_article(url, text)
+        if duplicate_of is not None:
+            return f"Duplicate of {duplicate_of} (same story already retrieved); content omitted."
+        return text
+    
+    @staticmethod
+    def create_web_scraping_tool(deduplicator: Optional[ResearchDeduplicator] = None) -> Tool:
         """Creates a tool for web scraping."""
         
+        @traced('tool', 'WebScraper')
         def scrape_webpage(url: str) -> str:
             """Scrape the content of a webpage."""
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            try:
-                response = requests.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract text from paragraphs
-                paragraphs = soup.find_all('p')
-                text = ' '.join([p.get_text().strip() for p in paragraphs])
-                
-                # Limit text length
-                return text[:5000] + ("..." if len(text) > 5000 else "")
-            
-            except Exception as e:
-                return f"Error scraping webpage: {str(e)}"
+            url = url.strip()
+            return ResearchTools._drop_duplicate(url, get_scraper().scrape(url), deduplicator)
+        
+        async def ascrape_webpage(url: str) -> str:
+            url = url.strip()
+            return ResearchTools._drop_duplicate(url, await get_scraper().ascrape(url), deduplicator)
         
         return Tool(
             name="WebScraper",
             func=scrape_webpage,
+            coroutine=ascrape_webpage,
             description="Useful for scraping the content of a webpage to gather detailed information about stocks or market analysis."
         )
     
     @staticmethod
-    def create_sentiment_analysis_tool(llm) -> Tool:
-        """Creates a tool for sentiment analysis using an LLM."""
+    def create_batch_web_scraping_tool(deduplicator: Optional[ResearchDeduplicator] = None) -> Tool:
+        """Creates a tool that scrapes several webpages concurrently."""
+        
+        @traced('tool', 'WebScraperBatch')
+        def scrape_webpages(urls: str) -> str:
+            """Scrape several webpages given one URL per line (or separated by spaces)."""
+            url_list = urls.split()
+            texts = get_scraper().scrape_many(url_list)
+            texts = [ResearchTools._drop_duplicate(url, text, deduplicator) for url, text in zip(url_list, texts)]
+            return '\n\n'.join(f"[{url}]\n{text}" for url, text in zip(url_list, texts))
+        
+        return Tool(
+            name="WebScraperBatch",
+            func=scrape_webpages,
+            description="Scrapes several webpages at once. Input is a list of URLs separated by newlines. Prefer this over WebScraper when reading multiple articles."
+        )
+    
+    @staticmethod
+    def create_sentiment_analysis_tool(llm, deduplicator: Optional[ResearchDeduplicator] = None) -> Tool:
+        """Creates a tool for sentiment analysis: local scorer first, LLM for ambiguous text."""
         
+        @traced('tool', 'SentimentAnalyzer')
         def analyze_sentiment(text: str) -> Dict[str, Any]:
             """Analyze the sentiment of text about stocks or market trends."""
-            prompt = f"""
-            Analyze the sentiment in the following text related to stock market or a specific stock.
-            Return your analysis as a JSON with the following keys:
-            - sentiment: 'positive', 'negative', or 'neutral'
-            - confidence: a number between 0 and 1
-            - key_points: a list of key points from the text
-            
-            Text: {text}
-            
-            Analysis:
-            """
-            
-            response = llm.invoke(prompt)
-            
-            # The response should be a JSON string
-            try:
-                import json
-                return json.loads(response.content)
-            except:
-                # Fallback if LLM doesn't return proper JSON
-                return {
-                    "sentiment": "neutral",
-                    "confidence": 0.5,
-                    "key_points": ["Unable to parse sentiment analysis results"]
-                }
+            return ResearchTools.analyze_sentiments(llm, [text], deduplicator)[0]
         
         return Tool(
             name="SentimentAnalyzer",
             func=analyze_sentiment,
             description="Useful for analyzing the sentiment of text about stocks or market trends."
-        ) 
\ No newline at end of file
+        )
+    
+    @staticmethod
+    def create_batch_sentiment_analysis_tool(llm, deduplicator: Optional[ResearchDeduplicator] = None) -> Tool:
+        """Creates a tool that scores the sentiment of several articles in one call."""
+        
+        @traced('tool', 'SentimentBatchAnalyzer')
+        def analyze_sentiments(texts: str) -> List[Dict[str, Any]]:
+            """Analyze the sentiment of several texts given as a JSON list or WebScraperBatch output."""
+            sources, documents = ResearchTools._split_documents(texts)
+            # Scrape errors and dropped duplicates carry no article text to score
+            scorable = [i for i, doc in enumerate(documents) if not doc.startswith(_PLACEHOLDERS)]
+            scored = ResearchTools.analyze_sentiments(llm, [documents[i] for i in scorable], deduplicator)
+            results = [{'sentiment': 'neutral', 'confidence': 0.0, 'key_points': [doc]} for doc in documents]
+            for i, result in zip(scorable, scored):
+                results[i] = result
+            return [{'source': source, **result} for source, result in zip(sources, results)]
+        
+        return Tool(
+            name="SentimentBatchAnalyzer",
+            func=analyze_sentiments,
+            description="Analyzes the sentiment of several articles at once. Input is a JSON list of texts, or the output of WebScraperBatch. Returns one result per article, in order. Prefer this over calling SentimentAnalyzer once per article."
+        )
+    
+    @staticmethod
+    def _split_documents(texts: str) -> Tuple[List[str], List[str]]:
+        """Split batch tool input into (sources, documents)."""
+        try:
+            parsed = json.loads(texts)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, list):
+            documents = [str(item) for item in parsed]
+            return [str(i) for i in range(len(documents))], documents
+        
+        # WebScraperBatch output: "[url]" header lines followed by the article text
+        parts = _SOURCE_HEADER.split(texts)
+        if len(parts) > 1:
+            return parts[1::2], [part.strip() for part in parts[2::2]]
+        
+        documents = [part.strip() for part in texts.split('\n\n') if part.strip()]
+        return [str(i) for i in range(len(documents))], documents
+    
+    @staticmethod
+    def analyze_sentiments(llm, texts: List[str], deduplicator: Optional[ResearchDeduplicator] = None) -> List[Dict[str, Any]]:
+        """
+        Score the sentiment of several texts, returning one result per text in order.
+        
+        Near-duplicates of texts already scored, or of another text in the batch,
+        reuse their result, confident texts are scored locally, and only the
+        ambiguous remainder is sent to the LLM in batched requests.
+        """
+        settings = get_settings()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        
+        # Syndicated copies of a story already scored reuse its result
+        pending = []
+        for i, text in enumerate(texts):
+            duplicate = deduplicator.lookup_sentiment(text) if deduplicator is not None else None
+            if duplicate is not None:
+                SENTIMENT_REQUESTS.inc(path='duplicate')
+                results[i] = duplicate
+            else:
+                pending.append(i)
+        
+        # Copies of the same story within the batch are scored once
+        batch = NearDuplicateIndex(threshold=deduplicator.scored.threshold if deduplicator is not None else 0.8)
+        copies = {}
+        unique = []
+        for i in pending:
+            signature = batch.hasher.signature(texts[i])
+            original = batch.query(signature)
+            if original is not None:
+                SENTIMENT_REQUESTS.inc(path='duplicate')
+                LLM_CALLS_AVOIDED.inc()
+                copies[i] = int(original)
+            else:
+                batch.add(str(i), signature)
+                unique.append(i)
+        pending = unique
+        
+        escalate = []
+        local = get_local_scorer().score_batch([texts[i] for i in pending])
+        for i, result in zip(pending, local):
+            if result['confidence'] >= settings.sentiment_escalation_threshold:
+                SENTIMENT_REQUESTS.inc(path='local')
+                results[i] = result
+            else:
+                SENTIMENT_REQUESTS.inc(path='llm')
+                escalate.append(i)
+        
+        if escalate:
+            scored = ResearchTools._llm_sentiment_batch(llm, [texts[i] for i in escalate])
+            for i, result in zip(escalate, scored):
+                results[i] = result
+        
+        for i, original in copies.items():
+            results[i] = dict(results[original])
+        
+        if deduplicator is not None:
+            for i in pending:
+                deduplicator.store_sentiment(texts[i], results[i])
+        return results
+    
+    @staticmethod
+    def _llm_sentiment_batch(llm, texts: List[str]) -> List[Dict[str, Any]]:
+        """Score several texts with the LLM, several texts per request and a bounded number of requests in flight."""
+        if len(texts) == 1:
+            return [ResearchTools._llm_sentiment(llm, texts[0])]
+        
+        settings = get_settings()
+        size = max(1, settings.sentiment_batch_size)
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        prompts = [ResearchTools._batch_sentiment_prompt(chunk) for chunk in chunks]
+        responses = llm.batch(prompts, config={'max_concurrency': settings.sentiment_llm_concurrency})
+        
+        results = []
+        for chunk, response in zip(chunks, responses):
+            try:
+                parsed = json.loads(response.content)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, list) and len(parsed) == len(chunk) and all(isinstance(r, dict) for r in parsed):
+                results.extend(parsed)
+            else:
+                # The model didn't return one result per text; score this chunk one text at a time
+                results.extend(ResearchTools._llm_sentiment(llm, text) for text in chunk)
+        return results
+    
+    @staticmethod
+    def _batch_sentiment_prompt(texts: List[str]) -> str:
+        numbered = '\n\n'.join(f"Text {i + 1}:\n{text}" for i, text in enumerate(texts))
+        return f"""
+        Analyze the sentiment of each numbered text below, related to stock market or specific stocks.
+        Return a JSON array with exactly {len(texts)} objects, in the same order as the texts, each with the following keys:
+        - sentiment: 'positive', 'negative', or 'neutral'
+        - confidence: a number between 0 and 1
+        - key_points: a list of key points from the text
+        
+        {numbered}
+        
+        Analysis:
+        """
+    
+    @staticmethod
+    def _llm_sentiment(llm, text: str) -> Dict[str, Any]:
+        """Score the sentiment of one text with the LLM."""
+        prompt = f"""
+        Analyze the sentiment in the following text related to stock market or a specific stock.
+        Return your analysis as a JSON with the following keys:
+        - sentiment: 'positive', 'negative', or 'neutral'
+        - confidence: a number between 0 and 1
+        - key_points: a list of key points from the text
+        
+        Text: {text}
+        
+        Analysis:
+        """
+        
+        response = llm.invoke(prompt)
+        
+        # The response should be a JSON string
+        try:
+            return json.loads(response.content)
+        except:
+            # Fallback if LLM doesn't return proper JSON
+            return {
+                "sentiment": "neutral",
+                "confidence": 0.5,
+                "key_points": ["Unable to parse sentiment analysis results"]
+            }
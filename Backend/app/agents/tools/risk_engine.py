@@ -0,0 +1,269 @@
+import threading
+from collections import OrderedDict
+from statistics import NormalDist
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from app.agents.tools.market_data import naive_market_dates
+from app.utils.cache import CACHE_REQUESTS
+from app.utils.metrics import span
+
+TRADING_DAYS = 252
+
+# Fewer overlapping daily returns than this can't support a covariance estimate
+MIN_OBSERVATIONS = 20
+
+
+def ledoit_wolf(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity.
+    
+    Args:
+        returns (np.ndarray): (observations, assets) matrix of returns
+    
+    Returns:
+        Tuple[np.ndarray, float]: The shrunk covariance and the shrinkage intensity in [0, 1]
+    """
+    t, n = returns.shape
+    x = returns - returns.mean(axis=0)
+    sample = x.T @ x / t
+    mu = np.trace(sample) / n
+    # ||S||_F^2 through the (t, t) Gram matrix, which is smaller than S for wide panels
+    gram = x @ x.T
+    sample_norm = np.sum(gram ** 2) / t ** 2
+    delta = (sample_norm - 2 * mu * np.trace(sample) + n * mu ** 2) / n
+    beta = (np.sum(np.diag(gram) ** 2) - t * sample_norm) / (n * t ** 2)
+    shrinkage = 0.0 if delta <= 0 else float(min(beta, delta) / delta)
+    covariance = (1 - shrinkage) * sample
+    covariance[np.diag_indices(n)] += shrinkage * mu
+    return covariance, shrinkage
+
+
+def return_panel(histories: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Daily close-to-close returns of every ticker with history, on the dates they all share.
+    
+    tz-aware histories are aligned on their New York dates, so they join with naive ones.
+    """
+    closes = {
+        ticker: naive_market_dates(df)['Close'] for ticker, df in histories.items()
+        if df is not None and not df.empty and 'Close' in df.columns
+    }
+    if not closes:
+        return pd.DataFrame()
+    panel = pd.concat(closes, axis=1, join='inner').sort_index()
+    return panel.pct_change().iloc[1:].dropna(how='any')
+
+
+class RiskModel:
+    """
+    Covariance model of a universe of tickers, estimated from their aligned daily returns.
+    
+    Scoring a portfolio over the universe is a few matrix products on its weights,
+    and `assess_many` scores several weight vectors at once.
+    """
+    
+    def __init__(self, tickers: Sequence[str], returns: np.ndarray, as_of: str):
+        self.tickers = list(tickers)
+        self.index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.returns = returns
+        self.as_of = as_of
+        self.mean = returns.mean(axis=0)
+        self.covariance, self.shrinkage = ledoit_wolf(returns)
+    
+    @classmethod
+    def from_histories(cls, histories: Dict[str, Optional[pd.DataFrame]]) -> Optional['RiskModel']:
+        """Build a model from price histories, or None without enough overlapping history."""
+        panel = return_panel(histories)
+        if len(panel) < MIN_OBSERVATIONS:
+            return None
+        return cls([str(t) for t in panel.columns], panel.to_numpy(dtype=float), panel.index[-1].date().isoformat())
+    
+    def subset(self, tickers: Sequence[str]) -> 'RiskModel':
+        """The model restricted to some of its tickers, without re-estimating anything."""
+        positions = [self.index[ticker] for ticker in tickers]
+        model = object.__new__(RiskModel)
+        model.tickers = list(tickers)
+        model.index = {ticker: i for i, ticker in enumerate(model.tickers)}
+        model.returns = self.returns[:, positions]
+        model.as_of = self.as_of
+        model.mean = self.mean[positions]
+        model.covariance = self.covariance[np.ix_(positions, positions)]
+        model.shrinkage = self.shrinkage
+        return model
+    
+    def weights(self, values: Dict[str, float]) -> np.ndarray:
+        """Weights in the model's ticker order from position values; tickers outside the model get none."""
+        w = np.zeros(len(self.tickers))
+        for ticker, value in values.items():
+            if ticker in self.index:
+                w[self.index[ticker]] += value
+        total = w.sum()
+        return w / total if total > 0 else w
+    
+    def assess_many(self, weights: np.ndarray, confidence: float = 0.95, horizon_days: int = 1) -> Dict[str, np.ndarray]:
+        """
+        Risk of several portfolios at once.
+        
+        Args:
+            weights (np.ndarray): (portfolios, tickers) matrix of weights
+            confidence (float): VaR/CVaR confidence level
+            horizon_days (int): VaR/CVaR horizon; daily figures are scaled by sqrt(horizon)
+        
+        Returns:
+            Dict[str, np.ndarray]: Per-portfolio daily and annualized volatility, parametric and
+            historical VaR and CVaR (as positive loss fractions), and per-ticker marginal and
+            component risk contributions
+        """
+        w = np.atleast_2d(weights)
+        sigma_w = w @ self.covariance
+        volatility = np.sqrt(np.maximum(np.einsum('ij,ij->i', sigma_w, w), 0))
+        safe = np.where(volatility > 0, volatility, 1)
+        marginal = sigma_w / safe[:, None]
+        component = w * marginal
+        
+        scale = np.sqrt(horizon_days)
+        mean = (w @ self.mean) * horizon_days
+        z = NormalDist().inv_cdf(confidence)
+        parametric_var = z * volatility * scale - mean
+        parametric_cvar = NormalDist().pdf(z) / (1 - confidence) * volatility * scale - mean
+        
+        # Historical simulation over the same return panel, all portfolios in one product
+        portfolio_returns = self.returns @ w.T
+        cutoff = np.quantile(portfolio_returns, 1 - confidence, axis=0)
+        tail = portfolio_returns <= cutoff
+        tail_mean = (portfolio_returns * tail).sum(axis=0) / np.maximum(tail.sum(axis=0), 1)
+        
+        return {
+            'volatility': volatility,
+            'annualized_volatility': volatility * np.sqrt(TRADING_DAYS),
+            'parametric_var': parametric_var,
+            'parametric_cvar': parametric_cvar,
+            'historical_var': -cutoff * scale,
+            'historical_cvar': -tail_mean * scale,
+            'marginal_contribution': marginal,
+            'component_contribution': component
+        }
+    
+    def assess(self, values: Dict[str, float], confidence: float = 0.95, horizon_days: int = 1) -> Dict[str, Any]:
+        """
+        Risk of one portfolio given its position values.
+        
+        Returns:
+            Dict[str, Any]: Volatility (annualized, %), VaR and CVaR (% and currency), and each
+            holding's weight, marginal contribution and share of portfolio risk, largest first
+        """
+        w = self.weights(values)
+        result = self.assess_many(w, confidence, horizon_days)
+        total_value = sum(values.values())
+        volatility = float(result['volatility'][0])
+        
+        contributions = []
+        for i in np.argsort(-result['component_contribution'][0]):
+            if w[i] == 0:
+                continue
+            contributions.append({
+                'ticker': self.tickers[i],
+                'weight': float(w[i]) * 100,
+                'marginal_contribution': float(result['marginal_contribution'][0, i] * np.sqrt(TRADING_DAYS)) * 100,
+                'risk_contribution': float(result['component_contribution'][0, i]) / volatility * 100 if volatility > 0 else 0.0
+            })
+        
+        def loss(name: str) -> Dict[str, float]:
+            fraction = float(result[name][0])
+            return {'percent': fraction * 100, 'value': fraction * total_value}
+        
+        return {
+            'as_of': self.as_of,
+            'observations': len(self.returns),
+            'shrinkage': self.shrinkage,
+            'confidence': confidence,
+            'horizon_days': horizon_days,
+            'annualized_volatility': float(result['annualized_volatility'][0]) * 100,
+            'parametric_var': loss('parametric_var'),
+            'parametric_cvar': loss('parametric_cvar'),
+            'historical_var': loss('historical_var'),
+            'historical_cvar': loss('historical_cvar'),
+            'risk_contributions': contributions
+        }
+
+
+class RiskEngine:
+    """
+    Caches risk models per universe of tickers and as-of date.
+    
+    A portfolio whose tickers are all in a cached model for the same date is
+    scored on a slice of that model, so only new universes (or a new trading
+    day) estimate a covariance matrix. The slice is only used when the cached
+    universe's histories start no later than the portfolio's own, so a
+    short-history member never truncates another portfolio's window.
+    """
+    
+    def __init__(self, max_models: int = 32):
+        self.max_models = max_models
+        self._lock = threading.Lock()
+        # (as-of date, tickers) -> (model, first date all its histories cover)
+        self._models: 'OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[RiskModel, str]]' = OrderedDict()
+    
+    def _cached(self, tickers: Tuple[str, ...], as_of: str, start: str) -> Optional[RiskModel]:
+        with self._lock:
+            entry = self._models.get((as_of, tickers))
+            if entry is not None:
+                self._models.move_to_end((as_of, tickers))
+                return entry[0]
+            wanted = set(tickers)
+            for (date, universe), (candidate, candidate_start) in reversed(self._models.items()):
+                if date == as_of and candidate_start <= start and wanted.issubset(universe):
+                    return candidate.subset(tickers)
+        return None
+    
+    def model(self, histories: Dict[str, Optional[pd.DataFrame]]) -> Optional[RiskModel]:
+        """
+        The risk model for the tickers with history, from the cache when possible.
+        
+        The as-of date is the latest date all histories share, so models roll over
+        once per trading day.
+        """
+        usable = {
+            t: naive_market_dates(df) for t, df in histories.items()
+            if df is not None and not df.empty and 'Close' in df.columns
+        }
+        if not usable:
+            return None
+        as_of = min(df.index[-1] for df in usable.values()).date().isoformat()
+        start = max(df.index[0] for df in usable.values()).date().isoformat()
+        tickers = tuple(sorted(usable))
+        
+        model = self._cached(tickers, as_of, start)
+        if model is not None:
+            CACHE_REQUESTS.inc(cache='risk_models', result='hit')
+            return model
+        
+        CACHE_REQUESTS.inc(cache='risk_models', result='miss')
+        with span('risk', 'covariance', tickers=len(tickers)):
+            model = RiskModel.from_histories({t: usable[t] for t in tickers})
+        if model is not None:
+            with self._lock:
+                self._models[(as_of, tickers)] = (model, start)
+                while len(self._models) > self.max_models:
+                    self._models.popitem(last=False)
+        return model
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+_risk_engine: Optional[RiskEngine] = None
+_risk_engine_lock = threading.Lock()
+
+
+def get_risk_engine() -> RiskEngine:
+    """Get the process-wide risk engine, configured from settings on first use."""
+    global _risk_engine
+    if _risk_engine is None:
+        with _risk_engine_lock:
+            if _risk_engine is None:
+                from app.config import get_settings
+                _risk_engine = RiskEngine(get_settings().risk_model_cache_entries)
+    return _risk_engine
@@ -0,0 +1,169 @@
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup, SoupStrainer
+from app.utils.cache import CACHE_REQUESTS, DiskCache
+from app.utils.metrics import span
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+def extract_text(html: bytes, encoding: str = 'utf-8', max_chars: int = 5000) -> str:
+    """Extract paragraph text from (possibly truncated) HTML and limit its length."""
+    # Only <p> elements are kept, so the parser skips building the rest of the tree
+    soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('p'), from_encoding=encoding)
+    text = ' '.join([p.get_text().strip() for p in soup.find_all('p')])
+    return text[:max_chars] + ("..." if len(text) > max_chars else "")
+
+
+class _LoopThread:
+    """Event loop running in a daemon thread, so sync callers can share one async client."""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='scraper-loop', daemon=True)
+        self.thread.start()
+    
+    def run(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    async def run_async(self, coro) -> Any:
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+
+class AsyncScraper:
+    """
+    Web page scraper with a shared connection pool and an on-disk text cache.
+    
+    Requests are limited per host, bodies are streamed and cut off at `max_bytes`,
+    and stale cache entries are revalidated with ETag/Last-Modified so unchanged
+    pages cost a 304 instead of a download.
+    """
+    
+    def __init__(self, cache: DiskCache, max_connections: int = 20, per_host_limit: int = 4,
+                 timeout: float = 10.0, max_bytes: int = 1_000_000, max_chars: int = 5000):
+        self.cache = cache
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self._runner = _LoopThread()
+        self._client = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+    
+    def _get_client(self):
+        # Created lazily on the scraper loop, which owns the client's connections
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                headers={'User-Agent': USER_AGENT},
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+    
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+    
+    async def _scrape(self, url: str) -> str:
+        entry = self.cache.get_entry(url)
+        if entry is None:
+            CACHE_REQUESTS.inc(cache=self.cache.name, result='miss')
+        elif self.cache.ttl is not None and entry.age() <= self.cache.ttl:
+            CACHE_REQUESTS.inc(cache=self.cache.name, result='hit')
+            return entry.value['text']
+        else:
+            CACHE_REQUESTS.inc(cache=self.cache.name, result='stale')
+        
+        headers = {}
+        if entry is not None:
+            if entry.value.get('etag'):
+                headers['If-None-Match'] = entry.value['etag']
+            if entry.value.get('last_modified'):
+                headers['If-Modified-Since'] = entry.value['last_modified']
+        
+        host = urlparse(url).netloc
+        with span('fetch', 'scrape', host=host) as attrs:
+            async with self._host_limit(host):
+                async with self._get_client().stream('GET', url, headers=headers) as response:
+                    if response.status_code == 304 and entry is not None:
+                        attrs['status'] = 304
+                        self.cache.set(url, entry.value)
+                        return entry.value['text']
+                    response.raise_for_status()
+                    
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body.extend(chunk)
+                        if len(body) >= self.max_bytes:
+                            attrs['truncated'] = True
+                            break
+                    encoding = response.encoding or 'utf-8'
+                    validators = {
+                        'etag': response.headers.get('etag'),
+                        'last_modified': response.headers.get('last-modified')
+                    }
+            attrs['bytes'] = len(body)
+        
+        text = extract_text(bytes(body[:self.max_bytes]), encoding, self.max_chars)
+        self.cache.set(url, {'text': text, **validators})
+        return text
+    
+    async def _scrape_safe(self, url: str) -> str:
+        try:
+            return await self._scrape(url)
+        except Exception as e:
+            return f"Error scraping webpage: {str(e)}"
+    
+    async def _scrape_many(self, urls: List[str]) -> List[str]:
+        return list(await asyncio.gather(*[self._scrape_safe(url) for url in urls]))
+    
+    def scrape(self, url: str) -> str:
+        """Scrape one page from synchronous code (agent tools)."""
+        return self._runner.run(self._scrape_safe(url))
+    
+    def scrape_many(self, urls: List[str]) -> List[str]:
+        """Scrape several pages concurrently, returning texts in input order."""
+        return self._runner.run(self._scrape_many(urls))
+    
+    async def ascrape(self, url: str) -> str:
+        """Scrape one page from another event loop."""
+        return await self._runner.run_async(self._scrape_safe(url))
+    
+    async def ascrape_many(self, urls: List[str]) -> List[str]:
+        return await self._runner.run_async(self._scrape_many(urls))
+
+
+_scraper: Optional[AsyncScraper] = None
+_scraper_lock = threading.Lock()
+
+
+def get_scraper() -> AsyncScraper:
+    """Get the process-wide scraper, configured from settings on first use."""
+    global _scraper
+    if _scraper is None:
+        with _scraper_lock:
+            if _scraper is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _scraper = AsyncScraper(
+                    cache=DiskCache(
+                        os.path.join(settings.cache_dir, 'scrape'), 'scrape',
+                        ttl=settings.scrape_cache_ttl_seconds,
+                        max_bytes=settings.scrape_cache_max_bytes
+                    ),
+                    max_connections=settings.scrape_max_connections,
+                    per_host_limit=settings.scrape_per_host_limit,
+                    timeout=settings.scrape_timeout_seconds,
+                    max_bytes=settings.scrape_max_bytes
+                )
+    return _scraper
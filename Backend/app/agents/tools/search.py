@@ -3,12 +3,18 @@ from typing import List
 from langchain.utilities import GoogleSearchAPIWrapper
 from dotenv import load_dotenv
 from langchain.tools import Tool
+from app.agents.tools.search_cache import get_search_cache
+from app.utils.admission import get_downstream_limiter
 
 load_dotenv()
 
 def google_search(query: str, num_results: int = 3) -> List[str]:
-    search = GoogleSearchAPIWrapper()
-    results = search.results(query, num_results)
+    def fetch(q: str, n: int):
+        with get_downstream_limiter('google'):
+            results = GoogleSearchAPIWrapper().results(q, n)
+        return [{"title": r["title"], "snippet": r["snippet"], "link": r["link"]} for r in results]
+    
+    results = get_search_cache().search(query, num_results, fetch)
     return [result["snippet"] for result in results]
 
 def searchtool():
@@ -0,0 +1,80 @@
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from app.utils.cache import DiskCache
+from app.utils.singleflight import SingleFlight
+
+# Words that don't change what a search returns
+FILLER_WORDS = {'a', 'an', 'the', 'of', 'for', 'on', 'about', 'and', 'in', 'to', 'latest', 'recent', 'current', 'today'}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so near-identical queries share a cache entry.
+    
+    Lowercases, strips punctuation (keeping $ & . - inside tokens), drops filler
+    words and sorts the remaining unique tokens, so "AAPL stock news" and
+    "latest news on aapl stock" normalize to the same key.
+    """
+    tokens = re.findall(r"[a-z0-9$&][a-z0-9$&.\-]*", query.lower())
+    tokens = {t.strip('.-') for t in tokens} - FILLER_WORDS
+    return ' '.join(sorted(t for t in tokens if t))
+
+
+class SearchCache:
+    """
+    Cache of search results keyed on normalized query text and a date bucket,
+    with in-flight deduplication of identical concurrent queries.
+    """
+    
+    def __init__(self, cache: DiskCache, bucket_seconds: int = 24 * 3600):
+        self.cache = cache
+        self.bucket_seconds = bucket_seconds
+        self.flights = SingleFlight('search')
+    
+    def key(self, query: str) -> str:
+        bucket = int(time.time() // self.bucket_seconds)
+        return f'{normalize_query(query)}|{bucket}'
+    
+    def search(self, query: str, num_results: int, fetch: Callable[[str, int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Return cached results for the query, calling `fetch(query, num_results)` on a miss.
+        
+        An entry fetched with more results serves requests for fewer.
+        """
+        key = self.key(query)
+        cached = self.cache.get(key)
+        if cached is not None and cached['requested'] >= num_results:
+            return cached['results'][:num_results]
+        
+        def fetch_and_store() -> Dict[str, Any]:
+            entry = {'requested': num_results, 'results': fetch(query, num_results)}
+            self.cache.set(key, entry)
+            return entry
+        
+        entry = self.flights.do((key, num_results), fetch_and_store)
+        return entry['results'][:num_results]
+
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Get the process-wide search cache, configured from settings on first use."""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _search_cache = SearchCache(
+                    DiskCache(
+                        os.path.join(settings.cache_dir, 'search'), 'search',
+                        ttl=settings.search_cache_bucket_hours * 3600
+                    ),
+                    bucket_seconds=settings.search_cache_bucket_hours * 3600
+                )
+    return _search_cache
@@ -0,0 +1,167 @@
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.utils.metrics import registry
+
+SENTIMENT_REQUESTS = registry.counter(
+    'tradeiq_sentiment_requests_total',
+    'Sentiment requests by scoring path (local fast path, llm escalation, duplicate reuse).',
+    ('path',)
+)
+
+# Finance lexicon: term -> polarity weight. Phrases carry more weight than single words.
+POSITIVE_TERMS = {
+    'beat': 1.0, 'beats': 1.0, 'surge': 1.0, 'surged': 1.0, 'surges': 1.0, 'soar': 1.0, 'soared': 1.0,
+    'soars': 1.0, 'rally': 1.0, 'rallied': 1.0, 'rallies': 1.0, 'jump': 0.8, 'jumped': 0.8, 'jumps': 0.8,
+    'gain': 0.7, 'gains': 0.7, 'gained': 0.7, 'rise': 0.6, 'rises': 0.6, 'rose': 0.6, 'climb': 0.7,
+    'climbed': 0.7, 'upgrade': 1.2, 'upgraded': 1.2, 'upgrades': 1.2, 'outperform': 1.0,
+    'outperformed': 1.0, 'overweight': 0.8, 'bullish': 1.2, 'record': 0.7, 'strong': 0.7,
+    'stronger': 0.7, 'robust': 0.8, 'growth': 0.5, 'profit': 0.5, 'profitable': 0.8, 'exceeded': 1.0,
+    'exceeds': 1.0, 'raised': 0.6, 'raises': 0.6, 'boost': 0.7, 'boosted': 0.7, 'optimistic': 0.9,
+    'optimism': 0.9, 'expansion': 0.5, 'momentum': 0.4, 'breakthrough': 0.9, 'approval': 0.7,
+    'approved': 0.7, 'buyback': 0.6, 'dividend': 0.3, 'upside': 0.8, 'recovery': 0.6, 'rebound': 0.7,
+    'rebounded': 0.7, 'accelerating': 0.6, 'tailwind': 0.7, 'tailwinds': 0.7, 'win': 0.6, 'wins': 0.6,
+    'beat expectations': 1.8, 'beat estimates': 1.8, 'topped estimates': 1.8, 'raised guidance': 1.8,
+    'raises guidance': 1.8, 'price target raised': 1.5, 'raised its price target': 1.5,
+    'record revenue': 1.5, 'record high': 1.3, 'all-time high': 1.3, 'strong demand': 1.3,
+    'better than expected': 1.6, 'better-than-expected': 1.6, 'buy rating': 1.2, 'margin expansion': 1.3,
+}
+NEGATIVE_TERMS = {
+    'miss': 1.0, 'missed': 1.0, 'misses': 1.0, 'plunge': 1.2, 'plunged': 1.2, 'plunges': 1.2,
+    'tumble': 1.0, 'tumbled': 1.0, 'slump': 1.0, 'slumped': 1.0, 'sink': 0.8, 'sank': 0.8, 'drop': 0.7,
+    'dropped': 0.7, 'drops': 0.7, 'fall': 0.6, 'fell': 0.6, 'falls': 0.6, 'decline': 0.6,
+    'declined': 0.6, 'declines': 0.6, 'loss': 0.7, 'losses': 0.7, 'downgrade': 1.2, 'downgraded': 1.2,
+    'downgrades': 1.2, 'underperform': 1.0, 'underweight': 0.8, 'bearish': 1.2, 'weak': 0.8,
+    'weaker': 0.8, 'weakness': 0.8, 'lawsuit': 0.9, 'probe': 0.8, 'investigation': 0.8, 'fraud': 1.5,
+    'bankruptcy': 1.8, 'default': 1.0, 'layoffs': 0.9, 'recall': 0.9, 'warning': 0.8, 'warns': 0.9,
+    'cut': 0.6, 'cuts': 0.6, 'slashed': 1.0, 'concern': 0.5, 'concerns': 0.5, 'risk': 0.3, 'risks': 0.3,
+    'pessimistic': 0.9, 'selloff': 1.0, 'sell-off': 1.0, 'headwind': 0.7, 'headwinds': 0.7,
+    'slowdown': 0.8, 'volatile': 0.4, 'uncertainty': 0.5, 'fine': 0.3, 'fined': 0.9, 'penalty': 0.8,
+    'missed expectations': 1.8, 'missed estimates': 1.8, 'cut guidance': 1.8, 'cuts guidance': 1.8,
+    'lowered guidance': 1.8, 'profit warning': 1.8, 'price target cut': 1.5, 'lowered its price target': 1.5,
+    'worse than expected': 1.6, 'worse-than-expected': 1.6, 'sell rating': 1.2, 'margin pressure': 1.3,
+    'weak demand': 1.3, 'class action': 1.2, 'going concern': 1.8,
+}
+NEGATIONS = r"not|no|never|without|hardly|didn't|doesn't|don't|isn't|wasn't|won't|failed to|fails to"
+
+_NEGATION_RE = re.compile(rf"\b(?:{NEGATIONS})\s+(\w+)", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+TOKEN_PATTERN = r"(?u)\b\w[\w'-]*\b"
+
+
+def _mark_negations(text: str) -> str:
+    """Prefix the word after a negation with "not_" so "not strong" doesn't count as positive."""
+    return _NEGATION_RE.sub(lambda m: f"not_{m.group(1)}", text)
+
+
+class LocalSentimentScorer:
+    """
+    CPU-only sentiment scorer: a linear model over hashed word n-grams (up to trigrams).
+    
+    Weights default to the finance lexicon above (with negated terms flipped) and
+    can be replaced by a trained model saved as an .npz file with a `weights`
+    array of length `n_features`. Scoring is vectorized over batches of documents.
+    """
+    
+    def __init__(self, n_features: int = 2 ** 18, model_path: Optional[str] = None):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 3), alternate_sign=False,
+            norm=None, token_pattern=TOKEN_PATTERN, lowercase=True
+        )
+        if model_path and os.path.exists(model_path):
+            self.weights = np.load(model_path)['weights'].astype(np.float64)
+        else:
+            self.weights = self._lexicon_weights(n_features)
+        self._positive = np.clip(self.weights, 0, None)
+        self._negative = np.clip(-self.weights, 0, None)
+    
+    def _lexicon_weights(self, n_features: int) -> np.ndarray:
+        from sklearn.feature_extraction.text import HashingVectorizer
+        
+        weights = np.zeros(n_features)
+        for terms, sign in ((POSITIVE_TERMS, 1.0), (NEGATIVE_TERMS, -1.0)):
+            for n in (1, 2, 3):
+                vocab = [t for t in terms if len(re.findall(TOKEN_PATTERN, t)) == n]
+                if not vocab:
+                    continue
+                # Hash each phrase as a single n-gram so its index matches the scoring vectorizer
+                hasher = HashingVectorizer(
+                    n_features=n_features, ngram_range=(n, n), alternate_sign=False,
+                    norm=None, token_pattern=TOKEN_PATTERN, lowercase=True
+                )
+                for term, index in zip(vocab, hasher.transform(vocab).indices):
+                    weights[index] += sign * terms[term]
+                if n == 1:
+                    negated = hasher.transform([f"not_{t}" for t in vocab]).indices
+                    for term, index in zip(vocab, negated):
+                        weights[index] -= sign * terms[term] * 0.5
+        return weights
+    
+    def _polarity(self, texts: List[str]):
+        """Positive and negative evidence per text."""
+        X = self.vectorizer.transform([_mark_negations(t) for t in texts])
+        return X @ self._positive, X @ self._negative
+    
+    def score_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Score a batch of texts.
+        
+        Returns:
+            List[Dict[str, Any]]: One result per text with sentiment, confidence and key_points
+        """
+        if not texts:
+            return []
+        positive, negative = self._polarity(texts)
+        evidence = positive + negative
+        polarity = np.divide(positive - negative, evidence, out=np.zeros_like(evidence), where=evidence > 0)
+        # Confidence needs both a clear direction and enough evidence behind it
+        confidence = np.abs(polarity) * (1 - np.exp(-evidence / 2))
+        
+        # Score every sentence of every document in one pass for key points
+        sentences = [[s for s in _SENTENCE_RE.split(t.strip()) if s] for t in texts]
+        flat = [s for doc in sentences for s in doc]
+        s_pos, s_neg = self._polarity(flat) if flat else (np.array([]), np.array([]))
+        
+        results = []
+        offset = 0
+        for i, doc in enumerate(sentences):
+            if polarity[i] > 0:
+                sentiment = 'positive'
+            elif polarity[i] < 0:
+                sentiment = 'negative'
+            else:
+                sentiment = 'neutral'
+            
+            doc_scores = (s_pos - s_neg)[offset:offset + len(doc)] * (1 if polarity[i] >= 0 else -1)
+            order = np.argsort(-doc_scores)[:3]
+            key_points = [doc[j].strip() for j in order if doc_scores[j] > 0] or doc[:1]
+            offset += len(doc)
+            
+            results.append({
+                'sentiment': sentiment,
+                'confidence': round(float(confidence[i]), 3),
+                'key_points': key_points
+            })
+        return results
+    
+    def score(self, text: str) -> Dict[str, Any]:
+        return self.score_batch([text])[0]
+
+
+_scorer: Optional[LocalSentimentScorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_local_scorer() -> LocalSentimentScorer:
+    """Get the process-wide local scorer, built on first use."""
+    global _scorer
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                from app.config import get_settings
+                _scorer = LocalSentimentScorer(model_path=get_settings().sentiment_model_path or None)
+    return _scorer
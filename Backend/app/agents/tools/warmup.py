@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.metrics import registry, span
+
+WARMUPS = registry.counter(
+    'tradeiq_portfolio_warmups_total',
+    'Background portfolio warm-ups by result (done, cancelled, skipped, error).',
+    ('result',)
+)
+
+# Portfolios whose last warm-up is remembered, to skip re-warming unchanged holdings
+MAX_TRACKED = 1024
+
+
+class WarmupCancelled(Exception):
+    """Raised inside a warm-up when its portfolio was cleared or replaced."""
+
+
+class PortfolioWarmer:
+    """
+    Warms the caches an analysis of a stored portfolio will hit, in the background.
+    
+    For each portfolio it downloads price history for every holding (the longest
+    period the tools use, so shorter ones are served from it), builds the
+    forecast features, and trains the forecast for the largest holding. Warm-ups
+    run one at a time on a single thread so they never compete with requests for
+    more than one core. Warming a portfolio again cancels its previous warm-up;
+    cancellation takes effect between stages.
+    
+    Every uvicorn worker has its own warmer. Downloaded histories land in the
+    shared on-disk history store, so they serve all workers; features and the
+    forecast only warm the worker that ran the warm-up (others rebuild features
+    from the stored histories in milliseconds). Cancelling only reaches warm-ups
+    of the same worker; one left running elsewhere just fills caches.
+    """
+    
+    def __init__(self, period: str = '2y', forecast_days: int = 30, rewarm_after: float = 900):
+        self.period = period
+        self.forecast_days = forecast_days
+        self.rewarm_after = rewarm_after
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='portfolio-warmup')
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, threading.Event] = {}
+        self._warmed: Dict[str, Tuple[Tuple, float]] = {}
+    
+    @staticmethod
+    def _holdings(assets: List[Dict[str, Any]]) -> Dict[str, float]:
+        holdings: Dict[str, float] = {}
+        for asset in assets:
+            ticker = str(asset['ticker']).upper()
+            holdings[ticker] = holdings.get(ticker, 0.0) + float(asset.get('quantity', 0))
+        return holdings
+    
+    def warm(self, portfolio_id: str, assets: List[Dict[str, Any]], force: bool = False) -> None:
+        """
+        Start warming a portfolio's caches unless the same holdings were warmed recently.
+        
+        Args:
+            portfolio_id: Stored portfolio id
+            assets: The portfolio assets
+            force: Warm even if the same holdings were warmed recently (e.g. after a new upload)
+        """
+        holdings = self._holdings(assets)
+        if not holdings:
+            return
+        signature = tuple(sorted(holdings.items()))
+        with self._lock:
+            warmed = self._warmed.get(portfolio_id)
+            if not force and warmed is not None and warmed[0] == signature and time.time() - warmed[1] < self.rewarm_after:
+                WARMUPS.inc(result='skipped')
+                return
+            previous = self._jobs.get(portfolio_id)
+            if previous is not None:
+                previous.set()
+            cancelled = threading.Event()
+            self._jobs[portfolio_id] = cancelled
+            self._warmed.pop(portfolio_id, None)
+            self._warmed[portfolio_id] = (signature, time.time())
+            if len(self._warmed) > MAX_TRACKED:
+                self._warmed.pop(next(iter(self._warmed)))
+        self._executor.submit(self._run, portfolio_id, holdings, cancelled)
+    
+    def cancel(self, portfolio_id: str) -> None:
+        """Cancel a portfolio's warm-up, e.g. because the portfolio was cleared."""
+        with self._lock:
+            cancelled = self._jobs.pop(portfolio_id, None)
+            self._warmed.pop(portfolio_id, None)
+        if cancelled is not None:
+            cancelled.set()
+    
+    @staticmethod
+    def _check(cancelled: threading.Event) -> None:
+        if cancelled.is_set():
+            raise WarmupCancelled()
+    
+    def _run(self, portfolio_id: str, holdings: Dict[str, float], cancelled: threading.Event) -> None:
+        from app.agents.tools.market_data import fetch_histories
+        from app.agents.tools.forecasting_tools import ForecastingTools
+        try:
+            self._check(cancelled)
+            with span('warmup', 'prices', tickers=len(holdings)):
+                histories = fetch_histories(list(holdings), self.period)
+            
+            values = {}
+            for ticker, df in histories.items():
+                self._check(cancelled)
+                if df is None or df.empty:
+                    continue
+                values[ticker] = float(df['Close'].iloc[-1]) * holdings[ticker]
+                with span('warmup', 'features', ticker=ticker):
+                    ForecastingTools._get_features(ticker, self.period)
+            
+            self._check(cancelled)
+            if values:
+                largest = max(values, key=values.get)
+                with span('warmup', 'forecast', ticker=largest):
+                    ForecastingTools._forecast(largest, self.forecast_days)
+            WARMUPS.inc(result='done')
+        except WarmupCancelled:
+            WARMUPS.inc(result='cancelled')
+        except Exception as e:
+            WARMUPS.inc(result='error')
+            print(f"Portfolio warm-up failed for {portfolio_id}: {str(e)}")
+        finally:
+            with self._lock:
+                if self._jobs.get(portfolio_id) is cancelled:
+                    del self._jobs[portfolio_id]
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            for cancelled in self._jobs.values():
+                cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_portfolio_warmer: Optional[PortfolioWarmer] = None
+_portfolio_warmer_lock = threading.Lock()
+
+
+def get_portfolio_warmer() -> PortfolioWarmer:
+    """Get the process-wide portfolio warmer, created on first use."""
+    global _portfolio_warmer
+    if _portfolio_warmer is None:
+        with _portfolio_warmer_lock:
+            if _portfolio_warmer is None:
+                from app.config import get_settings
+                _portfolio_warmer = PortfolioWarmer(rewarm_after=get_settings().price_cache_ttl_seconds)
+    return _portfolio_warmer
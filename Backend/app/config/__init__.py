@@ -8,39 +8,6 @@ from typing import Dict, List, Optional, Any
 # Load environment variables from .env file
 load_dotenv()
 
-class PortfolioStore:
-    """Singleton class to store extracted portfolio data between routes."""
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(PortfolioStore, cls).__new__(cls)
-            cls._instance.assets = []
-            cls._instance.raw_data = {}
-        return cls._instance
-    
-    def store_portfolio(self, assets: List[Dict[str, Any]]):
-        """Store the portfolio assets."""
-        self.assets = assets
-        
-    def store_raw_data(self, data: Dict[str, Any]):
-        """Store the raw extracted data."""
-        self.raw_data = data
-        
-    def get_portfolio(self) -> List[Dict[str, Any]]:
-        """Get the stored portfolio assets."""
-        return self.assets
-    
-    def get_raw_data(self) -> Dict[str, Any]:
-        """Get the raw extracted data."""
-        return self.raw_data
-    
-    def clear(self):
-        """Clear the stored data."""
-        self.assets = []
-        self.raw_data = {}
-
-
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
@@ -53,9 +20,104 @@ class Settings(BaseSettings):
     llm_model: str = Field(default="gpt-4o", env="LLM_MODEL")
     llm_temperature: float = Field(default=0.2, env="LLM_TEMPERATURE")
     
+    # Market data settings
+    market_data_provider: str = Field(default="yfinance", env="MARKET_DATA_PROVIDER")  # yfinance, replay or synthetic
+    market_data_dir: str = Field(default="data/prices", env="MARKET_DATA_DIR")
+    synthetic_volatility: float = Field(default=0.25, env="SYNTHETIC_VOLATILITY")
+    synthetic_seed: int = Field(default=0, env="SYNTHETIC_SEED")
+    price_cache_ttl_seconds: int = Field(default=900, env="PRICE_CACHE_TTL_SECONDS")
+    price_cache_max_bytes: int = Field(default=256 * 1024 * 1024, env="PRICE_CACHE_MAX_BYTES")
+    portfolio_warmup_enabled: bool = Field(default=True, env="PORTFOLIO_WARMUP_ENABLED")
+    
+    # Cache settings
+    cache_dir: str = Field(default=".cache", env="CACHE_DIR")
+    
+    # Analysis result cache settings
+    analysis_cache_enabled: bool = Field(default=True, env="ANALYSIS_CACHE_ENABLED")
+    analysis_cache_ttl_seconds: int = Field(default=3600, env="ANALYSIS_CACHE_TTL_SECONDS")
+    analysis_cache_stale_seconds: int = Field(default=6 * 3600, env="ANALYSIS_CACHE_STALE_SECONDS")
+    analysis_cache_max_bytes: int = Field(default=64 * 1024 * 1024, env="ANALYSIS_CACHE_MAX_BYTES")
+    
+    # Chart settings
+    chart_store_ttl_seconds: int = Field(default=24 * 3600, env="CHART_STORE_TTL_SECONDS")
+    chart_store_max_bytes: int = Field(default=64 * 1024 * 1024, env="CHART_STORE_MAX_BYTES")
+    chart_render_cache_entries: int = Field(default=256, env="CHART_RENDER_CACHE_ENTRIES")
+    
+    # Risk settings
+    risk_var_confidence: float = Field(default=0.95, env="RISK_VAR_CONFIDENCE")
+    risk_var_horizon_days: int = Field(default=1, env="RISK_VAR_HORIZON_DAYS")
+    risk_model_cache_entries: int = Field(default=32, env="RISK_MODEL_CACHE_ENTRIES")
+    
+    # Goal projection settings
+    goal_sim_paths: int = Field(default=10_000, env="GOAL_SIM_PATHS")
+    goal_sim_chunk_paths: int = Field(default=5_000, env="GOAL_SIM_CHUNK_PATHS")
+    goal_sim_workers: int = Field(default=2, env="GOAL_SIM_WORKERS")
+    goal_sim_parallel_min_path_years: int = Field(default=5_000_000, env="GOAL_SIM_PARALLEL_MIN_PATH_YEARS")
+    goal_sim_method: str = Field(default="bootstrap", env="GOAL_SIM_METHOD")
+    goal_sim_long_run_return: float = Field(default=0.06, env="GOAL_SIM_LONG_RUN_RETURN")
+    goal_sim_prior_years: float = Field(default=10.0, env="GOAL_SIM_PRIOR_YEARS")
+    goal_sim_seed: int = Field(default=0, env="GOAL_SIM_SEED")
+    
+    # Portfolio store settings
+    portfolio_db_path: str = Field(default="data/portfolios.sqlite3", env="PORTFOLIO_DB_PATH")
+    
+    # Web scraping settings
+    scrape_cache_ttl_seconds: int = Field(default=6 * 3600, env="SCRAPE_CACHE_TTL_SECONDS")
+    scrape_cache_max_bytes: int = Field(default=64 * 1024 * 1024, env="SCRAPE_CACHE_MAX_BYTES")
+    scrape_max_bytes: int = Field(default=1_000_000, env="SCRAPE_MAX_BYTES")
+    scrape_timeout_seconds: float = Field(default=10.0, env="SCRAPE_TIMEOUT_SECONDS")
+    scrape_max_connections: int = Field(default=20, env="SCRAPE_MAX_CONNECTIONS")
+    scrape_per_host_limit: int = Field(default=4, env="SCRAPE_PER_HOST_LIMIT")
+    
+    # Search settings
+    search_cache_bucket_hours: int = Field(default=24, env="SEARCH_CACHE_BUCKET_HOURS")
+    
+    # Sentiment settings
+    sentiment_escalation_threshold: float = Field(default=0.75, env="SENTIMENT_ESCALATION_THRESHOLD")
+    sentiment_model_path: str = Field(default="", env="SENTIMENT_MODEL_PATH")
+    sentiment_batch_size: int = Field(default=8, env="SENTIMENT_BATCH_SIZE")
+    sentiment_llm_concurrency: int = Field(default=4, env="SENTIMENT_LLM_CONCURRENCY")
+    
+    # OCR settings
+    ocr_workers: int = Field(default=2, env="OCR_WORKERS")
+    ocr_max_queue: int = Field(default=8, env="OCR_MAX_QUEUE")
+    ocr_timeout_seconds: float = Field(default=30.0, env="OCR_TIMEOUT_SECONDS")
+    ocr_cache_enabled: bool = Field(default=True, env="OCR_CACHE_ENABLED")
+    ocr_cache_max_bytes: int = Field(default=64 * 1024 * 1024, env="OCR_CACHE_MAX_BYTES")
+    symbol_listings_path: str = Field(default="", env="SYMBOL_LISTINGS_PATH")
+    symbol_provider_lookup: bool = Field(default=True, env="SYMBOL_PROVIDER_LOOKUP")
+    upload_max_bytes: int = Field(default=50 * 1024 * 1024, env="UPLOAD_MAX_BYTES")
+    upload_max_pages: int = Field(default=50, env="UPLOAD_MAX_PAGES")
+    
+    # News prefetch settings
+    news_prefetch_enabled: bool = Field(default=False, env="NEWS_PREFETCH_ENABLED")
+    news_prefetch_interval_seconds: int = Field(default=900, env="NEWS_PREFETCH_INTERVAL_SECONDS")
+    news_prefetch_top_n: int = Field(default=20, env="NEWS_PREFETCH_TOP_N")
+    news_freshness_seconds: int = Field(default=3600, env="NEWS_FRESHNESS_SECONDS")
+    
+    # Admission control settings (a max_concurrent of 0 or a rate of 0 disables that limit)
+    analyze_max_concurrent: int = Field(default=4, env="ANALYZE_MAX_CONCURRENT")
+    upload_max_concurrent: int = Field(default=4, env="UPLOAD_MAX_CONCURRENT")
+    batch_upload_max_concurrent: int = Field(default=2, env="BATCH_UPLOAD_MAX_CONCURRENT")
+    admission_max_waiting: int = Field(default=16, env="ADMISSION_MAX_WAITING")
+    admission_wait_timeout_seconds: float = Field(default=30.0, env="ADMISSION_WAIT_TIMEOUT_SECONDS")
+    rate_limit_per_minute: float = Field(default=30, env="RATE_LIMIT_PER_MINUTE")
+    rate_limit_burst: int = Field(default=10, env="RATE_LIMIT_BURST")
+    rate_limit_trust_forwarded: bool = Field(default=False, env="RATE_LIMIT_TRUST_FORWARDED")
+    
+    # Downstream limits, so one slow dependency can't starve the others
+    openai_max_concurrent: int = Field(default=8, env="OPENAI_MAX_CONCURRENT")
+    openai_requests_per_second: float = Field(default=0, env="OPENAI_REQUESTS_PER_SECOND")
+    google_max_concurrent: int = Field(default=2, env="GOOGLE_MAX_CONCURRENT")
+    google_requests_per_second: float = Field(default=1, env="GOOGLE_REQUESTS_PER_SECOND")
+    yfinance_max_concurrent: int = Field(default=4, env="YFINANCE_MAX_CONCURRENT")
+    yfinance_requests_per_second: float = Field(default=2, env="YFINANCE_REQUESTS_PER_SECOND")
+    downstream_wait_timeout_seconds: float = Field(default=60.0, env="DOWNSTREAM_WAIT_TIMEOUT_SECONDS")
+    
     # API settings
     api_host: str = Field(default="0.0.0.0", env="API_HOST")
     api_port: int = Field(default=3000, env="API_PORT")
+    preload_modules: bool = Field(default=False, env="PRELOAD_MODULES")
 
     class Config:
         env_file = ".env"
@@ -67,5 +129,4 @@ def get_settings() -> Settings:
     """Create cached settings instance."""
     return Settings()
 
-# Create a singleton instance of the portfolio store
-portfolio_store = PortfolioStore() 
\ No newline at end of file
+from app.config.portfolio_store import PortfolioStore, get_portfolio_store, set_portfolio_store
@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from app.utils.cache import CACHE_REQUESTS
+
+
+class PortfolioStore:
+    """
+    Uploaded portfolios keyed by portfolio id, stored in SQLite (WAL mode).
+    
+    Every upload gets its own id, so concurrent users no longer overwrite each
+    other, and portfolios survive restarts and are shared by all worker
+    processes using the same database file. Reads go through an in-process
+    cache; `PRAGMA data_version` changes whenever another connection (e.g. a
+    different worker) commits, and the cache is dropped when it does.
+    """
+    
+    def __init__(self, path: str, cache_size: int = 1024):
+        self.path = path
+        self.cache_size = cache_size
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS portfolios (
+                id TEXT PRIMARY KEY,
+                assets TEXT NOT NULL,
+                raw_data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS portfolios_updated_at ON portfolios (updated_at);
+        ''')
+        self._data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+    
+    def _sync(self) -> None:
+        """Drop cached portfolios if another connection has committed since the last check. Caller holds the lock."""
+        version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._cache.clear()
+    
+    def _remember(self, record: Dict[str, Any]) -> None:
+        self._cache[record['portfolio_id']] = record
+        self._cache.move_to_end(record['portfolio_id'])
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    @staticmethod
+    def _record(row) -> Dict[str, Any]:
+        return {
+            'portfolio_id': row[0],
+            'assets': json.loads(row[1]),
+            'raw_data': json.loads(row[2]),
+            'created_at': row[3],
+            'updated_at': row[4]
+        }
+    
+    def save(self, assets: List[Dict[str, Any]], raw_data: Dict[str, Any], portfolio_id: Optional[str] = None) -> str:
+        """
+        Store a portfolio and its raw extracted data.
+        
+        Args:
+            assets: The portfolio assets
+            raw_data: The raw extracted data
+            portfolio_id: Id of a portfolio to replace; a new id is generated if None
+        
+        Returns:
+            str: The portfolio id
+        """
+        portfolio_id = portfolio_id or self.new_id()
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                '''INSERT INTO portfolios (id, assets, raw_data, created_at, updated_at) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(id) DO UPDATE SET assets = excluded.assets, raw_data = excluded.raw_data,
+                   updated_at = excluded.updated_at''',
+                (portfolio_id, json.dumps(assets), json.dumps(raw_data, default=str), now, now)
+            )
+            # Our own commit doesn't change data_version; drop the entry and re-read it on demand
+            self._cache.pop(portfolio_id, None)
+        return portfolio_id
+    
+    def get(self, portfolio_id: str) -> Optional[Dict[str, Any]]:
+        """Get a stored portfolio (id, assets, raw data and timestamps), or None if there isn't one."""
+        with self._lock:
+            self._sync()
+            record = self._cache.get(portfolio_id)
+            if record is not None:
+                self._cache.move_to_end(portfolio_id)
+                CACHE_REQUESTS.inc(cache='portfolio', result='hit')
+                return record
+        
+            CACHE_REQUESTS.inc(cache='portfolio', result='miss')
+            row = self._conn.execute(
+                'SELECT id, assets, raw_data, created_at, updated_at FROM portfolios WHERE id = ?', (portfolio_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            record = self._record(row)
+            self._remember(record)
+            return record
+    
+    def delete(self, portfolio_id: str) -> bool:
+        """Delete a stored portfolio; returns whether it existed."""
+        with self._lock, self._conn:
+            deleted = self._conn.execute('DELETE FROM portfolios WHERE id = ?', (portfolio_id,)).rowcount
+            self._cache.pop(portfolio_id, None)
+        return deleted > 0
+
+
+_portfolio_store: Optional[PortfolioStore] = None
+_portfolio_store_lock = threading.Lock()
+
+
+def get_portfolio_store() -> PortfolioStore:
+    """Get the process-wide portfolio store, created on first use."""
+    global _portfolio_store
+    if _portfolio_store is None:
+        with _portfolio_store_lock:
+            if _portfolio_store is None:
+                from app.config import get_settings
+                _portfolio_store = PortfolioStore(get_settings().portfolio_db_path)
+    return _portfolio_store
+
+
+def set_portfolio_store(store: Optional[PortfolioStore]) -> None:
+    """Replace the process-wide portfolio store (None to rebuild it from settings)."""
+    global _portfolio_store
+    with _portfolio_store_lock:
+        _portfolio_store = store
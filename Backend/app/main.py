@@ -1,7 +1,36 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
 from app.routes import portfolio
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import get_settings, Settings
+from app.utils.metrics import registry, span
+from app.utils.admission import AdmissionMiddleware
+from starlette.concurrency import run_in_threadpool
+from app.ocr import get_ocr_executor
+from app.agents.agents.analysis_cache import get_analysis_cache
+from app.agents.tools.warmup import get_portfolio_warmer
+import importlib
+import time
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    'tradeiq_http_request_duration_seconds',
+    'Duration of HTTP requests by route.',
+    ('method', 'route', 'status')
+)
+
+# Heavy modules loaded on first use; PRELOAD_MODULES=true imports them at startup instead
+PRELOAD_MODULES = (
+    'app.agents.agents.agent_graph',
+    'app.agents.tools.forecasting_tools',
+    'xgboost',
+    'sklearn.metrics',
+    'plotly.graph_objects',
+    'plotly.express',
+    'langchain_openai',
+    'app.utils.llm_metrics',
+    'app.ocr.pipeline',
+    'app.ocr.cache',
+)
 
 app = FastAPI(
     title="TradeIQ Financial Analysis API",
@@ -19,6 +48,14 @@ origins = [
     "http://0.0.0.0:5173",    # Allow requests from 0.0.0.0:3000
 ]
 
+# Rate and concurrency limits for the expensive endpoints, by endpoint group; added before
+# CORS so that CORS wraps it and its 429/503 responses carry CORS headers
+app.add_middleware(AdmissionMiddleware, routes={
+    "/portfolio/analyze": "analyze",
+    "/portfolio/upload-portfolio": "upload",
+    "/portfolio/upload-portfolio/batch": "batch_upload",
+})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -27,6 +64,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def preload_modules():
+    for module in PRELOAD_MODULES:
+        with span('startup', 'import', module=module):
+            importlib.import_module(module)
+
+@app.on_event("startup")
+async def warm_up():
+    """Import the lazily loaded dependencies up front so the first analysis doesn't pay for them."""
+    if get_settings().preload_modules:
+        await run_in_threadpool(preload_modules)
+
+@app.on_event("startup")
+async def start_news_prefetch():
+    """Keep news and sentiment for popular tickers and sectors warm in the background."""
+    settings = get_settings()
+    if settings.news_prefetch_enabled:
+        from app.agents.tools.news_prefetch import NewsPrefetcher, get_news_store
+        app.state.news_prefetcher = NewsPrefetcher(
+            get_news_store(),
+            lambda: portfolio.get_llm(settings),
+            interval=settings.news_prefetch_interval_seconds,
+            refresh_after=settings.news_freshness_seconds / 2,
+            top_n=settings.news_prefetch_top_n
+        )
+        app.state.news_prefetcher.start()
+
+@app.on_event("shutdown")
+async def stop_background_work():
+    prefetcher = getattr(app.state, 'news_prefetcher', None)
+    if prefetcher is not None:
+        prefetcher.stop()
+    get_ocr_executor().shutdown()
+    from app.agents.tools.goal_simulator import get_goal_simulator
+    get_goal_simulator().shutdown()
+    get_analysis_cache().shutdown()
+    get_portfolio_warmer().shutdown()
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """Record the duration of every request in the HTTP histogram."""
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Use the route template (e.g. /portfolio/analyze) to keep label cardinality bounded
+    route = request.scope.get('route')
+    HTTP_REQUEST_DURATION.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, 'path', 'unmatched'),
+        status=response.status_code
+    )
+    return response
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Expose span, LLM token and HTTP metrics in Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 async def home(settings: Settings = Depends(get_settings)):
     return {
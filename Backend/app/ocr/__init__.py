@@ -0,0 +1,30 @@
+import importlib
+
+# Loaded on first access; the pipeline imports OpenCV and Tesseract, which only OCR workers need
+_EXPORTS = {
+    'preprocess_image': 'app.ocr.pipeline',
+    'process_extracted_text': 'app.ocr.pipeline',
+    'extract_holdings': 'app.ocr.pipeline',
+    'count_pdf_pages': 'app.ocr.pipeline',
+    'run_ocr': 'app.ocr.pipeline',
+    'run_ocr_pdf_page': 'app.ocr.pipeline',
+    'SymbolIndex': 'app.ocr.symbols',
+    'get_symbol_index': 'app.ocr.symbols',
+    'confirm_with_provider': 'app.ocr.symbols',
+    'OCRResultCache': 'app.ocr.cache',
+    'get_ocr_cache': 'app.ocr.cache',
+    'OCRExecutor': 'app.ocr.executor',
+    'OCRQueueFull': 'app.ocr.executor',
+    'OCRTimeout': 'app.ocr.executor',
+    'get_ocr_executor': 'app.ocr.executor'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
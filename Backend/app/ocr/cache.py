@@ -0,0 +1,67 @@
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Optional
+from app.utils.cache import DiskCache
+
+
+class OCRResultCache:
+    """
+    OCR text cache keyed by the SHA-256 of the uploaded bytes.
+    
+    Results live in a size-bounded DiskCache (least recently used entries are
+    evicted past `max_bytes`). Only byte-identical uploads reuse a result: a
+    perceptual match can't confirm every digit of a quantity column, and the
+    cache is shared by all uploads, so a near match could hand one statement's
+    holdings to another.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        self.results = DiskCache(directory, 'ocr', max_bytes=max_bytes)
+    
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+    
+    def get(self, digest: str) -> Optional[str]:
+        """OCR text stored under an exact content digest."""
+        value = self.results.get(digest)
+        return None if value is None else value['text']
+    
+    def set(self, digest: str, text: str) -> None:
+        self.results.set(digest, {'text': text})
+    
+    def lookup_image(self, image_bytes: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Cached OCR text for an image with exactly these bytes.
+        
+        Returns:
+            Optional[Dict[str, Any]]: The text and how it matched ('exact'), or None
+        """
+        digest = self.digest(image_bytes)
+        text = self.get(digest)
+        if text is None:
+            return None
+        return {'text': text, 'match': 'exact', 'digest': digest}
+    
+    def store_image(self, image_bytes: bytes, text: str) -> None:
+        self.set(self.digest(image_bytes), text)
+
+
+_ocr_cache: Optional[OCRResultCache] = None
+_ocr_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRResultCache:
+    """Get the process-wide OCR result cache, configured from settings on first use."""
+    global _ocr_cache
+    if _ocr_cache is None:
+        with _ocr_cache_lock:
+            if _ocr_cache is None:
+                from app.config import get_settings
+                settings = get_settings()
+                _ocr_cache = OCRResultCache(
+                    os.path.join(settings.cache_dir, 'ocr'),
+                    max_bytes=settings.ocr_cache_max_bytes
+                )
+    return _ocr_cache
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from app.utils.metrics import registry, record_timing, SPAN_DURATION
+from app.utils.singleflight import AsyncSingleFlight
+
+if TYPE_CHECKING:
+    from app.ocr.cache import OCRResultCache
+
+OCR_QUEUE_DEPTH = registry.gauge(
+    'tradeiq_ocr_queue_depth',
+    'OCR jobs admitted and not yet finished (running or waiting for a worker).'
+)
+OCR_JOBS = registry.counter(
+    'tradeiq_ocr_jobs_total',
+    'OCR jobs by result (ok, cached, rejected, timeout, error).',
+    ('result',)
+)
+
+
+class OCRQueueFull(Exception):
+    """Raised when the OCR queue is at capacity; the caller should retry later."""
+    
+    def __init__(self, retry_after: int):
+        super().__init__("OCR queue is full")
+        self.retry_after = retry_after
+
+
+class OCRTimeout(Exception):
+    """Raised when an OCR job doesn't finish within the per-job timeout."""
+
+
+class OCRExecutor:
+    """
+    Runs OCR jobs in a pool of worker processes so they never block the event loop.
+    
+    At most `workers + max_queue` jobs are admitted at once; further jobs are
+    rejected with OCRQueueFull instead of piling up. A job that outlives `timeout`
+    raises OCRTimeout for the caller; the worker drops it if it hasn't started and
+    stops Tesseract at the same deadline, and the job keeps its admission slot until
+    the worker lets go of it, so the queue depth stays honest. With a `cache`,
+    images and PDF pages already read are answered without a worker, and the
+    same image or page uploaded twice at once is only read once.
+    """
+    
+    def __init__(self, workers: int = 2, max_queue: int = 8, timeout: float = 30.0, cache: Optional['OCRResultCache'] = None):
+        self.workers = workers
+        self.cache = cache
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._flights = AsyncSingleFlight('ocr')
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers only import the OCR pipeline, not the whole app
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+    
+    def _reset_pool(self) -> None:
+        with self._lock:
+            self._pool = None
+    
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                OCR_JOBS.inc(result='rejected')
+                raise OCRQueueFull(retry_after=max(1, int(self.timeout)))
+            self._pending += 1
+            OCR_QUEUE_DEPTH.set(self._pending)
+    
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+            OCR_QUEUE_DEPTH.set(self._pending)
+    
+    def _submit(self, func, *args):
+        try:
+            return self._get_pool().submit(func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool for this and later jobs
+            self._reset_pool()
+            return self._get_pool().submit(func, *args)
+    
+    @property
+    def depth(self) -> int:
+        return self._pending
+    
+    async def run(self, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Preprocess and OCR an image in a worker process.
+        
+        Returns:
+            Dict[str, Any]: The extracted text and per-stage timings in seconds
+        """
+        return await self._flights.do(hashlib.sha256(image_bytes).hexdigest(), lambda: self._read_image(image_bytes))
+    
+    async def _read_image(self, image_bytes: bytes) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            cached = await loop.run_in_executor(None, self.cache.lookup_image, image_bytes)
+            if cached is not None:
+                OCR_JOBS.inc(result='cached')
+                return {'text': cached['text'], 'timings': {}, 'cached': cached['match']}
+        
+        from app.ocr.pipeline import run_ocr
+        result = await self._run(run_ocr, image_bytes)
+        if self.cache is not None:
+            await loop.run_in_executor(None, self.cache.store_image, image_bytes, result['text'])
+        return result
+    
+    async def run_pdf_page(self, path: str, index: int, digest: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rasterize and OCR one page of a PDF file in a worker process.
+        
+        When the SHA-256 `digest` of the PDF is given, page results are cached under it.
+        """
+        if digest is None:
+            return await self._read_pdf_page(path, index, None)
+        return await self._flights.do(f'{digest}:{index}', lambda: self._read_pdf_page(path, index, digest))
+    
+    async def _read_pdf_page(self, path: str, index: int, digest: Optional[str]) -> Dict[str, Any]:
+        key = f'{digest}:{index}' if digest and self.cache is not None else None
+        if key is not None:
+            text = self.cache.get(key)
+            if text is not None:
+                OCR_JOBS.inc(result='cached')
+                return {'text': text, 'timings': {}, 'cached': 'exact'}
+        
+        from app.ocr.pipeline import run_ocr_pdf_page
+        result = await self._run(run_ocr_pdf_page, path, index)
+        if key is not None:
+            self.cache.set(key, result['text'])
+        return result
+    
+    async def _run(self, func, *args) -> Dict[str, Any]:
+        self._admit()
+        submitted_at = time.time()
+        try:
+            future = self._submit(func, *args, submitted_at + self.timeout)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except (asyncio.TimeoutError, TimeoutError):
+            OCR_JOBS.inc(result='timeout')
+            raise OCRTimeout(f"OCR did not finish within {self.timeout:g} seconds")
+        except BrokenProcessPool:
+            OCR_JOBS.inc(result='error')
+            self._reset_pool()
+            raise
+        except Exception:
+            OCR_JOBS.inc(result='error')
+            raise
+        
+        OCR_JOBS.inc(result='ok')
+        timings = {'queue_wait': max(0.0, result['started_at'] - submitted_at), **result['timings']}
+        for stage, duration in timings.items():
+            SPAN_DURATION.observe(duration, kind='ocr', name=stage)
+            record_timing('ocr', stage, duration)
+        return {'text': result['text'], 'timings': timings}
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_ocr_executor: Optional[OCRExecutor] = None
+_ocr_executor_lock = threading.Lock()
+
+
+def get_ocr_executor() -> OCRExecutor:
+    """Get the process-wide OCR executor, configured from settings on first use."""
+    global _ocr_executor
+    if _ocr_executor is None:
+        with _ocr_executor_lock:
+            if _ocr_executor is None:
+                from app.config import get_settings
+                from app.ocr.cache import get_ocr_cache
+                settings = get_settings()
+                _ocr_executor = OCRExecutor(
+                    workers=settings.ocr_workers,
+                    max_queue=settings.ocr_max_queue,
+                    timeout=settings.ocr_timeout_seconds,
+                    cache=get_ocr_cache() if settings.ocr_cache_enabled else None
+                )
+    return _ocr_executor
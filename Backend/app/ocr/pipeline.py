@@ -0,0 +1,228 @@
+import io
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image
+from app.ocr.symbols import get_symbol_index, provider_symbol
+
+
+# Tesseract is most accurate with glyphs roughly 20-30 px tall; larger text only costs time
+TARGET_TEXT_HEIGHT = 24
+# Layout analysis (text height, text region) runs on a copy at most this wide
+ANALYSIS_WIDTH = 1000
+# PDF pages are rasterized at this resolution, capped at MAX_PAGE_PIXELS per page
+PDF_RENDER_DPI = 200
+MAX_PAGE_PIXELS = 25_000_000
+
+def _analysis_image(gray):
+    """Cheap downscaled copy for layout analysis, and its scale relative to `gray`."""
+    scale = min(1.0, ANALYSIS_WIDTH / gray.shape[1])
+    if scale < 1.0:
+        return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA), scale
+    return gray, scale
+
+def estimate_text_height(gray):
+    """Median glyph height in pixels, from connected components; None if too little text is found."""
+    small, scale = _analysis_image(gray)
+    # Dark text on a light background becomes foreground; flip dark-mode screenshots first
+    flags = cv2.THRESH_BINARY_INV if small.mean() > 127 else cv2.THRESH_BINARY
+    _, binary = cv2.threshold(small, 0, 255, flags + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    # Keep glyph-like components: not specks, not table rules or boxes
+    glyphs = (heights >= 4) & (heights <= small.shape[0] * 0.1) & (widths <= heights * 3)
+    if glyphs.sum() < 10:
+        return None
+    return float(np.median(heights[glyphs])) / scale
+
+def normalize_resolution(gray, target_text_height=TARGET_TEXT_HEIGHT):
+    """Downscale so the typical glyph is about `target_text_height` pixels tall."""
+    text_height = estimate_text_height(gray)
+    if text_height is None or text_height <= target_text_height:
+        return gray
+    scale = target_text_height / text_height
+    return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+def detect_text_region(gray, padding=0.02):
+    """
+    Bounding box (x, y, w, h) of the text in the image.
+    
+    Finds edges with a morphological gradient, joins characters into line blobs
+    with a wide closing kernel and unions the line-shaped contours. Returns the
+    whole image when no text lines are found.
+    """
+    full = (0, 0, gray.shape[1], gray.shape[0])
+    small, scale = _analysis_image(gray)
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, edges = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    lines = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        # Text lines are wider than tall; skip specks and frames around the whole image
+        if h >= 4 and w >= 2 * h and w < small.shape[1] * 0.98 and h < small.shape[0] * 0.5:
+            boxes.append((x, y, x + w, y + h))
+    if not boxes:
+        return full
+    
+    boxes = np.array(boxes)
+    pad = int(padding * max(small.shape))
+    x0 = max(0, boxes[:, 0].min() - pad)
+    y0 = max(0, boxes[:, 1].min() - pad)
+    x1 = min(small.shape[1], boxes[:, 2].max() + pad)
+    y1 = min(small.shape[0], boxes[:, 3].max() + pad)
+    return (int(x0 / scale), int(y0 / scale), int((x1 - x0) / scale), int((y1 - y0) / scale))
+
+def decode_image(image_bytes):
+    """Decode uploaded image bytes straight to a grayscale array."""
+    return np.array(Image.open(io.BytesIO(image_bytes)).convert('L'))
+
+def render_pdf_page(path, index, dpi=PDF_RENDER_DPI, max_pixels=MAX_PAGE_PIXELS):
+    """Rasterize one PDF page to grayscale, lowering the resolution if it would exceed `max_pixels`."""
+    import pypdfium2 as pdfium
+    
+    pdf = pdfium.PdfDocument(path)
+    try:
+        page = pdf[index]
+        width, height = page.get_size()
+        scale = min(dpi / 72, (max_pixels / (width * height)) ** 0.5)
+        bitmap = page.render(scale=scale, grayscale=True)
+        return np.array(bitmap.to_pil().convert('L'))
+    finally:
+        pdf.close()
+
+def count_pdf_pages(path):
+    import pypdfium2 as pdfium
+    
+    pdf = pdfium.PdfDocument(path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def preprocess_image(image_bytes):
+    return preprocess_gray(decode_image(image_bytes))
+
+def preprocess_gray(gray):
+    # Downscale large photos and scans to the text size OCR needs
+    gray = normalize_resolution(gray)
+
+    # Crop to the text so the filters below only see the region that matters
+    x, y, w, h = detect_text_region(gray)
+    gray = gray[y:y + h, x:x + w]
+
+    # Noise removal
+    denoised = cv2.fastNlMeansDenoising(gray, h=30)
+
+    # Adaptive thresholding for better contrast
+    binary = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+
+    # Deskewing (straighten tilted text)
+    coords = cv2.findNonZero(binary)
+    angle = cv2.minAreaRect(coords)[-1]
+    if angle < -45:
+        angle = -(90 + angle)
+    else:
+        angle = -angle
+    (h, w) = binary.shape[:2]
+    center = (w // 2, h // 2)
+    M = cv2.getRotationMatrix2D(center, angle, 1.0)
+    deskewed = cv2.warpAffine(binary, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+    return deskewed
+
+def extract_holdings(text: str) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Holdings in OCR'd statement text.
+    
+    Returns:
+        Tuple[Dict[str, float], Dict[str, float]]: Quantities of listed symbols, and of
+        symbol-shaped tokens missing from the listing (to confirm with the market data
+        provider or the user), both keyed in the provider's format (BRK-B)
+    """
+    stock_data, unrecognized = {}, {}
+    symbols = get_symbol_index()
+    # Symbol-like tokens (capitals, plus digits and marks OCR confuses with them) followed by a quantity
+    pattern = r'(?<![A-Za-z0-9.-])([A-Z0-9$|!][A-Z0-9l.$|!-]{0,6})[:\s]+(\d[\d,]*(?:\.\d+)?)(?![A-Za-z])'
+    
+    matches = re.findall(pattern, text)
+    for match in matches:
+        token, quantity = match
+        try:
+            quantity = float(quantity.replace(',', ''))
+        except ValueError:
+            continue  # Skip if quantity can't be converted to float
+        # Prefer listed symbols, correcting OCR confusions like 0/O and 1/I
+        symbol = symbols.resolve(token)
+        if symbol is not None:
+            stock_data[provider_symbol(symbol)] = quantity
+            continue
+        candidate = symbols.candidate(token)
+        if candidate is not None:
+            unrecognized[provider_symbol(candidate)] = quantity
+            
+    return stock_data, unrecognized
+
+def process_extracted_text(text: str) -> dict:
+    """Process extracted text into portfolio data (listed symbols only, see `extract_holdings`)."""
+    return extract_holdings(text)[0]
+
+def _run(load, *args, deadline: Optional[float] = None) -> Dict[str, Any]:
+    started_at = time.time()
+    timings = {}
+    if deadline is not None and started_at >= deadline:
+        # The caller gave up while the job waited for a worker
+        raise TimeoutError("OCR job expired before it started")
+    
+    try:
+        start = time.perf_counter()
+        gray = load(*args)
+        timings['decode'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        preprocessed = preprocess_gray(gray)
+        timings['preprocess'] = time.perf_counter() - start
+        
+        # Tesseract is killed at the deadline so a stuck job frees its worker (0 means no limit)
+        timeout = 0
+        if deadline is not None:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                raise TimeoutError("OCR job ran past its deadline")
+        start = time.perf_counter()
+        try:
+            text = pytesseract.image_to_string(preprocessed, config="--psm 6", timeout=timeout)
+        except RuntimeError as e:
+            if 'timeout' in str(e).lower():
+                raise TimeoutError("Tesseract ran past the OCR deadline") from None
+            raise
+        timings['tesseract'] = time.perf_counter() - start
+    except TimeoutError:
+        raise
+    except Exception as e:
+        # Library exceptions don't always survive pickling back to the parent process
+        raise RuntimeError(f"{type(e).__name__}: {str(e)}") from None
+    
+    return {'text': text, 'started_at': started_at, 'timings': timings}
+
+def run_ocr(image_bytes: bytes, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Preprocess an image and extract its text. Runs in an OCR worker process.
+    
+    A job still waiting at `deadline` (wall-clock seconds) is dropped, and Tesseract
+    is stopped when it runs past it; both raise TimeoutError.
+    
+    Returns:
+        Dict[str, Any]: Extracted text, the wall-clock time the job started and per-stage durations
+    """
+    return _run(decode_image, image_bytes, deadline=deadline)
+
+def run_ocr_pdf_page(path: str, index: int, deadline: Optional[float] = None) -> Dict[str, Any]:
+    """Rasterize one page of a PDF on disk and extract its text, like `run_ocr`. Runs in an OCR worker process."""
+    return _run(render_pdf_page, path, index, deadline=deadline)
@@ -0,0 +1,148 @@
+import bisect
+import itertools
+import os
+import re
+import threading
+from typing import Iterator, List, Optional
+
+BUNDLED_LISTINGS = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'listings.txt')
+
+# Characters OCR commonly reads in place of the capital letters used in symbols
+OCR_CONFUSIONS = {
+    '0': 'OD', '1': 'IL', '2': 'Z', '4': 'A', '5': 'S', '6': 'G', '7': 'T', '8': 'B',
+    '$': 'S', '|': 'IL', '!': 'I', '(': 'C', '[': 'I', ']': 'J',
+    # Lowercase l (uppercased before lookup) is usually a misread I
+    'L': 'I',
+}
+
+# Statement column headers and labels that look like symbols but never are holdings
+NON_SYMBOLS = {
+    'USD', 'CAD', 'EUR', 'GBP', 'QTY', 'TOTAL', 'TOTALS', 'CASH', 'SHARES', 'SHS', 'PRICE', 'VALUE',
+    'COST', 'GAIN', 'LOSS', 'ACCOUNT', 'ACCT', 'BALANCE', 'AMOUNT', 'UNITS', 'DATE', 'NAV', 'MKT',
+    'MARKET', 'SYMBOL', 'TICKER', 'NET', 'DAY', 'YTD', 'PCT', 'AVG', 'FEE', 'FEES', 'TAX', 'DIV',
+}
+
+# Candidate expansions tried per token; tokens with more ambiguous characters are rejected
+MAX_VARIANTS = 64
+
+# Unlisted tokens of this shape (share classes as BRK.B or BRK-B) may still be symbols
+SYMBOL_SHAPE = re.compile(r'^[A-Z]{1,5}(?:\.[A-Z])?$')
+# Unlisted symbols checked with the market data provider per upload
+MAX_PROVIDER_LOOKUPS = 20
+
+
+def provider_symbol(symbol: str) -> str:
+    """A symbol in the market data provider's format: share classes use a dash (BRK.B -> BRK-B)."""
+    return symbol.replace('.', '-')
+
+
+class SymbolIndex:
+    """
+    Sorted array of known ticker symbols, loaded lazily from a listings file.
+    
+    Membership and prefix queries are binary searches. `resolve` maps an OCR'd
+    token to a listed symbol, undoing common character confusions (0/O, 1/I, 5/S)
+    when exactly one reading is listed.
+    """
+    
+    def __init__(self, path: str = BUNDLED_LISTINGS):
+        self.path = path
+        self._symbols: Optional[List[str]] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def symbols(self) -> List[str]:
+        if self._symbols is None:
+            with self._lock:
+                if self._symbols is None:
+                    self._symbols = self._load(self.path)
+        return self._symbols
+    
+    @staticmethod
+    def _load(path: str) -> List[str]:
+        symbols = set()
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    symbols.add(line.split('|', 1)[0].strip().upper())
+        return sorted(symbols)
+    
+    def __contains__(self, symbol: str) -> bool:
+        symbols = self.symbols
+        i = bisect.bisect_left(symbols, symbol)
+        return i < len(symbols) and symbols[i] == symbol
+    
+    def __len__(self) -> int:
+        return len(self.symbols)
+    
+    def with_prefix(self, prefix: str) -> List[str]:
+        symbols = self.symbols
+        start = bisect.bisect_left(symbols, prefix)
+        end = bisect.bisect_left(symbols, prefix + '￿')
+        return symbols[start:end]
+    
+    @staticmethod
+    def _variants(token: str) -> Iterator[str]:
+        options = [c + OCR_CONFUSIONS.get(c, '') if c.isalpha() or c == '.' else OCR_CONFUSIONS.get(c, '') for c in token]
+        if not all(options):
+            return
+        for combo in itertools.islice(itertools.product(*options), MAX_VARIANTS):
+            yield ''.join(combo)
+    
+    @staticmethod
+    def _normalize(token: str) -> str:
+        # Listings write share classes with a dot (BRK.B); statements use either
+        return token.strip().upper().rstrip('.').replace('-', '.')
+    
+    def resolve(self, token: str) -> Optional[str]:
+        """
+        The listed symbol an OCR'd token stands for, or None if it isn't one.
+        
+        Column labels like USD, QTY and TOTAL are never symbols. A token that
+        isn't listed as-is is corrected only when exactly one reading is listed.
+        """
+        token = self._normalize(token)
+        if not token or token in NON_SYMBOLS or not any(c.isalpha() for c in token):
+            return None
+        if token in self:
+            return token
+        
+        matches = {v for v in self._variants(token) if v not in NON_SYMBOLS and v in self}
+        return matches.pop() if len(matches) == 1 else None
+    
+    def candidate(self, token: str) -> Optional[str]:
+        """An unlisted token that is still shaped like a symbol (e.g. a fund missing from the listing), or None."""
+        token = self._normalize(token)
+        if token in NON_SYMBOLS or not SYMBOL_SHAPE.match(token):
+            return None
+        return token
+
+
+def confirm_with_provider(symbols: List[str]) -> List[str]:
+    """
+    The unlisted symbols (in provider format) the market data provider has recent
+    prices for, checked in one batched lookup of at most MAX_PROVIDER_LOOKUPS symbols.
+    """
+    from app.agents.tools.market_data import get_market_data_provider
+    symbols = symbols[:MAX_PROVIDER_LOOKUPS]
+    if not symbols:
+        return []
+    # Straight from the provider: a 5-day probe shouldn't replace longer cached histories
+    histories = get_market_data_provider().get_histories(symbols, '5d')
+    return [symbol for symbol in symbols if histories.get(symbol) is not None and not histories[symbol].empty]
+
+
+_symbol_index: Optional[SymbolIndex] = None
+_symbol_index_lock = threading.Lock()
+
+
+def get_symbol_index() -> SymbolIndex:
+    """Get the process-wide symbol index (listings are read on first lookup)."""
+    global _symbol_index
+    if _symbol_index is None:
+        with _symbol_index_lock:
+            if _symbol_index is None:
+                from app.config import get_settings
+                _symbol_index = SymbolIndex(get_settings().symbol_listings_path or BUNDLED_LISTINGS)
+    return _symbol_index
@@ -1,110 +1,290 @@
-from fastapi import APIRouter, HTTPException, status, Depends, File, UploadFile
+from fastapi import APIRouter, HTTPException, status, Depends, File, UploadFile, Query, Path, Request, Response
 from typing import List, Optional
-from Backend.app.Models.models import (
+from app.Models.models import (
     Portfolio, Asset, PortfolioAnalysisResponse, SamplePortfolioResponse,
-    PortfolioUploadResponse, StoredPortfolioResponse, ClearPortfolioResponse
+    PortfolioUploadResponse, StoredPortfolioResponse, ClearPortfolioResponse, AnalysisChartsResponse
 )
-from app.agents.agent_graph import run_financial_analysis
-from langchain_openai import ChatOpenAI
-from app.config import get_settings, Settings, portfolio_store
-from fastapi.responses import JSONResponse
-import pytesseract
-import cv2
-import numpy as np
-import io
-from PIL import Image
-import re
+from app.agents.agents.analysis_cache import analysis_key, get_analysis_cache
+from app.agents.tools.warmup import get_portfolio_warmer
+from app.config import get_settings, Settings, get_portfolio_store
+from app.utils.metrics import collect_timings
+from app.utils.singleflight import SingleFlight
+from app.utils.serialization import CompressedJSONResponse, columnar as to_columnar, exclude_paths, include_paths, parse_paths
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.ocr.executor import get_ocr_executor, OCRQueueFull, OCRTimeout
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
 
 router = APIRouter()
 
-def preprocess_image(image_bytes):
-    # Convert uploaded bytes to OpenCV image
-    image = np.array(Image.open(io.BytesIO(image_bytes)))
-
-    # Convert to grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-    # Noise removal
-    denoised = cv2.fastNlMeansDenoising(gray, h=30)
-
-    # Adaptive thresholding for better contrast
-    binary = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-
-    # Deskewing (straighten tilted text)
-    coords = cv2.findNonZero(binary)
-    angle = cv2.minAreaRect(coords)[-1]
-    if angle < -45:
-        angle = -(90 + angle)
-    else:
-        angle = -angle
-    (h, w) = binary.shape[:2]
-    center = (w // 2, h // 2)
-    M = cv2.getRotationMatrix2D(center, angle, 1.0)
-    deskewed = cv2.warpAffine(binary, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-
-    return deskewed
-
-def process_extracted_text(text: str) -> dict:
-    """Process extracted text into portfolio data."""
-    stock_data = {}
-    # Pattern to match stock symbols (assumed to be 1-5 uppercase letters) and quantities
-    pattern = r'([A-Z]{1,5})[:\s]+(\d+(?:\.\d+)?)'
-    
-    matches = re.findall(pattern, text)
-    for match in matches:
-        symbol, quantity = match
-        try:
-            stock_data[symbol.strip()] = float(quantity.strip())
-        except ValueError:
-            continue  # Skip if quantity can't be converted to float
-            
-    return stock_data
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Identical analyses running at once share one pipeline run when the result cache is off
+analysis_flights = SingleFlight('analysis')
+
+PORTFOLIO_ID = dict(min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+ANALYSIS_ID = dict(pattern=r"^[0-9a-f]{64}$")
+CHART_NAME = dict(max_length=64, pattern=r"^[A-Za-z0-9_.:-]+$")
+
+def _warm_portfolio(portfolio_id: str, assets: List[dict], force: bool = False):
+    """Start warming price, feature and forecast caches for a stored portfolio in the background."""
+    settings = get_settings()
+    # Warm-up fills the price caches, so there's nothing to do when they are off
+    if settings.portfolio_warmup_enabled and settings.price_cache_ttl_seconds > 0:
+        get_portfolio_warmer().warm(portfolio_id, assets, force=force)
+
+async def _confirm_symbols(stock_data: dict, unrecognized: dict):
+    """
+    Move the unlisted symbols the market data provider has prices for into the holdings.
+    
+    Whatever is left in `unrecognized` is returned to the user to confirm.
+    """
+    if not unrecognized or not get_settings().symbol_provider_lookup:
+        return
+    from app.ocr.symbols import confirm_with_provider
+    try:
+        confirmed = await run_in_threadpool(confirm_with_provider, list(unrecognized))
+    except Exception as e:
+        print(f"Symbol lookup failed: {str(e)}")
+        return
+    for symbol in confirmed:
+        stock_data[symbol] = stock_data.get(symbol, 0) + unrecognized.pop(symbol)
 
 @router.post("/upload-portfolio", response_model=PortfolioUploadResponse, summary="Upload portfolio image")
-async def upload_portfolio(file: UploadFile = File(...)):
+async def upload_portfolio(
+    file: UploadFile = File(...),
+    portfolio_id: Optional[str] = Query(None, description="Replace this stored portfolio instead of creating a new one", **PORTFOLIO_ID)
+):
     """
     Upload an image of a portfolio statement and extract stock data.
     
     This endpoint processes an uploaded image using OCR to extract stock ticker symbols 
-    and quantities. The extracted data is stored for use in portfolio analysis.
+    and quantities. The extracted data is stored for use in portfolio analysis under
+    the returned portfolio id. Symbol-like tokens that are neither listed nor known to
+    the market data provider are returned as "unrecognized" for the user to confirm.
     """
     try:
         # Read the uploaded image file
         image_bytes = await file.read()
 
-        # Preprocess the image with OpenCV
-        preprocessed = preprocess_image(image_bytes)
-
-        # Use OCR to extract text
-        extracted_text = pytesseract.image_to_string(preprocessed, config="--psm 6")
+        # Preprocess and OCR the image in a worker process, off the event loop
+        ocr_result = await get_ocr_executor().run(image_bytes)
+        extracted_text = ocr_result["text"]
         print(f"Extracted text: {extracted_text}")
 
         # Process the extracted text to fetch stock symbols and quantities
-        stock_data = process_extracted_text(extracted_text)
+        from app.ocr.pipeline import extract_holdings
+        stock_data, unrecognized = extract_holdings(extracted_text)
+        await _confirm_symbols(stock_data, unrecognized)
         
-        # Convert to assets format and store in portfolio_store
+        # Convert to assets format and store it
         assets = [{"ticker": ticker, "quantity": quantity} for ticker, quantity in stock_data.items()]
-        portfolio_store.store_portfolio(assets)
-        portfolio_store.store_raw_data({"extracted_text": extracted_text, "processed_data": stock_data})
+        portfolio_id = await run_in_threadpool(
+            get_portfolio_store().save,
+            assets,
+            {"extracted_text": extracted_text, "processed_data": stock_data, "unrecognized": unrecognized},
+            portfolio_id
+        )
+        _warm_portfolio(portfolio_id, assets, force=True)
         
         return {
             "message": "Portfolio successfully extracted and stored", 
             "extracted_data": stock_data,
-            "assets": assets
+            "unrecognized": unrecognized,
+            "assets": assets,
+            "portfolio_id": portfolio_id
         }
+    except OCRQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many portfolio images are being processed. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except OCRTimeout as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Failed to process portfolio image: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process portfolio image: {str(e)}"
         )
 
+async def _collect_upload_jobs(files: List[UploadFile], settings: Settings):
+    """
+    Read uploaded files in chunks within the upload byte budget and turn them into OCR jobs.
+    
+    PDFs are spooled to temporary files and only counted here; their pages are
+    rasterized one at a time by the OCR workers. Images are kept in memory.
+    
+    Returns:
+        Tuple[List[Dict[str, Any]], List[str]]: One job per image or PDF page, and the temporary files to remove
+    """
+    jobs, temp_paths = [], []
+    total_bytes = 0
+    try:
+        for file in files:
+            chunks, spool = [], None
+            digest = hashlib.sha256()
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                total_bytes += len(chunk)
+                if total_bytes > settings.upload_max_bytes:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"Upload exceeds the {settings.upload_max_bytes // (1024 * 1024)} MB limit"
+                    )
+                if spool is None and not chunks and chunk.startswith(b"%PDF-"):
+                    spool = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+                    temp_paths.append(spool.name)
+                if spool is not None:
+                    spool.write(chunk)
+                else:
+                    chunks.append(chunk)
+            
+            if spool is not None:
+                spool.close()
+                try:
+                    from app.ocr.pipeline import count_pdf_pages
+                    pages = await run_in_threadpool(count_pdf_pages, spool.name)
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Could not read PDF {file.filename}: {str(e)}"
+                    )
+                jobs.extend(
+                    {"file": file.filename, "page": i + 1, "pages": pages, "pdf": spool.name, "digest": digest.hexdigest()}
+                    for i in range(pages)
+                )
+            elif chunks:
+                jobs.append({"file": file.filename, "page": 1, "pages": 1, "image": b"".join(chunks)})
+            
+            if len(jobs) > settings.upload_max_pages:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Upload exceeds the {settings.upload_max_pages} page limit"
+                )
+        return jobs, temp_paths
+    except Exception:
+        _remove_files(temp_paths)
+        raise
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+@router.post("/upload-portfolio/batch", summary="Upload portfolio PDFs or several images")
+async def upload_portfolio_batch(
+    files: List[UploadFile] = File(...),
+    portfolio_id: Optional[str] = Query(None, description="Replace this stored portfolio instead of creating a new one", **PORTFOLIO_ID),
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Upload multi-page PDF statements and/or several portfolio images at once.
+    
+    Every page is OCR'd in parallel and the response streams newline-delimited
+    JSON progress events: a "page" event per finished page (or an "error" event
+    for a page that failed), then a "done" event with the merged holdings, where
+    quantities of a ticker found on several pages are summed. The merged
+    portfolio is stored for use in portfolio analysis under the portfolio id
+    given in the "done" event, which also lists the "unrecognized" symbols left
+    for the user to confirm.
+    """
+    jobs, temp_paths = await _collect_upload_jobs(files, settings)
+    if not jobs:
+        _remove_files(temp_paths)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files to process")
+    
+    executor = get_ocr_executor()
+    # Keep at most one page per OCR worker in flight so large uploads don't fill the shared queue
+    in_flight = asyncio.Semaphore(executor.workers)
+    
+    async def ocr_page(job):
+        async with in_flight:
+            try:
+                if "pdf" in job:
+                    result = await executor.run_pdf_page(job["pdf"], job["page"] - 1, job["digest"])
+                else:
+                    result = await executor.run(job.pop("image"))
+                job["cached"] = result.get("cached")
+                return job, result["text"], None
+            except Exception as e:
+                return job, None, str(e) or type(e).__name__
+    
+    async def events():
+        from app.ocr.pipeline import extract_holdings
+        tasks = [asyncio.create_task(ocr_page(job)) for job in jobs]
+        merged, unrecognized, pages = {}, {}, []
+        try:
+            for completed, next_page in enumerate(asyncio.as_completed(tasks), 1):
+                job, text, error = await next_page
+                event = {"file": job["file"], "page": job["page"], "pages": job["pages"], "completed": completed, "total": len(jobs)}
+                if error is not None:
+                    yield json.dumps({"event": "error", **event, "error": error}) + "\n"
+                    continue
+                
+                stock_data, page_unrecognized = extract_holdings(text)
+                for ticker, quantity in stock_data.items():
+                    merged[ticker] = merged.get(ticker, 0) + quantity
+                for ticker, quantity in page_unrecognized.items():
+                    unrecognized[ticker] = unrecognized.get(ticker, 0) + quantity
+                pages.append({"file": job["file"], "page": job["page"], "extracted_text": text, "processed_data": stock_data, "unrecognized": page_unrecognized})
+                yield json.dumps({"event": "page", **event, "cached": job["cached"], "extracted_data": stock_data, "unrecognized": page_unrecognized}) + "\n"
+            
+            if not pages:
+                yield json.dumps({"event": "done", "message": "No pages could be processed", "extracted_data": {}, "unrecognized": {}, "assets": []}) + "\n"
+                return
+            
+            # One provider lookup for the whole upload rather than one per page
+            await _confirm_symbols(merged, unrecognized)
+            assets = [{"ticker": ticker, "quantity": quantity} for ticker, quantity in merged.items()]
+            pages.sort(key=lambda p: (p["file"] or "", p["page"]))
+            stored_id = await run_in_threadpool(get_portfolio_store().save, assets, {
+                "extracted_text": "\n".join(p["extracted_text"] for p in pages),
+                "processed_data": merged,
+                "unrecognized": unrecognized,
+                "pages": pages
+            }, portfolio_id)
+            _warm_portfolio(stored_id, assets, force=True)
+            yield json.dumps({
+                "event": "done",
+                "message": "Portfolio successfully extracted and stored",
+                "extracted_data": merged,
+                "unrecognized": unrecognized,
+                "assets": assets,
+                "portfolio_id": stored_id
+            }) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            _remove_files(temp_paths)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 def get_llm(settings: Settings = Depends(get_settings)):
     """Get the language model instance."""
     try:
+        from langchain_openai import ChatOpenAI
+        from app.utils.llm_metrics import LLMMetricsCallback
+        from app.utils.admission import limited_http_client
         return ChatOpenAI(
             model=settings.llm_model,
             temperature=settings.llm_temperature,
-            openai_api_key=settings.openai_api_key
+            openai_api_key=settings.openai_api_key,
+            callbacks=[LLMMetricsCallback(settings.llm_model)],
+            # Every OpenAI request goes through the shared OpenAI limiter
+            http_client=limited_http_client('openai')
         )
     except Exception as e:
         print(f"Error initializing LLM: {str(e)}")
@@ -115,8 +295,15 @@ def get_llm(settings: Settings = Depends(get_settings)):
 
 @router.post("/analyze", response_model=PortfolioAnalysisResponse, summary="Analyze portfolio")
 async def analyze_portfolio(
+    request: Request,
     portfolio: Optional[Portfolio] = None,
     goals: Optional[List[str]] = None,
+    include_timings: bool = Query(False, description="Attach per-span timings to the response"),
+    portfolio_id: Optional[str] = Query(None, description="Stored portfolio to analyze when no portfolio is provided", **PORTFOLIO_ID),
+    refresh: bool = Query(False, description="Recompute even if a cached result exists"),
+    fields: Optional[str] = Query(None, description="Comma-separated dotted paths to return, e.g. report,details.risk_assessment"),
+    exclude: Optional[str] = Query(None, description="Comma-separated dotted paths to leave out; * matches any key, e.g. details.*.charts"),
+    columnar: bool = Query(False, description="Encode lists of records (per-asset metrics, time series) as one array per field"),
     settings: Settings = Depends(get_settings)
 ):
     """
@@ -128,26 +315,51 @@ async def analyze_portfolio(
     - Price forecasting with XGBoost models
     - Custom investment advice based on financial goals
     
-    If no portfolio is provided, it will use the last uploaded portfolio from the image upload endpoint.
+    If no portfolio is provided, it will use the stored portfolio with the given id.
+    
+    Results are cached per holdings, goals, model settings and trading day; the
+    X-Cache response header says whether this one was a hit, a stale hit (being
+    recomputed in the background) or a miss.
+    
+    Charts are not part of the response: `details.charts` lists them by name, and
+    each is rendered on request from `/analysis/{analysis_id}/charts/{name}`.
+    
+    The response is compressed with brotli or gzip when the client accepts it.
+    `fields` and `exclude` trim it to the parts the client needs, and `columnar`
+    opts in to one array per field for lists of records.
     
     Args:
         portfolio: The portfolio to analyze (optional if you've already uploaded via image)
         goals: Optional list of investment goals (default: retirement, home purchase, aggressive growth)
+        include_timings: Whether to attach the node, tool and LLM timings of this run
+        portfolio_id: Id returned by the upload endpoint
+        refresh: Whether to bypass the result cache
+        fields: Dotted paths to include
+        exclude: Dotted paths to leave out
+        columnar: Whether to encode record lists as column arrays (off by default)
         
     Returns:
         PortfolioAnalysisResponse: A comprehensive financial report and detailed analysis
     """
     try:
+        from app.agents.agents.agent_graph import run_financial_analysis
+        
         # Get LLM instance
         llm = get_llm(settings)
         
         # If no portfolio is provided, use the stored portfolio
         if portfolio is None:
-            stored_assets = portfolio_store.get_portfolio()
+            if portfolio_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No portfolio provided. Send a portfolio or the portfolio_id returned by the upload endpoint."
+                )
+            stored = await run_in_threadpool(get_portfolio_store().get, portfolio_id)
+            stored_assets = stored["assets"] if stored else []
             if not stored_assets:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="No portfolio provided and no uploaded portfolio found. Please upload a portfolio first."
+                    detail="No uploaded portfolio found for this portfolio_id. Please upload a portfolio first."
                 )
             
             # Format portfolio data for agents
@@ -165,41 +377,130 @@ async def analyze_portfolio(
         if not goals:
             goals = ['retirement', 'home_purchase', 'aggressive_growth']
         
-        # Run the analysis
-        result = run_financial_analysis(llm, portfolio_data, goals)
+        # Run the analysis (or reuse a cached one), collecting span timings for this request
+        from app.agents.tools.charts import get_chart_store
+        headers = {}
+        with collect_timings() as timings:
+            key = analysis_key(portfolio_data, goals, {
+                "model": settings.llm_model,
+                "temperature": settings.llm_temperature,
+                "market_data": settings.market_data_provider
+            })
+            
+            def compute():
+                # Every run, including background refreshes of the result cache, replaces the stored charts
+                result = run_financial_analysis(llm, portfolio_data, goals)
+                get_chart_store().save(key, result.get('details', {}).get('charts') or {}, replace=True)
+                return result
+            
+            if settings.analysis_cache_enabled:
+                cache = get_analysis_cache()
+                if refresh:
+                    cache.invalidate(key)
+                # The pipeline blocks, so run it off the event loop
+                result, cache_status = await run_in_threadpool(cache.get_or_compute, key, compute)
+                headers["X-Cache"] = cache_status
+            else:
+                result = await run_in_threadpool(analysis_flights.do, key, compute)
         
-        return {
+        # Keep the chart series server-side; a cached result re-stores its charts only if they expired
+        details = dict(result.get('details', {}))
+        details['charts'] = await run_in_threadpool(get_chart_store().save, key, details.get('charts') or {})
+        
+        content = {
             "report": result.get('report', ''),
             "error": result.get('error', ''),
-            "details": result.get('details', {})
+            "details": details,
+            "timings": timings if include_timings else None,
+            "analysis_id": key
         }
+        content = exclude_paths(include_paths(content, parse_paths(fields)), parse_paths(exclude))
+        if columnar:
+            content = to_columnar(content)
+        return CompressedJSONResponse(content, request.headers.get("accept-encoding", ""), headers=headers)
     
+    except HTTPException:
+        # A missing portfolio is the client's error, not a failed analysis
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Portfolio analysis failed: {str(e)}"
         )
 
+@router.delete("/analysis-cache", response_model=ClearPortfolioResponse, summary="Clear cached analyses")
+async def clear_analysis_cache():
+    """
+    Drop every cached analysis result, e.g. after changing prompts or agents.
+    
+    Later analyses are recomputed from scratch.
+    """
+    await run_in_threadpool(get_analysis_cache().invalidate)
+    return {"message": "Analysis cache cleared successfully"}
+
+@router.get("/analysis/{analysis_id}/charts", response_model=AnalysisChartsResponse, summary="List analysis charts")
+async def list_analysis_charts(analysis_id: str = Path(..., **ANALYSIS_ID)):
+    """
+    List the charts of an analysis by name, with the ETag of each rendered figure.
+    """
+    from app.agents.tools.charts import get_chart_store
+    charts = await run_in_threadpool(get_chart_store().list, analysis_id)
+    if charts is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis not found or expired")
+    return {"analysis_id": analysis_id, "charts": charts}
+
+@router.get("/analysis/{analysis_id}/charts/{name}", summary="Get analysis chart")
+async def get_analysis_chart(
+    request: Request,
+    analysis_id: str = Path(..., **ANALYSIS_ID),
+    name: str = Path(..., **CHART_NAME)
+):
+    """
+    Render one chart of an analysis as Plotly figure JSON.
+    
+    Figures are rendered from the stored series on first request and then served
+    from memory. Responses carry an ETag; a request whose If-None-Match matches
+    gets 304 Not Modified without rendering anything.
+    """
+    from app.agents.tools.charts import get_chart_store
+    store = get_chart_store()
+    chart = await run_in_threadpool(store.get, analysis_id, name)
+    if chart is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chart not found or expired")
+    
+    etag = f'"{chart["etag"]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    figure = await run_in_threadpool(store.render, chart)
+    return CompressedJSONResponse(figure, request.headers.get("accept-encoding", ""), headers=headers)
+
 @router.get("/stored-portfolio", response_model=StoredPortfolioResponse, summary="Get stored portfolio")
-async def get_stored_portfolio():
+async def get_stored_portfolio(
+    portfolio_id: str = Query(..., description="Id returned by the upload endpoint", **PORTFOLIO_ID)
+):
     """
-    Retrieve the portfolio data that was extracted from the last uploaded image.
+    Retrieve the portfolio data that was extracted from an uploaded image.
     
     Returns:
         The stored portfolio data and raw extraction information
     """
-    assets = portfolio_store.get_portfolio()
-    raw_data = portfolio_store.get_raw_data()
+    stored = await run_in_threadpool(get_portfolio_store().get, portfolio_id)
     
-    if not assets:
+    if not stored or not stored["assets"]:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No portfolio data found. Please upload a portfolio image first."
         )
     
+    _warm_portfolio(stored["portfolio_id"], stored["assets"])
+    
     return {
-        "assets": assets,
-        "raw_data": raw_data
+        "portfolio_id": stored["portfolio_id"],
+        "assets": stored["assets"],
+        "raw_data": stored["raw_data"]
     }
 
 @router.get("/sample", response_model=SamplePortfolioResponse, summary="Get sample portfolio")
@@ -223,12 +524,15 @@ async def get_sample_portfolio():
     }
 
 @router.delete("/clear-portfolio", response_model=ClearPortfolioResponse, summary="Clear stored portfolio")
-async def clear_portfolio():
+async def clear_portfolio(
+    portfolio_id: str = Query(..., description="Id returned by the upload endpoint", **PORTFOLIO_ID)
+):
     """
     Clear the stored portfolio data.
     
     This is useful when you want to start fresh with a new portfolio upload.
     """
-    portfolio_store.clear()
+    get_portfolio_warmer().cancel(portfolio_id)
+    await run_in_threadpool(get_portfolio_store().delete, portfolio_id)
     return {"message": "Portfolio data cleared successfully"}
 
@@ -0,0 +1,9 @@
+from app.utils.metrics import registry, span, traced, collect_timings, record_timing
+
+__all__ = [
+    'registry',
+    'span',
+    'traced',
+    'collect_timings',
+    'record_timing'
+]
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Optional
+from app.utils.metrics import registry
+
+ADMISSIONS = registry.counter(
+    'tradeiq_admission_total',
+    'Requests to limited endpoints by result (admitted, rate_limited, queue_full, timeout).',
+    ('endpoint', 'result')
+)
+ADMISSION_IN_FLIGHT = registry.gauge(
+    'tradeiq_admission_in_flight',
+    'Requests running on a limited endpoint.',
+    ('endpoint',)
+)
+ADMISSION_WAITING = registry.gauge(
+    'tradeiq_admission_waiting',
+    'Requests queued for a slot on a limited endpoint.',
+    ('endpoint',)
+)
+DOWNSTREAM_WAIT = registry.histogram(
+    'tradeiq_downstream_wait_seconds',
+    'Time calls waited for a downstream limiter (OpenAI, Google, yfinance).',
+    ('downstream',)
+)
+DOWNSTREAM_IN_FLIGHT = registry.gauge(
+    'tradeiq_downstream_in_flight',
+    'Calls in flight to a downstream service.',
+    ('downstream',)
+)
+DOWNSTREAM_REJECTED = registry.counter(
+    'tradeiq_downstream_rejected_total',
+    'Calls that gave up waiting for a downstream limiter.',
+    ('downstream',)
+)
+
+
+class Overloaded(Exception):
+    """Raised when a request can't be admitted; the client should retry after `retry_after` seconds."""
+    
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class DownstreamBusy(Exception):
+    """Raised when a call waited too long for its downstream limiter."""
+
+
+class TokenBuckets:
+    """
+    Token buckets refilling at `rate` tokens per second up to `burst`, one per key.
+    
+    Only the `max_keys` most recently used keys are kept; a forgotten key starts
+    again with a full bucket.
+    """
+    
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: 'OrderedDict[Hashable, list]' = OrderedDict()
+    
+    def _refill(self, key: Hashable, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self.burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+    
+    def take(self, key: Hashable) -> float:
+        """Take a token if one is available; returns 0, or the seconds until one will be."""
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / self.rate
+    
+    def reserve(self, key: Hashable) -> float:
+        """Take a token, going into debt if needed; returns the seconds to wait before using it."""
+        with self._lock:
+            bucket = self._refill(key, time.monotonic())
+            bucket[0] -= 1
+            return max(0.0, -bucket[0] / self.rate)
+    
+    def refund(self, key: Hashable) -> None:
+        """Give back a reserved token that wasn't used."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + 1)
+
+
+class ConcurrencyLimiter:
+    """
+    Lets at most `limit` requests to an endpoint run at once on the event loop.
+    
+    Up to `max_waiting` more wait in line, for at most `timeout` seconds; beyond
+    that requests are turned away with a 503. Retry-After is estimated from the
+    average time a request holds its slot.
+    """
+    
+    def __init__(self, name: str, limit: int, max_waiting: int = 16, timeout: float = 30.0):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._average_hold = 1.0
+    
+    def retry_after(self) -> float:
+        return self._average_hold * (1 + len(self._waiters)) / self.limit
+    
+    async def acquire(self) -> None:
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            ADMISSION_IN_FLIGHT.inc(endpoint=self.name)
+            return
+        if len(self._waiters) >= self.max_waiting:
+            ADMISSIONS.inc(endpoint=self.name, result='queue_full')
+            raise Overloaded(503, "Server is busy. Please retry shortly.", self.retry_after())
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_WAITING.inc(endpoint=self.name)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                ADMISSIONS.inc(endpoint=self.name, result='timeout')
+                raise Overloaded(503, "Server is busy. Please retry shortly.", self.retry_after())
+            raise
+        finally:
+            ADMISSION_WAITING.dec(endpoint=self.name)
+    
+    def release(self, held: Optional[float] = None) -> None:
+        if held is not None:
+            self._average_hold = 0.8 * self._average_hold + 0.2 * held
+        # Hand the slot straight to the next waiter so newcomers can't jump the line
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+        ADMISSION_IN_FLIGHT.dec(endpoint=self.name)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying per-client rate limits and per-endpoint concurrency
+    limits to the expensive routes.
+    
+    `routes` maps a POST path to its endpoint group. A client over its rate gets
+    a 429 and a request that can't get a slot a 503, both with Retry-After. The
+    slot is held until the response (including a streamed body) is sent.
+    """
+    
+    def __init__(self, app: Callable, routes: Dict[str, str]):
+        self.app = app
+        self.routes = routes
+    
+    @staticmethod
+    def _client(scope: Dict[str, Any], trust_forwarded: bool) -> str:
+        if trust_forwarded:
+            for name, value in scope.get('headers', []):
+                if name == b'x-forwarded-for':
+                    return value.decode('latin-1').split(',')[0].strip()
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+    
+    @staticmethod
+    async def _reject(send: Callable, error: Overloaded) -> None:
+        body = json.dumps({"detail": error.detail}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': error.status_code,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(error.retry_after).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+    
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        group = self.routes.get(scope.get('path')) if scope['type'] == 'http' and scope['method'] == 'POST' else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+        
+        from app.config import get_settings
+        rate_limiter = get_rate_limiter(group)
+        if rate_limiter is not None:
+            wait = rate_limiter.take(self._client(scope, get_settings().rate_limit_trust_forwarded))
+            if wait > 0:
+                ADMISSIONS.inc(endpoint=group, result='rate_limited')
+                await self._reject(send, Overloaded(429, "Too many requests. Please slow down.", wait))
+                return
+        
+        limiter = get_endpoint_limiter(group)
+        if limiter is None:
+            ADMISSIONS.inc(endpoint=group, result='admitted')
+            await self.app(scope, receive, send)
+            return
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            await self._reject(send, e)
+            return
+        ADMISSIONS.inc(endpoint=group, result='admitted')
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
+
+
+class DownstreamLimiter:
+    """
+    Caps concurrent calls (and optionally calls per second) to one downstream
+    service, so a slow or rate-limited dependency only holds up its own callers.
+    
+    Used as a blocking context manager from worker threads; a call that can't
+    start within `timeout` seconds raises DownstreamBusy.
+    """
+    
+    def __init__(self, name: str, max_concurrent: int, requests_per_second: float = 0, timeout: float = 60.0):
+        self.name = name
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self._rate = TokenBuckets(requests_per_second, max(1, max_concurrent)) if requests_per_second > 0 else None
+    
+    def __enter__(self) -> 'DownstreamLimiter':
+        start = time.perf_counter()
+        if self._slots is not None and not self._slots.acquire(timeout=self.timeout):
+            DOWNSTREAM_REJECTED.inc(downstream=self.name)
+            raise DownstreamBusy(f"Timed out waiting for {self.name}")
+        if self._rate is not None:
+            wait = self._rate.reserve(self.name)
+            if wait > self.timeout - (time.perf_counter() - start):
+                self._rate.refund(self.name)
+                if self._slots is not None:
+                    self._slots.release()
+                DOWNSTREAM_REJECTED.inc(downstream=self.name)
+                raise DownstreamBusy(f"Timed out waiting for {self.name}")
+            time.sleep(wait)
+        DOWNSTREAM_WAIT.observe(time.perf_counter() - start, downstream=self.name)
+        DOWNSTREAM_IN_FLIGHT.inc(downstream=self.name)
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        DOWNSTREAM_IN_FLIGHT.dec(downstream=self.name)
+        if self._slots is not None:
+            self._slots.release()
+
+
+class LimitedTransport:
+    """Wraps an httpx transport so every request goes through a downstream limiter."""
+    
+    def __init__(self, transport: Any, limiter: DownstreamLimiter):
+        self._transport = transport
+        self._limiter = limiter
+    
+    def handle_request(self, request: Any) -> Any:
+        with self._limiter:
+            return self._transport.handle_request(request)
+    
+    def close(self) -> None:
+        self._transport.close()
+    
+    def __enter__(self) -> 'LimitedTransport':
+        self._transport.__enter__()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._transport.__exit__(*exc_info)
+
+
+_endpoint_limiters: Dict[str, Optional[ConcurrencyLimiter]] = {}
+_rate_limiters: Dict[str, Optional[TokenBuckets]] = {}
+_downstream_limiters: Dict[str, DownstreamLimiter] = {}
+_http_clients: Dict[str, Any] = {}
+_limiters_lock = threading.RLock()
+
+
+def get_endpoint_limiter(group: str) -> Optional[ConcurrencyLimiter]:
+    """Concurrency limiter for an endpoint group, from the `<group>_max_concurrent` setting (0 disables it)."""
+    if group not in _endpoint_limiters:
+        with _limiters_lock:
+            if group not in _endpoint_limiters:
+                from app.config import get_settings
+                settings = get_settings()
+                limit = getattr(settings, f'{group}_max_concurrent')
+                _endpoint_limiters[group] = ConcurrencyLimiter(
+                    group, limit,
+                    max_waiting=settings.admission_max_waiting,
+                    timeout=settings.admission_wait_timeout_seconds
+                ) if limit > 0 else None
+    return _endpoint_limiters[group]
+
+
+def get_rate_limiter(group: str) -> Optional[TokenBuckets]:
+    """Per-client rate limiter for an endpoint group, or None when rate limiting is off."""
+    if group not in _rate_limiters:
+        with _limiters_lock:
+            if group not in _rate_limiters:
+                from app.config import get_settings
+                settings = get_settings()
+                per_minute = settings.rate_limit_per_minute
+                _rate_limiters[group] = TokenBuckets(
+                    per_minute / 60, settings.rate_limit_burst
+                ) if per_minute > 0 else None
+    return _rate_limiters[group]
+
+
+def get_downstream_limiter(name: str) -> DownstreamLimiter:
+    """Limiter for a downstream service, from the `<name>_max_concurrent` and `<name>_requests_per_second` settings."""
+    if name not in _downstream_limiters:
+        with _limiters_lock:
+            if name not in _downstream_limiters:
+                from app.config import get_settings
+                settings = get_settings()
+                _downstream_limiters[name] = DownstreamLimiter(
+                    name,
+                    getattr(settings, f'{name}_max_concurrent'),
+                    getattr(settings, f'{name}_requests_per_second'),
+                    timeout=settings.downstream_wait_timeout_seconds
+                )
+    return _downstream_limiters[name]
+
+
+def limited_http_client(name: str) -> Any:
+    """A shared httpx client whose requests go through the named downstream limiter."""
+    if name not in _http_clients:
+        with _limiters_lock:
+            if name not in _http_clients:
+                import httpx
+                _http_clients[name] = httpx.Client(transport=LimitedTransport(httpx.HTTPTransport(), get_downstream_limiter(name)))
+    return _http_clients[name]
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+from app.utils.metrics import registry
+
+CACHE_REQUESTS = registry.counter(
+    'tradeiq_cache_requests_total',
+    'Cache lookups by cache name and result (hit, miss, stale).',
+    ('cache', 'result')
+)
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with the time it was stored."""
+    value: Any
+    stored_at: float
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class DiskCache:
+    """
+    JSON file cache shared by every worker process on the host.
+    
+    Entries expire after `ttl` seconds. When `max_bytes` is set, the least recently
+    used files are evicted once the cache grows past it (file mtime tracks last access).
+    """
+    
+    def __init__(self, directory: str, name: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], f'{digest}.json')
+    
+    def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry regardless of its age (e.g. to revalidate a stale value)."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('key') != key:
+            return None
+        if self.max_bytes is not None:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return CacheEntry(value=data['value'], stored_at=data['stored_at'])
+    
+    def get(self, key: str) -> Any:
+        """Get a fresh value, or None if missing or older than the TTL."""
+        entry = self.get_entry(key)
+        if entry is None:
+            CACHE_REQUESTS.inc(cache=self.name, result='miss')
+            return None
+        if self.ttl is not None and entry.age() > self.ttl:
+            CACHE_REQUESTS.inc(cache=self.name, result='stale')
+            return None
+        CACHE_REQUESTS.inc(cache=self.name, result='hit')
+        return entry.value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value, replacing any existing entry atomically."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        payload = json.dumps({'key': key, 'stored_at': time.time(), 'value': value}, default=str)
+        
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        
+        if self.max_bytes is not None:
+            self._account(len(payload.encode('utf-8')) - previous)
+    
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if self.max_bytes is not None:
+            self._account(-size)
+    
+    def clear(self) -> None:
+        for path, _, _ in self._files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._size = 0
+    
+    def _files(self):
+        """Yield (path, size, mtime) for every cache file."""
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+    
+    def _account(self, delta: int) -> None:
+        """Track the cache size and evict least recently used files past `max_bytes`."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._files())
+            else:
+                self._size += delta
+            if self._size <= self.max_bytes:
+                return
+            
+            # Rescan so files written by other processes are accounted for
+            files = sorted(self._files(), key=lambda f: f[2])
+            self._size = sum(size for _, size, _ in files)
+            for path, size, _ in files:
+                if self._size <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    self._size -= size
+                except OSError:
+                    pass
+
+
+class MemoryCache:
+    """
+    In-process LRU cache for values that aren't worth serializing (e.g. DataFrames).
+    
+    Holds at most `max_entries` values; with a `ttl`, entries older than `ttl`
+    seconds are treated as missing (a `ttl` of 0 disables the cache).
+    """
+    
+    def __init__(self, name: str, max_entries: int = 256, ttl: Optional[float] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, CacheEntry]' = OrderedDict()
+    
+    def get(self, key: Hashable) -> Any:
+        """Get a fresh value, or None if missing or older than the TTL."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_REQUESTS.inc(cache=self.name, result='miss')
+                return None
+            if self.ttl is not None and entry.age() > self.ttl:
+                del self._entries[key]
+                CACHE_REQUESTS.inc(cache=self.name, result='stale')
+                return None
+            self._entries.move_to_end(key)
+            CACHE_REQUESTS.inc(cache=self.name, result='hit')
+            return entry.value
+    
+    def set(self, key: Hashable, value: Any, stored_at: Optional[float] = None) -> None:
+        """Store a value; `stored_at` keeps the age of a value copied from another cache."""
+        if self.ttl == 0:
+            return
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, stored_at=time.time() if stored_at is None else stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,71 @@
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from app.utils.metrics import registry, record_timing, SPAN_DURATION, SPAN_ERRORS, TOKEN_BUCKETS
+
+LLM_TOKENS = registry.histogram(
+    'tradeiq_llm_tokens',
+    'Tokens used per LLM call.',
+    ('model', 'type'),
+    buckets=TOKEN_BUCKETS
+)
+LLM_TOKENS_TOTAL = registry.counter(
+    'tradeiq_llm_tokens_total',
+    'Total tokens used by LLM calls.',
+    ('model', 'type')
+)
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """Callback handler that records a span and token counts for every LLM call."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._starts: Dict[UUID, float] = {}
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        self._starts[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        start = self._starts.pop(run_id, None)
+        duration = time.perf_counter() - start if start is not None else 0.0
+        usage = self._token_usage(response)
+
+        SPAN_DURATION.observe(duration, kind='llm', name=self.model)
+        for token_type, count in usage.items():
+            LLM_TOKENS.observe(count, model=self.model, type=token_type)
+            LLM_TOKENS_TOTAL.inc(count, model=self.model, type=token_type)
+        record_timing('llm', self.model, duration, **usage)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        start = self._starts.pop(run_id, None)
+        duration = time.perf_counter() - start if start is not None else 0.0
+        SPAN_DURATION.observe(duration, kind='llm', name=self.model)
+        SPAN_ERRORS.inc(kind='llm', name=self.model)
+        record_timing('llm', self.model, duration, error=True)
+
+    @staticmethod
+    def _token_usage(response: LLMResult) -> Dict[str, int]:
+        """Extract prompt/completion token counts from an LLM result."""
+        token_usage: Optional[Dict[str, Any]] = (response.llm_output or {}).get('token_usage')
+        if token_usage:
+            return {
+                'prompt_tokens': int(token_usage.get('prompt_tokens', 0) or 0),
+                'completion_tokens': int(token_usage.get('completion_tokens', 0) or 0)
+            }
+
+        # Fall back to usage metadata on the generated messages
+        prompt_tokens = completion_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+                prompt_tokens += usage.get('input_tokens', 0)
+                completion_tokens += usage.get('output_tokens', 0)
+        if not (prompt_tokens or completion_tokens):
+            return {}
+        return {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens}
@@ -0,0 +1,134 @@
+import gzip
+from typing import Any, Dict, List, Mapping, Optional
+import orjson
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Optional; responses fall back to gzip
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 1024
+
+
+def _default(obj: Any) -> Any:
+    # pandas Timestamps and dates; numpy arrays and scalars are handled by orjson itself
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes with orjson, accepting numpy values, pandas timestamps and non-string keys."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def frame_columns(df: Any, index: str = 'date') -> Dict[str, List[Any]]:
+    """A DataFrame as one array per column plus its index as ISO strings, instead of one record per row."""
+    columns = {index: [value.isoformat() if hasattr(value, 'isoformat') else value for value in df.index]}
+    for name in df.columns:
+        columns[str(name)] = df[name].tolist()
+    return columns
+
+
+def to_columns(records: List[Dict[str, Any]]) -> Optional[Dict[str, List[Any]]]:
+    """Records sharing the same keys as one array per key, or None if they don't share them."""
+    if len(records) < 2 or not all(isinstance(r, dict) for r in records):
+        return None
+    keys = list(records[0])
+    if not keys or any(len(r) != len(keys) or any(k not in r for k in keys) for r in records):
+        return None
+    return {key: [r[key] for r in records] for key in keys}
+
+
+def columnar(content: Any) -> Any:
+    """Recursively replace every list of same-shaped records with a dict of column arrays."""
+    if isinstance(content, dict):
+        return {key: columnar(value) for key, value in content.items()}
+    if isinstance(content, list):
+        columns = to_columns(content)
+        if columns is not None:
+            return {key: columnar(values) for key, values in columns.items()}
+        return [columnar(value) for value in content]
+    return content
+
+
+def parse_paths(value: Optional[str]) -> List[List[str]]:
+    """Split a comma-separated list of dotted paths (e.g. "report,details.*.plot") into segments."""
+    if not value:
+        return []
+    return [path.strip().split('.') for path in value.split(',') if path.strip()]
+
+
+def include_paths(content: Any, paths: List[List[str]]) -> Any:
+    """Keep only the given dotted paths (and everything under them); `*` matches any key."""
+    if not paths or any(not path for path in paths) or not isinstance(content, dict):
+        return content
+    selected = {}
+    for key, value in content.items():
+        rest = [path[1:] for path in paths if path[0] in ('*', key)]
+        if rest:
+            selected[key] = include_paths(value, rest)
+    return selected
+
+
+def exclude_paths(content: Any, paths: List[List[str]]) -> Any:
+    """Drop the given dotted paths; `*` matches any key."""
+    if not paths or not isinstance(content, dict):
+        return content
+    kept = {}
+    for key, value in content.items():
+        rest = [path[1:] for path in paths if path[0] in ('*', key)]
+        if any(not path for path in rest):
+            continue
+        kept[key] = exclude_paths(value, rest) if rest else value
+    return kept
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick brotli (when installed) or gzip from an Accept-Encoding header, honouring q=0."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    for encoding in (('br',) if brotli is not None else ()) + ('gzip',):
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+class CompressedJSONResponse(Response):
+    """
+    JSON response serialized with orjson and compressed with brotli or gzip,
+    whichever the client accepts, once it's at least COMPRESS_MIN_BYTES.
+    
+    `content` may also be JSON that is already serialized, as bytes.
+    """
+    
+    media_type = 'application/json'
+    
+    def __init__(self, content: Any, accept_encoding: str = '', status_code: int = 200, headers: Optional[Mapping[str, str]] = None):
+        body = content if isinstance(content, bytes) else dumps(content)
+        headers = dict(headers or {})
+        headers['Vary'] = 'Accept-Encoding'
+        encoding = negotiate_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+        if encoding == 'br':
+            body = brotli.compress(body, quality=5)
+        elif encoding == 'gzip':
+            body = gzip.compress(body, compresslevel=5)
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        super().__init__(body, status_code=status_code, headers=headers)
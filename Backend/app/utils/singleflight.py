@@ -0,0 +1,73 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from app.utils.metrics import registry
+
+SINGLEFLIGHT_CALLS = registry.counter(
+    'tradeiq_singleflight_total',
+    'Single-flight calls by group and result (leader ran the work, shared waited for an in-flight call).',
+    ('group', 'result')
+)
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+    
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for and share its result (or exception).
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+    
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        
+        SINGLEFLIGHT_CALLS.inc(group=self.name, result='leader' if leader else 'shared')
+        if not leader:
+            return future.result()
+        
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop.
+    
+    The work runs as its own task, so a caller that is cancelled (e.g. a client
+    disconnecting) doesn't cancel it for the other callers sharing it.
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        
+        SINGLEFLIGHT_CALLS.inc(group=self.name, result='leader' if leader else 'shared')
+        return await asyncio.shield(task)
@@ -0,0 +1,245 @@
+"""
+Offline end-to-end benchmark for the analysis pipeline and the FastAPI app.
+
+OpenAI, Google search, news sites and yfinance are replaced by local stand-ins
+(see `benchmarks/fakes`), so runs cost nothing and are repeatable. Run from
+the Backend directory:
+
+    python -m benchmarks.e2e --mode both --concurrency 1,2,4,8 --requests 16
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+SAMPLE_PORTFOLIO = {
+    "assets": [
+        {"ticker": "AAPL", "quantity": 10},
+        {"ticker": "MSFT", "quantity": 15},
+        {"ticker": "GOOGL", "quantity": 5},
+        {"ticker": "AMZN", "quantity": 8},
+        {"ticker": "JNJ", "quantity": 12},
+        {"ticker": "JPM", "quantity": 20},
+        {"ticker": "VTI", "quantity": 30}
+    ]
+}
+GOALS = ["retirement", "home_purchase", "aggressive_growth"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_level(work: Callable[[], None], concurrency: int, requests: int) -> Dict[str, Any]:
+    """Run `requests` calls of `work` with `concurrency` workers and summarize latencies."""
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def timed_call(_: int) -> None:
+        start = time.perf_counter()
+        try:
+            work()
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed_call, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def build_fake_llm(args: argparse.Namespace, stub_url: str):
+    from benchmarks.fakes import FakeChatModel
+    from app.utils.llm_metrics import LLMMetricsCallback
+
+    with open(os.path.join(FIXTURES, "llm_script.json")) as f:
+        script = json.load(f)
+
+    ticker = args.ticker.lower()
+    variables = {
+        "ticker": args.ticker,
+        "portfolio": json.dumps(SAMPLE_PORTFOLIO),
+        # Articles 1 and 3 are syndicated copies of the same story
+        "article_url_1": f"{stub_url}/articles/{ticker}-1",
+        "article_url_2": f"{stub_url}/articles/{ticker}b-2",
+        "article_url_3": f"{stub_url}/articles/{ticker}-3",
+    }
+    return FakeChatModel(
+        script=script,
+        variables=variables,
+        latency=args.llm_latency,
+        callbacks=[LLMMetricsCallback("fake-chat")]
+    )
+
+
+def graph_work(llm) -> Callable[[], None]:
+    from app.agents.agents.agent_graph import run_financial_analysis
+
+    def work() -> None:
+        result = run_financial_analysis(llm, SAMPLE_PORTFOLIO, GOALS)
+        if result.get("error"):
+            raise RuntimeError(result["error"])
+    return work
+
+
+def start_api_server(llm) -> str:
+    """Start the FastAPI app under uvicorn in a background thread with the fake LLM injected."""
+    import uvicorn
+    from app.main import app
+    from app.routes import portfolio
+
+    portfolio.get_llm = lambda settings=None: llm
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def api_work(base_url: str) -> Callable[[], None]:
+    import requests
+    local = threading.local()
+
+    def work() -> None:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        response = session.post(
+            f"{base_url}/portfolio/analyze",
+            json={"portfolio": SAMPLE_PORTFOLIO, "goals": GOALS},
+            timeout=600
+        )
+        response.raise_for_status()
+        if response.json().get("error"):
+            raise RuntimeError(response.json()["error"])
+    return work
+
+
+def prefetch_news(llm, enabled: bool) -> None:
+    """Point the app at a throwaway news store, filled for the sample portfolio when enabled."""
+    import tempfile
+    from app.agents.tools import news_prefetch
+    from app.agents.tools.portfolio_tools import PortfolioTools
+
+    store = news_prefetch.NewsStore(os.path.join(tempfile.mkdtemp(prefix="tradeiq-news-"), "news.sqlite3"))
+    news_prefetch.set_news_store(store)
+    if not enabled:
+        return
+    tickers = [a["ticker"] for a in SAMPLE_PORTFOLIO["assets"]]
+    subjects = [news_prefetch.ticker_subject(t) for t in tickers]
+    subjects += [news_prefetch.sector_subject(c) for c in dict.fromkeys(PortfolioTools._get_category(t) for t in tickers)]
+    for subject in subjects:
+        store.put(subject, news_prefetch.research_subject(subject, llm))
+
+
+def print_table(mode: str, rows: List[Dict[str, Any]]) -> None:
+    print(f"\n== {mode} ==")
+    print(f"{'conc':>5} {'reqs':>5} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak RSS MB':>12}")
+    for r in rows:
+        print(f"{r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} {r['throughput_rps']:>8.2f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['peak_rss_mb']:>12.1f}")
+        if r["first_error"]:
+            print(f"      first error: {r['first_error']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["graph", "api", "both"], default="both")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per concurrency level")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--data-latency", type=float, default=0.0, help="Seconds per fake price download")
+    parser.add_argument("--web-latency", type=float, default=0.0, help="Seconds per stub search/scrape response")
+    parser.add_argument("--ticker", default="AAPL", help="Ticker used in scripted tool calls")
+    parser.add_argument("--prefetch", action="store_true", help="Warm the news store first so market analysis is served from it")
+    parser.add_argument("--analysis-cache", action="store_true", help="Serve repeated API analyses from the result cache")
+    parser.add_argument("--price-cache", action="store_true", help="Reuse price histories, features and forecasts across requests")
+    parser.add_argument("--admission", action="store_true", help="Apply the API's rate and concurrency limits")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    # Settings require credentials; none of them are used offline
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ.setdefault("GOOGLE_CSE_ID", "offline-benchmark")
+    # Every request analyzes the same portfolio; measure the pipeline, not the cache, unless asked
+    os.environ["ANALYSIS_CACHE_ENABLED"] = "true" if args.analysis_cache else "false"
+    if not args.price_cache:
+        os.environ["PRICE_CACHE_TTL_SECONDS"] = "0"
+    # One client sends every request, so per-client rate limits would only measure the limiter
+    if not args.admission:
+        os.environ["RATE_LIMIT_PER_MINUTE"] = "0"
+        os.environ["ANALYZE_MAX_CONCURRENT"] = "0"
+
+    from benchmarks.fakes import StubServer, market_data, stub_server
+
+    stub = StubServer(latency=args.web_latency).start()
+    stub_server.install(stub.base_url)
+    market_data.install(latency=args.data_latency)
+    llm = build_fake_llm(args, stub.base_url)
+    prefetch_news(llm, args.prefetch)
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        if args.mode in ("graph", "both"):
+            work = graph_work(llm)
+            results["graph"] = [run_level(work, c, args.requests) for c in levels]
+            print_table("run_financial_analysis", results["graph"])
+        if args.mode in ("api", "both"):
+            work = api_work(start_api_server(llm))
+            results["api"] = [run_level(work, c, args.requests) for c in levels]
+            print_table("POST /portfolio/analyze", results["api"])
+    finally:
+        stub.stop()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+from benchmarks.fakes.fake_llm import FakeChatModel
+from benchmarks.fakes.stub_server import StubServer
+
+__all__ = [
+    'FakeChatModel',
+    'StubServer'
+]
@@ -0,0 +1,102 @@
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline stand-in for ChatOpenAI driven by a recorded script.
+
+    Agent prompts are matched against `agents[*].match` and answered with the
+    scripted tool calls, one step per round trip; plain prompts (sentiment,
+    advice, report) are matched against `completions[*].match`. String values
+    in tool arguments are formatted with `variables`, e.g. "{ticker}".
+    """
+
+    script: Dict[str, Any]
+    variables: Dict[str, str] = Field(default_factory=dict)
+    latency: float = 0.0
+    model_name: str = "fake-chat"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+
+        prompt = str(messages[0].content) if messages else ""
+        message = self._respond(prompt, messages, bool(kwargs.get("tools")))
+
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        completion_tokens = max(1, len(str(message.content)) // 4)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={
+                "token_usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+                "model_name": self.model_name,
+            },
+        )
+
+    def _respond(self, prompt: str, messages: List[BaseMessage], has_tools: bool) -> AIMessage:
+        if has_tools:
+            for agent in self.script.get("agents", []):
+                if agent["match"] in prompt:
+                    step = sum(1 for m in messages if isinstance(m, AIMessage) and m.tool_calls)
+                    if step < len(agent.get("steps", [])):
+                        return self._tool_call_message(agent["steps"][step], step)
+                    return AIMessage(content=self._format(agent.get("final", "")))
+
+        for completion in self.script.get("completions", []):
+            if completion["match"] in prompt:
+                response = completion["response"]
+                if not isinstance(response, str):
+                    response = json.dumps(response)
+                return AIMessage(content=response)
+
+        return AIMessage(content=self._format(self.script.get("default", "")))
+
+    def _tool_call_message(self, calls: List[Dict[str, Any]], step: int) -> AIMessage:
+        tool_calls = []
+        for index, call in enumerate(calls):
+            args = {key: self._format(value) for key, value in call.get("args", {}).items()}
+            tool_calls.append({"name": call["tool"], "args": args, "id": f"call_{step}_{index}"})
+
+        additional_kwargs = {
+            "tool_calls": [
+                {
+                    "id": tc["id"],
+                    "type": "function",
+                    "function": {"name": tc["name"], "arguments": json.dumps(tc["args"])},
+                }
+                for tc in tool_calls
+            ]
+        }
+        return AIMessage(content="", tool_calls=tool_calls, additional_kwargs=additional_kwargs)
+
+    def _format(self, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        # Only substitute known {placeholders}; JSON braces are left untouched
+        return re.sub(
+            r"\{(\w+)\}",
+            lambda m: str(self.variables.get(m.group(1), m.group(0))),
+            value,
+        )
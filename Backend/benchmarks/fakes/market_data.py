@@ -0,0 +1,38 @@
+import os
+import time
+from typing import Optional
+import pandas as pd
+from app.agents.tools.market_data import (
+    MarketDataProvider, ReplayProvider, SyntheticProvider, set_market_data_provider
+)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fixtures", "prices")
+
+# Fixed end date so synthetic prices are identical across days
+SYNTHETIC_END = pd.Timestamp("2024-12-31")
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Recorded fixtures from `fixtures/prices`, falling back to synthetic GBM prices.
+
+    `latency` simulates the download time of a real provider.
+    """
+
+    name = "fixture"
+
+    def __init__(self, latency: float = 0.0, directory: Optional[str] = None):
+        self.latency = latency
+        self.replay = ReplayProvider(directory or FIXTURE_DIR)
+        self.synthetic = SyntheticProvider(end=SYNTHETIC_END)
+
+    def get_history(self, ticker: str, period: str = "1y") -> pd.DataFrame:
+        if self.latency:
+            time.sleep(self.latency)
+        df = self.replay.get_history(ticker, period)
+        return df if not df.empty else self.synthetic.get_history(ticker, period)
+
+
+def install(latency: float = 0.0) -> None:
+    """Serve all market data in the app from fixtures."""
+    set_market_data_provider(FixtureProvider(latency))
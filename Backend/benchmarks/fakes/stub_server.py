@@ -0,0 +1,130 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+import requests
+
+SENTENCES = [
+    "Shares of {subject} rose after quarterly earnings beat analyst expectations.",
+    "Analysts raised their price target, citing strong demand and expanding margins.",
+    "Some investors remain cautious about valuation after the recent rally.",
+    "The company reaffirmed its full-year guidance and announced a buyback.",
+    "Regulatory scrutiny and supply chain costs were flagged as key risks.",
+    "Trading volume was above its 30-day average as institutions added exposure.",
+    "Sector peers moved higher in sympathy, led by large-cap names.",
+    "Management highlighted growth in recurring revenue and cloud services.",
+]
+
+
+WORDS = (
+    "revenue guidance margin outlook demand pricing inventory shipments consumer enterprise cloud "
+    "advertising subscription hardware services growth decline quarter fiscal analysts investors "
+    "dividend buyback valuation multiple estimates consensus upgrade downgrade rating target "
+    "momentum volatility index futures yields rates inflation policy tariff supply chain costs"
+).split()
+
+
+def article_html(slug: str, paragraphs: int = 12) -> str:
+    """Deterministic article body; slugs sharing a story id produce syndicated copies."""
+    story = slug.split("-")[0]
+    seed = int(hashlib.sha256(story.encode()).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    body = []
+    for i in range(paragraphs):
+        sentence = SENTENCES[(seed + i) % len(SENTENCES)].format(subject=story.upper())
+        # Story-specific filler keeps distinct stories from looking like duplicates
+        filler = " ".join(rng.choice(WORDS) for _ in range(15))
+        body.append(f"<p>{sentence} {filler.capitalize()}.</p>")
+    return f"<html><head><title>{story}</title></head><body><nav>Menu</nav>{''.join(body)}</body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "TradeIQStub/1.0"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        url = urlparse(self.path)
+        if url.path == "/search":
+            params = parse_qs(url.query)
+            query = params.get("q", [""])[0]
+            num = int(params.get("num", ["5"])[0])
+            story = hashlib.sha256(query.lower().encode()).hexdigest()[:6]
+            base = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            items = [
+                {
+                    "title": f"{query} - story {i}",
+                    "snippet": f"Latest coverage on {query}.",
+                    # Every other result is a syndicated copy of the first story
+                    "link": f"{base}/articles/{story}-{i}" if i % 2 else f"{base}/articles/{story}{i}-{i}",
+                }
+                for i in range(num)
+            ]
+            self._send(200, json.dumps({"items": items}).encode(), "application/json")
+        elif url.path.startswith("/articles/"):
+            slug = url.path.rsplit("/", 1)[-1]
+            self._send(200, article_html(slug).encode(), "text/html; charset=utf-8")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+
+class StubServer:
+    """Local HTTP server standing in for the Custom Search API and news sites."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_search_wrapper(base_url: str):
+    """Build a GoogleSearchAPIWrapper replacement that queries the stub server."""
+
+    class StubSearchWrapper:
+        def __init__(self, **kwargs: Any):
+            self.session = requests.Session()
+
+        def results(self, query: str, num_results: int, search_params: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
+            response = self.session.get(f"{base_url}/search", params={"q": query, "num": num_results}, timeout=10)
+            response.raise_for_status()
+            return response.json()["items"]
+
+    return StubSearchWrapper
+
+
+def install(base_url: str) -> None:
+    """Point every Google search in the app at the stub server."""
+    from app.agents.tools import research_tools, search
+    wrapper = make_search_wrapper(base_url)
+    research_tools.GoogleSearchAPIWrapper = wrapper
+    search.GoogleSearchAPIWrapper = wrapper
@@ -0,0 +1,102 @@
+"""
+Import-time budget for the API process.
+
+Imports a module (by default `app.main`) in fresh interpreters under
+`python -X importtime`, reports the fastest run's total and the slowest
+dependencies, and fails if the total exceeds `--budget-ms` or if any module
+that should be deferred (xgboost, langchain, OpenCV, ...) was imported. Run from
+the Backend directory:
+
+    python -m benchmarks.import_time --budget-ms 1500
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+# Heavy dependencies that only the code paths using them should import
+DEFERRED = [
+    "xgboost", "sklearn", "plotly", "cv2", "pytesseract", "pypdfium2", "bs4",
+    "langchain", "langchain_openai", "langchain_community", "langgraph", "openai", "yfinance",
+]
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module: str) -> List[Dict[str, Any]]:
+    """Import `module` in a fresh interpreter and return its -X importtime rows in import order."""
+    env = dict(os.environ)
+    # Settings require credentials; none of them are used by importing
+    env.setdefault("OPENAI_API_KEY", "import-time-benchmark")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            rows.append({
+                "module": match.group(4),
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+                "depth": (len(match.group(3)) - 1) // 2
+            })
+    return rows
+
+
+def summarize(rows: List[Dict[str, Any]], module: str, top: int) -> Dict[str, Any]:
+    total = next(r["cumulative_us"] for r in rows if r["module"] == module)
+    # Cumulative time per top-level package, counted where it was first imported
+    packages: Dict[str, int] = {}
+    for row in rows:
+        name = row["module"]
+        if "." not in name and name != module:
+            packages[name] = max(packages.get(name, 0), row["cumulative_us"])
+    imported = {r["module"].split(".")[0] for r in rows}
+    return {
+        "module": module,
+        "total_ms": total / 1000,
+        "slowest": sorted(packages.items(), key=lambda p: -p[1])[:top],
+        "deferred_imported": sorted(imported & set(DEFERRED))
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters to run; the fastest is reported")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the import takes longer than this")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level packages to list")
+    parser.add_argument("--json", dest="json_path", help="Write the summary to this JSON file")
+    args = parser.parse_args()
+
+    runs = [summarize(measure(args.module), args.module, args.top) for _ in range(args.repeat)]
+    best = min(runs, key=lambda r: r["total_ms"])
+
+    print(f"import {args.module}: {best['total_ms']:.1f} ms (fastest of {args.repeat})")
+    print(f"{'package':<32} {'cumulative ms':>14}")
+    for name, cumulative in best["slowest"]:
+        print(f"{name:<32} {cumulative / 1000:>14.1f}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(best, f, indent=2)
+
+    failures = []
+    if best["deferred_imported"]:
+        failures.append(f"deferred dependencies imported at startup: {', '.join(best['deferred_imported'])}")
+    if args.budget_ms is not None and best["total_ms"] > args.budget_ms:
+        failures.append(f"{best['total_ms']:.1f} ms exceeds the {args.budget_ms:g} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import pytest
+from benchmarks.micro.conftest import HISTORY_YEARS, is_large
+from app.agents.tools.forecasting_tools import ForecastingTools
+
+YEARS = [pytest.param(y, id=f"{y}y", marks=[pytest.mark.large] if is_large(years=y) else []) for y in HISTORY_YEARS]
+PERIODS = {1: "1y", 2: "2y", 5: "5y", 10: "10y"}
+
+
+@pytest.mark.parametrize("single_history", YEARS, indirect=True)
+def bench_prepare_stock_data(benchmark, single_history):
+    years = len(single_history) // 252
+    df = benchmark(ForecastingTools._prepare_stock_data, "BENCH", PERIODS[years])
+    assert not df.empty
+
+
+@pytest.mark.parametrize("single_history", YEARS, indirect=True)
+def bench_calculate_rsi(benchmark, single_history):
+    rsi = benchmark(ForecastingTools._calculate_rsi, single_history["Close"])
+    assert len(rsi) == len(single_history)
+
+
+@pytest.mark.parametrize("single_history", YEARS, indirect=True)
+def bench_train_and_forecast(benchmark, single_history):
+    df = ForecastingTools._prepare_stock_data("BENCH")
+    # Model fitting dominates; a few rounds give a stable mean without minutes of runtime
+    forecast_df, metrics = benchmark.pedantic(
+        ForecastingTools._train_and_forecast, args=(df, 30), rounds=3, iterations=1, warmup_rounds=1
+    )
+    assert len(forecast_df) == 30 and metrics["mae"] >= 0
+
+
+@pytest.mark.parametrize("single_history", YEARS, indirect=True)
+def bench_create_forecast_plot(benchmark, single_history):
+    df = ForecastingTools._prepare_stock_data("BENCH")
+    forecast_df, _ = ForecastingTools._train_and_forecast(df, 30)
+    plot_json = benchmark(ForecastingTools._create_forecast_plot, "BENCH", df, forecast_df)
+    assert plot_json
@@ -0,0 +1,39 @@
+import pytest
+from benchmarks.micro.conftest import PORTFOLIO_SIZES, grid_params
+from app.agents.tools.risk_engine import RiskModel
+from app.agents.tools.goal_simulator import GoalSimulator
+
+# Path simulation works on portfolio returns, so it doesn't depend on the number of holdings
+PROJECTION_GRID = grid_params(PORTFOLIO_SIZES[:2], [1])
+
+
+@pytest.fixture
+def risk_model(panel_portfolio):
+    portfolio, frames = panel_portfolio
+    values = {a["ticker"]: a["quantity"] * float(frames[a["ticker"]]["Close"].iloc[-1]) for a in portfolio["assets"]}
+    return RiskModel.from_histories(frames), values
+
+
+@pytest.mark.parametrize("method", ["bootstrap", "normal"])
+@pytest.mark.parametrize("goal", ["retirement", "retire in 40 years adding $1,000 a month", "home_purchase"])
+@pytest.mark.parametrize("panel_portfolio", PROJECTION_GRID, indirect=True)
+def bench_project_goal(benchmark, risk_model, goal, method):
+    """10,000 paths (the default) towards a goal, inline."""
+    model, values = risk_model
+    simulator = GoalSimulator(method=method, workers=1)
+    result = benchmark(simulator.project, model, values, goal, "retirement")
+    assert result["paths"] == 10_000 and 0 <= result["success_probability"] <= 1
+
+
+@pytest.mark.large
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("panel_portfolio", PROJECTION_GRID[:1], indirect=True)
+def bench_simulate_large_run(benchmark, risk_model, workers):
+    """200,000 paths over 50 years, inline and across worker processes (results are identical)."""
+    model, values = risk_model
+    simulator = GoalSimulator(paths=200_000, chunk_paths=25_000, workers=workers, parallel_min_path_years=1)
+    sampler = simulator.sampler(model, model.weights(values))
+    simulator.simulate(sampler, 1e6, 1000, 50)
+    paths = benchmark(simulator.simulate, sampler, 1e6, 1000, 50)
+    simulator.shutdown()
+    assert paths.shape == (200_000, 51)
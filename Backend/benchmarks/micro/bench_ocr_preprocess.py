@@ -0,0 +1,120 @@
+import io
+from functools import lru_cache
+import pytest
+from app.ocr.pipeline import preprocess_image, detect_text_region, estimate_text_height, process_extracted_text
+
+# (width, height, font px, text width fraction): screenshot, scanned page, 12 MP phone photo
+IMAGES = {
+    "screenshot": (1600, 1000, 22, 0.5),
+    "scan": (2480, 3508, 48, 0.6),
+    "photo": (4032, 3024, 64, 0.4),
+}
+HOLDINGS = ["AAPL 10", "MSFT 15", "GOOGL 5", "AMZN 8", "JNJ 12", "JPM 20", "VTI 30", "TOTAL 100"]
+# What the upload endpoint should extract: every holding, without the TOTAL label
+EXPECTED = {line.split()[0]: float(line.split()[1]) for line in HOLDINGS if not line.startswith("TOTAL")}
+
+
+@lru_cache(maxsize=None)
+def statement_image(kind: str) -> bytes:
+    """Synthetic holdings statement: a block of text lines on a noisy page with wide margins."""
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height, size, fraction = IMAGES[kind]
+    rng = np.random.default_rng(3)
+    page = rng.normal(235, 12, (height, width)).clip(0, 255).astype("uint8")
+    image = Image.fromarray(page).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=size)
+    x = int(width * (1 - fraction) / 2)
+    y = int(height * 0.3)
+    for line in HOLDINGS:
+        draw.text((x, y), f"{line.split()[0]:<8} {line.split()[1]:>6}   ${rng.uniform(50, 900):,.2f}", fill=(20, 20, 20), font=font)
+        y += int(size * 1.6)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def legacy_preprocess_image(image_bytes):
+    """The full-resolution pipeline used before downscaling and text-region cropping."""
+    import cv2
+    import numpy as np
+    from PIL import Image
+
+    image = np.array(Image.open(io.BytesIO(image_bytes)))
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    denoised = cv2.fastNlMeansDenoising(gray, h=30)
+    binary = cv2.adaptiveThreshold(denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    coords = cv2.findNonZero(binary)
+    angle = cv2.minAreaRect(coords)[-1]
+    angle = -(90 + angle) if angle < -45 else -angle
+    (h, w) = binary.shape[:2]
+    M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
+    return cv2.warpAffine(binary, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+
+KINDS = [pytest.param(k, id=k, marks=[pytest.mark.large] if k == "photo" else []) for k in IMAGES]
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def bench_preprocess_legacy(benchmark, kind):
+    benchmark.group = f"ocr_preprocess-{kind}"
+    image_bytes = statement_image(kind)
+    result = benchmark.pedantic(legacy_preprocess_image, args=(image_bytes,), rounds=3, iterations=1, warmup_rounds=1)
+    assert result.size
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def bench_preprocess(benchmark, kind):
+    benchmark.group = f"ocr_preprocess-{kind}"
+    image_bytes = statement_image(kind)
+    result = benchmark.pedantic(preprocess_image, args=(image_bytes,), rounds=3, iterations=1, warmup_rounds=1)
+    # The crop keeps the text block and little of the margins
+    width, height, size, fraction = IMAGES[kind]
+    assert result.size < width * height * 0.5
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def bench_layout_analysis(benchmark, kind):
+    import numpy as np
+    from PIL import Image
+
+    gray = np.array(Image.open(io.BytesIO(statement_image(kind))).convert("L"))
+    height = benchmark(estimate_text_height, gray)
+    assert height is not None
+    x, y, w, h = detect_text_region(gray)
+    assert w < gray.shape[1] and h < gray.shape[0]
+
+
+def tesseract_available() -> bool:
+    import pytesseract
+
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        return False
+    return True
+
+
+def extraction_score(extracted):
+    """(holdings with the right quantity, extracted tickers that aren't holdings or have a wrong quantity)."""
+    correct = sum(1 for ticker, quantity in extracted.items() if EXPECTED.get(ticker) == quantity)
+    return correct, len(extracted) - correct
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def bench_extraction_accuracy(kind):
+    """Tickers and quantities read after the current preprocessing are at least as good as after the legacy one."""
+    if not tesseract_available():
+        pytest.skip("tesseract is not installed")
+    import pytesseract
+
+    image_bytes = statement_image(kind)
+    scores = {}
+    for name, preprocess in (("legacy", legacy_preprocess_image), ("current", preprocess_image)):
+        text = pytesseract.image_to_string(preprocess(image_bytes), config="--psm 6")
+        scores[name] = extraction_score(process_extracted_text(text))
+    (legacy_correct, legacy_wrong), (correct, wrong) = scores["legacy"], scores["current"]
+    assert correct >= legacy_correct, scores
+    assert wrong <= legacy_wrong or correct > legacy_correct, scores
@@ -0,0 +1,48 @@
+import pytest
+from benchmarks.micro.conftest import PORTFOLIO_SIZES, HISTORY_YEARS, grid_params
+from app.agents.tools.portfolio_tools import PortfolioTools
+
+GRID = grid_params(PORTFOLIO_SIZES, HISTORY_YEARS)
+# Chart building does not depend on history length
+CHART_GRID = grid_params(PORTFOLIO_SIZES, [1])
+
+
+@pytest.mark.parametrize("panel_portfolio", GRID, indirect=True)
+def bench_calculate_portfolio_metrics(benchmark, panel_portfolio):
+    portfolio, _ = panel_portfolio
+    result = benchmark(PortfolioTools._calculate_portfolio_metrics, portfolio)
+    assert result["total_value"] > 0
+
+
+@pytest.mark.parametrize("panel_portfolio", GRID, indirect=True)
+def bench_assess_risk(benchmark, panel_portfolio):
+    portfolio, _ = panel_portfolio
+    assess_risk = PortfolioTools.create_risk_assessment_tool().func
+    result = benchmark(assess_risk, portfolio)
+    assert result["profile"] in PortfolioTools.DEFAULT_RECOMMENDATIONS
+
+
+@pytest.mark.parametrize("panel_portfolio", GRID, indirect=True)
+def bench_assess_categories(benchmark, panel_portfolio):
+    portfolio, _ = panel_portfolio
+    assess_categories = PortfolioTools.create_category_assessment_tool().func
+    result = benchmark(assess_categories, portfolio)
+    assert result["num_categories"] >= 1
+
+
+@pytest.mark.parametrize("panel_portfolio", CHART_GRID, indirect=True)
+def bench_visualize_portfolio(benchmark, panel_portfolio):
+    portfolio, _ = panel_portfolio
+    visualize_portfolio = PortfolioTools.create_portfolio_visualization_tool().func
+    result = benchmark(visualize_portfolio, portfolio)
+    assert "asset_allocation" in result["charts"]
+
+
+@pytest.mark.parametrize("panel_portfolio", CHART_GRID, indirect=True)
+def bench_render_portfolio_charts(benchmark, panel_portfolio):
+    from app.agents.tools.charts import portfolio_charts, render_chart
+
+    portfolio, _ = panel_portfolio
+    charts = portfolio_charts(PortfolioTools._calculate_portfolio_metrics(portfolio))
+    figures = benchmark(lambda: [render_chart(chart) for chart in charts.values()])
+    assert all(figures)
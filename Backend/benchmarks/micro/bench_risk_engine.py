@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from benchmarks.micro.conftest import PORTFOLIO_SIZES, grid_params
+from app.agents.tools.risk_engine import RiskEngine, RiskModel
+
+# Estimating the covariance scales with history length; rescoring a cached model doesn't
+MODEL_GRID = grid_params(PORTFOLIO_SIZES, [1, 5])
+RESCORE_GRID = grid_params(PORTFOLIO_SIZES, [1])
+
+
+@pytest.mark.parametrize("panel_portfolio", MODEL_GRID, indirect=True)
+def bench_build_risk_model(benchmark, panel_portfolio):
+    _, frames = panel_portfolio
+    model = benchmark(RiskModel.from_histories, frames)
+    assert 0 <= model.shrinkage <= 1
+
+
+@pytest.mark.parametrize("panel_portfolio", RESCORE_GRID, indirect=True)
+def bench_rescore_cached_universe(benchmark, panel_portfolio):
+    """A portfolio over half of an already cached universe: a slice and a few matrix products."""
+    portfolio, frames = panel_portfolio
+    engine = RiskEngine()
+    engine.model(frames)
+    half = {a["ticker"]: frames[a["ticker"]] for a in portfolio["assets"][::2]}
+    values = {ticker: 1000.0 for ticker in half}
+    
+    result = benchmark(lambda: engine.model(half).assess(values))
+    assert abs(sum(c["risk_contribution"] for c in result["risk_contributions"]) - 100) < 1e-6
+
+
+@pytest.mark.parametrize("panel_portfolio", RESCORE_GRID, indirect=True)
+def bench_assess_many(benchmark, panel_portfolio):
+    """1,000 random portfolios over one model in a single call."""
+    _, frames = panel_portfolio
+    model = RiskModel.from_histories(frames)
+    weights = np.random.default_rng(0).dirichlet(np.ones(len(model.tickers)), 1000)
+    result = benchmark(model.assess_many, weights)
+    assert result["volatility"].shape == (1000,)
+
+
+@pytest.mark.parametrize("panel_portfolio", RESCORE_GRID[:1], indirect=True)
+def bench_model_mixed_timezones(benchmark, panel_portfolio):
+    """Histories from a tz-aware single-ticker fetch mixed with naive batched ones."""
+    _, frames = panel_portfolio
+    mixed = {
+        ticker: df.tz_localize("America/New_York") if i % 2 else df
+        for i, (ticker, df) in enumerate(frames.items())
+    }
+    engine = RiskEngine()
+    model = benchmark(engine.model, mixed)
+    assert model.tickers == sorted(frames) and len(model.returns) == len(frames[model.tickers[0]]) - 1
+
+
+@pytest.mark.parametrize("panel_portfolio", RESCORE_GRID[:1], indirect=True)
+def bench_rescore_after_short_history_universe(benchmark, panel_portfolio):
+    """A cached universe with a recent listing doesn't truncate the window of portfolios without it."""
+    portfolio, frames = panel_portfolio
+    engine = RiskEngine()
+    listing = next(iter(frames.values())).iloc[-30:]
+    engine.model({**frames, "IPO": listing})
+    half = {a["ticker"]: frames[a["ticker"]] for a in portfolio["assets"][::2]}
+    
+    model = benchmark(engine.model, half)
+    assert len(model.returns) == len(next(iter(half.values()))) - 1
@@ -0,0 +1,92 @@
+import json
+import pytest
+from benchmarks.micro.conftest import grid_params
+from app.agents.tools.portfolio_tools import PortfolioTools
+from app.agents.tools.forecasting_tools import ForecastingTools
+from app.agents.tools.charts import forecast_chart, portfolio_charts, render_chart
+
+# A 100-holding analysis response; serialization doesn't depend on history length
+RESPONSE_GRID = grid_params([100], [1])
+
+
+def analysis_content(portfolio, frames, legacy):
+    """
+    An analysis response shaped like /analyze's, with portfolio charts and a 30-day forecast:
+    Plotly figures and forecast records as before, or chart names and forecast columns as now.
+    """
+    import pandas as pd
+    from app.utils.serialization import frame_columns
+
+    ticker, history = next(iter(frames.items()))
+    forecast_df = pd.DataFrame(
+        {"Close": history["Close"].iloc[-1] * (1 + 0.001 * pd.RangeIndex(1, 31))},
+        index=pd.bdate_range(history.index[-1], periods=31, name="Date")[1:]
+    )
+    metrics = PortfolioTools._calculate_portfolio_metrics(portfolio)
+    charts = {**portfolio_charts(metrics), f"forecast:{ticker}": forecast_chart(ticker, history, forecast_df)}
+    if legacy:
+        forecasting = {
+            "forecast_data": forecast_df.reset_index().to_dict(orient="records"),
+            "plot": ForecastingTools._create_forecast_plot(ticker, history, forecast_df)
+        }
+        portfolio_figures = {f"{name}_chart": render_chart(chart) for name, chart in portfolio_charts(metrics).items()}
+    else:
+        forecasting = {"forecast_data": frame_columns(forecast_df), "chart": f"forecast:{ticker}"}
+        portfolio_figures = {}
+    return {
+        "report": "# Portfolio Report\n\n" + "Risk is moderate. " * 200,
+        "error": "",
+        "details": {
+            "risk_assessment": PortfolioTools.create_risk_assessment_tool().func(portfolio),
+            "category_analysis": {
+                **PortfolioTools.create_category_assessment_tool().func(portfolio),
+                "assets": metrics["assets"],
+                **portfolio_figures
+            },
+            "forecasting": {"ticker": ticker, "forecast_days": 30, **forecasting},
+            **({} if legacy else {"charts": {name: {"kind": c["kind"], "title": c["title"], "etag": "0" * 40} for name, c in charts.items()}})
+        },
+        "timings": None
+    }
+
+
+def legacy_encode(content):
+    """What /analyze did before: pydantic validation, jsonable_encoder and json.dumps, uncompressed."""
+    from fastapi.encoders import jsonable_encoder
+    from app.Models.models import PortfolioAnalysisResponse
+
+    model = PortfolioAnalysisResponse.model_validate(content)
+    return json.dumps(jsonable_encoder(model), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def encode(content):
+    from app.utils.serialization import CompressedJSONResponse, columnar
+
+    return CompressedJSONResponse(columnar(content), "gzip").body
+
+
+@pytest.fixture
+def legacy_content(panel_portfolio):
+    portfolio, frames = panel_portfolio
+    return analysis_content(portfolio, frames, legacy=True)
+
+
+@pytest.fixture
+def content(panel_portfolio):
+    portfolio, frames = panel_portfolio
+    return analysis_content(portfolio, frames, legacy=False)
+
+
+@pytest.mark.parametrize("panel_portfolio", RESPONSE_GRID, indirect=True)
+def bench_analysis_response_legacy(benchmark, legacy_content):
+    benchmark.group = "analysis_response"
+    body = benchmark(legacy_encode, legacy_content)
+    benchmark.extra_info["bytes"] = len(body)
+
+
+@pytest.mark.parametrize("panel_portfolio", RESPONSE_GRID, indirect=True)
+def bench_analysis_response(benchmark, content, legacy_content):
+    benchmark.group = "analysis_response"
+    body = benchmark(encode, content)
+    benchmark.extra_info["bytes"] = len(body)
+    assert len(body) * 10 <= len(legacy_encode(legacy_content))
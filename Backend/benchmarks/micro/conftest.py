@@ -0,0 +1,108 @@
+import os
+from functools import lru_cache
+from typing import Dict, Tuple
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+TRADING_DAYS = 252
+
+# (tickers, years) grid; LARGE cases are marked so they can be deselected
+PORTFOLIO_SIZES = [10, 100, 1000, 5000]
+HISTORY_YEARS = [1, 2, 5, 10]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def pytest_configure(config):
+    """
+    Resolve a relative `--benchmark-storage` against this directory rather than the
+    working directory, and only enforce `--benchmark-compare-fail` when comparing.
+    """
+    storage = config.option.benchmark_storage
+    if storage.startswith("file://") and not os.path.isabs(storage[len("file://"):]):
+        config.option.benchmark_storage = "file://" + os.path.normpath(os.path.join(HERE, storage[len("file://"):]))
+    if not config.option.benchmark_compare:
+        config.option.benchmark_compare_fail = None
+
+
+def is_large(tickers: int = 0, years: int = 0) -> bool:
+    return tickers >= 1000 or years >= 10
+
+
+def grid_params(sizes, years):
+    """Build pytest params over the (tickers, years) grid, marking the large cases."""
+    params = []
+    for n in sizes:
+        for y in years:
+            marks = [pytest.mark.large] if is_large(n, y) else []
+            params.append(pytest.param((n, y), id=f"{n}tickers-{y}y", marks=marks))
+    return params
+
+
+@lru_cache(maxsize=2)
+def synthetic_panel(tickers: int, years: int, seed: int = 7):
+    """
+    Synthetic close price panel generated in one vectorized GBM draw.
+
+    Returns:
+        Tuple[List[str], Dict[str, pd.DataFrame]]: Ticker symbols and per-ticker frames
+        shaped like yfinance history (DatetimeIndex, Close and Volume columns)
+    """
+    import numpy as np
+    import pandas as pd
+
+    days = years * TRADING_DAYS
+    rng = np.random.default_rng(seed)
+    vol = rng.uniform(0.15, 0.6, tickers)
+    drift = rng.uniform(-0.05, 0.2, tickers)
+    dt = 1 / TRADING_DAYS
+    shocks = rng.standard_normal((days, tickers))
+    log_returns = (drift - 0.5 * vol ** 2) * dt + vol * np.sqrt(dt) * shocks
+    closes = rng.uniform(10, 500, tickers) * np.exp(np.cumsum(log_returns, axis=0))
+    volumes = rng.integers(100_000, 50_000_000, (days, tickers))
+
+    index = pd.bdate_range(end="2024-12-31", periods=days, name="Date")
+    # Mix real symbols (so categories resolve) with synthetic ones
+    from app.agents.tools.portfolio_tools import PortfolioTools
+    known = list(PortfolioTools.STOCK_CATEGORIES)
+    symbols = [known[i] if i < len(known) else f"S{i:04d}" for i in range(tickers)]
+    frames = {
+        symbol: pd.DataFrame({"Close": closes[:, i], "Volume": volumes[:, i]}, index=index)
+        for i, symbol in enumerate(symbols)
+    }
+    return symbols, frames
+
+
+def make_portfolio(symbols) -> Dict:
+    return {"assets": [{"ticker": s, "quantity": float(10 + i % 50)} for i, s in enumerate(symbols)]}
+
+
+@pytest.fixture
+def panel_portfolio(request, monkeypatch) -> Tuple[Dict, Dict]:
+    """Portfolio over a synthetic panel with `_get_stock_data` served from memory."""
+    from app.agents.tools.portfolio_tools import PortfolioTools
+
+    tickers, years = request.param
+    symbols, frames = synthetic_panel(tickers, years)
+    monkeypatch.setattr(PortfolioTools, "_get_stock_data", staticmethod(lambda t, period="1y": frames))
+    return make_portfolio(symbols), frames
+
+
+@pytest.fixture
+def single_history(request):
+    """Serve one synthetic ticker history of `request.param` years as the market data provider."""
+    from app.agents.tools.market_data import MarketDataProvider, set_market_data_provider
+
+    _, frames = synthetic_panel(1, request.param)
+    frame = next(iter(frames.values()))
+
+    class InMemoryProvider(MarketDataProvider):
+        name = "memory"
+
+        def get_history(self, ticker: str, period: str = "1y"):
+            return frame.copy()
+
+    set_market_data_provider(InMemoryProvider())
+    yield frame
+    set_market_data_provider(None)
@@ -0,0 +1,34 @@
+"""
+Record yfinance price history into `benchmarks/fixtures/prices/<TICKER>.csv`.
+
+Tickers without a recorded file fall back to deterministic synthetic prices,
+so recording is optional. Run from the Backend directory:
+
+    python -m benchmarks.record_prices AAPL MSFT SPY QQQ --period 2y
+"""
+import argparse
+import os
+from benchmarks.fakes.market_data import FIXTURE_DIR
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--period", default="2y")
+    args = parser.parse_args()
+
+    import yfinance as yf
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for ticker in args.tickers:
+        df = yf.Ticker(ticker).history(period=args.period)
+        if df.empty:
+            print(f"{ticker}: no data, skipped")
+            continue
+        path = os.path.join(FIXTURE_DIR, f"{ticker}.csv")
+        df.to_csv(path, index_label="Date")
+        print(f"{ticker}: {len(df)} rows -> {path}")
+
+
+if __name__ == "__main__":
+    main()
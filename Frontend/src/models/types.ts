@@ -17,8 +17,21 @@ export interface PortfolioAnalysisResponse {
     categories?: Record<string, number>;
     recommendations?: string[];
     forecasts?: Record<string, any>;
+    charts?: Record<string, ChartInfo>;
     [key: string]: any;
   };
+  analysis_id?: string;
+}
+
+export interface ChartInfo {
+  kind: string;
+  title: string;
+  etag: string;
+}
+
+export interface AnalysisChartsResponse {
+  analysis_id: string;
+  charts: Record<string, ChartInfo>;
 }
 
 export interface SamplePortfolioResponse {
@@ -28,10 +41,14 @@ export interface SamplePortfolioResponse {
 export interface PortfolioUploadResponse {
   message: string;
   extracted_data: Record<string, number>;
+  // Symbols that weren't recognized and are not included in assets
+  unrecognized?: Record<string, number>;
   assets: Asset[];
+  portfolio_id: string;
 }
 
 export interface StoredPortfolioResponse {
+  portfolio_id: string;
   assets: Asset[];
   raw_data: {
     extracted_text?: string;
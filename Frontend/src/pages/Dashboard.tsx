@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import axios from 'axios';
+import { getPortfolioId, setPortfolioId } from '../services/api';
 
 interface Asset {
   ticker: string;
@@ -16,7 +17,11 @@ const Dashboard = () => {
     const checkStoredPortfolio = async () => {
       try {
         setIsLoading(true);
-        const response = await axios.get('http://localhost:3000/portfolio/stored-portfolio');
+        const portfolioId = getPortfolioId();
+        if (!portfolioId) throw new Error('No portfolio uploaded from this browser');
+        const response = await axios.get('http://localhost:3000/portfolio/stored-portfolio', {
+          params: { portfolio_id: portfolioId },
+        });
         setHasStoredPortfolio(true);
         setAssets(response.data.assets);
       } catch (error) {
@@ -136,7 +141,10 @@ const Dashboard = () => {
             <button 
               onClick={async () => {
                 try {
-                  await axios.delete('http://localhost:3000/portfolio/clear-portfolio');
+                  await axios.delete('http://localhost:3000/portfolio/clear-portfolio', {
+                    params: { portfolio_id: getPortfolioId() },
+                  });
+                  setPortfolioId(null);
                   setHasStoredPortfolio(false);
                   setAssets([]);
                 } catch (error) {
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import axios from 'axios';
+import { getPortfolioId } from '../services/api';
 import { Link } from 'react-router-dom';
 
 interface Asset {
@@ -35,7 +36,11 @@ const PortfolioAnalysis = () => {
     const fetchPortfolio = async () => {
       setIsLoading(true);
       try {
-        const response = await axios.get('http://localhost:3000/portfolio/stored-portfolio');
+        const portfolioId = getPortfolioId();
+        if (!portfolioId) throw new Error('No portfolio uploaded from this browser');
+        const response = await axios.get('http://localhost:3000/portfolio/stored-portfolio', {
+          params: { portfolio_id: portfolioId },
+        });
         setAssets(response.data.assets);
         setHasStoredPortfolio(true);
       } catch (error) {
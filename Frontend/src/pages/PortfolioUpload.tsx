@@ -1,6 +1,7 @@
 import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import { getPortfolioId, setPortfolioId } from '../services/api';
 
 const PortfolioUpload = () => {
   const [file, setFile] = useState<File | null>(null);
@@ -47,8 +48,10 @@ const PortfolioUpload = () => {
           headers: {
             'Content-Type': 'multipart/form-data',
           },
+          params: { portfolio_id: getPortfolioId() },
         }
       );
+      setPortfolioId(response.data.portfolio_id);
       
       setUploadStatus({
         success: true,
@@ -56,10 +59,12 @@ const PortfolioUpload = () => {
         data: response.data,
       });
       
-      // Wait a moment before redirecting
-      setTimeout(() => {
-        navigate('/analysis');
-      }, 2000);
+      // Wait a moment before redirecting, unless there are unrecognized symbols to review
+      if (Object.keys(response.data.unrecognized || {}).length === 0) {
+        setTimeout(() => {
+          navigate('/analysis');
+        }, 2000);
+      }
       
     } catch (error: any) {
       setUploadStatus({
@@ -189,6 +194,21 @@ const PortfolioUpload = () => {
                       </ul>
                     </div>
                   )}
+                  {Object.keys(uploadStatus.data.unrecognized || {}).length > 0 && (
+                    <div className="mt-2 text-yellow-400">
+                      <p className="font-medium mb-1">Unrecognized symbols (not included in the analysis):</p>
+                      <ul className="list-disc list-inside">
+                        {Object.entries(uploadStatus.data.unrecognized || {}).map(([ticker, quantity]) => (
+                          <li key={ticker}>
+                            {ticker}: {quantity as number}
+                          </li>
+                        ))}
+                      </ul>
+                      <button className="btn-primary mt-2" onClick={() => navigate('/analysis')}>
+                        Continue to Analysis
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
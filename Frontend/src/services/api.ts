@@ -7,6 +7,7 @@ import type {
   PortfolioUploadResponse,
   StoredPortfolioResponse,
   ClearPortfolioResponse,
+  AnalysisChartsResponse,
   AnalysisRequest
 } from '../models/types';
 
@@ -18,6 +19,19 @@ const api = axios.create({
   },
 });
 
+// Id of this browser's uploaded portfolio, as returned by the upload endpoint
+const PORTFOLIO_ID_KEY = 'portfolioId';
+
+export const getPortfolioId = (): string | null => localStorage.getItem(PORTFOLIO_ID_KEY);
+
+export const setPortfolioId = (portfolioId: string | null) => {
+  if (portfolioId) {
+    localStorage.setItem(PORTFOLIO_ID_KEY, portfolioId);
+  } else {
+    localStorage.removeItem(PORTFOLIO_ID_KEY);
+  }
+};
+
 // Portfolio API functions
 export const portfolioAPI = {
   // Get a sample portfolio
@@ -28,7 +42,9 @@ export const portfolioAPI = {
 
   // Get the stored portfolio
   getStoredPortfolio: async (): Promise<StoredPortfolioResponse> => {
-    const response = await api.get<StoredPortfolioResponse>('/portfolio/stored-portfolio');
+    const response = await api.get<StoredPortfolioResponse>('/portfolio/stored-portfolio', {
+      params: { portfolio_id: getPortfolioId() },
+    });
     return response.data;
   },
 
@@ -44,21 +60,40 @@ export const portfolioAPI = {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
+        params: { portfolio_id: getPortfolioId() },
       }
     );
     
+    setPortfolioId(response.data.portfolio_id);
     return response.data;
   },
 
   // Analyze a portfolio
   analyzePortfolio: async (data: AnalysisRequest): Promise<PortfolioAnalysisResponse> => {
-    const response = await api.post<PortfolioAnalysisResponse>('/portfolio/analyze', data);
+    const response = await api.post<PortfolioAnalysisResponse>('/portfolio/analyze', data, {
+      params: { portfolio_id: getPortfolioId() },
+    });
+    return response.data;
+  },
+
+  // List the charts of an analysis
+  getAnalysisCharts: async (analysisId: string): Promise<AnalysisChartsResponse> => {
+    const response = await api.get<AnalysisChartsResponse>(`/portfolio/analysis/${analysisId}/charts`);
+    return response.data;
+  },
+
+  // Get one chart of an analysis as Plotly figure JSON (the browser revalidates it by ETag)
+  getAnalysisChart: async (analysisId: string, name: string): Promise<Record<string, any>> => {
+    const response = await api.get(`/portfolio/analysis/${analysisId}/charts/${encodeURIComponent(name)}`);
     return response.data;
   },
 
   // Clear the stored portfolio
   clearPortfolio: async (): Promise<ClearPortfolioResponse> => {
-    const response = await api.delete<ClearPortfolioResponse>('/portfolio/clear-portfolio');
+    const response = await api.delete<ClearPortfolioResponse>('/portfolio/clear-portfolio', {
+      params: { portfolio_id: getPortfolioId() },
+    });
+    setPortfolioId(null);
     return response.data;
   }
 };